@@ -0,0 +1 @@
+# Benchmarks for the load / render / edit hot paths. Run with: python -m benchmarks --help
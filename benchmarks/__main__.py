@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+DEFAULT_SIZES = [1000, 10000, 100000, 500000]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _meta() -> dict:
+    import PySide6
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+
+    return {
+        'python': platform.python_version(),
+        'pyside6': PySide6.__version__,
+        'platform': platform.platform(),
+        'qpa': os.environ.get('QT_QPA_PLATFORM'),
+        'commit': commit,
+    }
+
+
+def _run_isolated(case: str, repeat: int, seed: int, timeout: float) -> dict:
+    # one process per case, so peak memory and Qt state don't leak between cases
+    cmd = [sys.executable, '-m', 'benchmarks', 'case', case, '--repeat', str(repeat), '--seed', str(seed)]
+    try:
+        proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {'case': case, 'error': f'timeout after {timeout}s'}
+    if proc.returncode != 0:
+        return {'case': case, 'error': (proc.stderr.strip().splitlines() or ['failed'])[-1]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _compare(old_path: str, new_path: str):
+    with open(old_path) as f:
+        old = {r['case']: r for r in json.load(f)['results']}
+    with open(new_path) as f:
+        new = {r['case']: r for r in json.load(f)['results']}
+
+    def value(v):
+        return v['median'] if isinstance(v, dict) else v
+
+    for case, result in new.items():
+        if case not in old:
+            continue
+        print(case)
+        for key, v in result.items():
+            if not key.endswith(('_s', '_mb')) or key not in old[case]:
+                continue
+            a, b = value(old[case][key]), value(v)
+            ratio = b / a if a else float('inf')
+            print(f'  {key:<18} {a:10.4f} -> {b:10.4f}  ({ratio:.2f}x)')
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description="Editor hot path benchmarks (offscreen Qt).")
+    sub = parser.add_subparsers(dest='command')
+
+    run = sub.add_parser('run', help="run the suite, write JSON results")
+    run.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES, help="synthetic triangle counts")
+    run.add_argument('--tile', action='append', default=None, help="extra .bin tiles (default: arid.bin)")
+    run.add_argument('--repeat', type=int, default=5)
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--timeout', type=float, default=900, help="seconds per case")
+    run.add_argument('--out', default='-', help="output file, - for stdout")
+
+    case = sub.add_parser('case', help="run a single case in this process (used by run)")
+    case.add_argument('case')
+    case.add_argument('--repeat', type=int, default=5)
+    case.add_argument('--seed', type=int, default=0)
+
+    compare = sub.add_parser('compare', help="compare two result files")
+    compare.add_argument('old')
+    compare.add_argument('new')
+
+    args = parser.parse_args()
+
+    if args.command == 'case':
+        from .cases import run_case
+        print(json.dumps(run_case(args.case, args.repeat, args.seed)))
+        return
+
+    if args.command == 'compare':
+        _compare(args.old, args.new)
+        return
+
+    if args.command != 'run':
+        parser.print_help()
+        return
+
+    tiles = args.tile if args.tile is not None else [os.path.join(ROOT, 'arid.bin')]
+    cases = [f'synthetic-{n}' for n in args.sizes] + tiles
+
+    results = []
+    for c in cases:
+        print(f'running {c} ...', file=sys.stderr)
+        results.append(_run_isolated(c, args.repeat, args.seed, args.timeout))
+
+    out = json.dumps({'meta': _meta(), 'results': results}, indent=2)
+    if args.out == '-':
+        print(out)
+    else:
+        with open(args.out, 'w') as f:
+            f.write(out)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import statistics
+import sys
+import tempfile
+import time
+from typing import Optional
+
+from .synthetic import synthetic_tile
+
+from PySide6 import QtCore, QtWidgets
+
+def _timed(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
+
+
+def _repeat(fn, repeat: int) -> dict:
+    samples = [_timed(fn) for _ in range(repeat)]
+    return {'median': statistics.median(samples), 'min': min(samples), 'max': max(samples)}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        # no getrusage on windows, psutil only knows the peak working set there
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024 * 1024)
+
+    # ru_maxrss is KB on linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(case: str, repeat: int = 5, seed: int = 0) -> dict:
+    '''
+    Run every measurement for one case. case is either 'synthetic-<triangles>' or a path to a .bin tile.
+
+    Should be run in a fresh process (see __main__) so peak memory belongs to this case only.
+    '''
+
+    from src import MainWindow
+    from src.tools import read_tile_layers, TileCache
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    window = MainWindow(autosave=False)
+    window.resize(1200, 650)
+    window.show()
+    app.processEvents()
+    main = window.main_widget
+
+    # private tile cache, so the first load is always cold
+    cache_dir = tempfile.TemporaryDirectory()
+    main.tile_cache = TileCache(cache_dir.name)
+
+    result = {'case': case}
+
+    # ---- load ----
+    if case.startswith('synthetic-'):
+        layers = synthetic_tile(int(case.split('-', 1)[1]), seed)
+
+        def load():
+            for model, (pts, tris) in zip(main.models, layers):
+                model.set_geometry(pts, tris)
+            main._rebuild_scene_all()
+    else:
+        t0 = time.perf_counter()
+        read_tile_layers(case)
+        result['parse_s'] = time.perf_counter() - t0
+
+        def load():
+            main.open_bin_file(case)
+
+    result['load_s'] = _timed(load)
+    app.processEvents()
+
+    if not case.startswith('synthetic-'):
+        result['reopen_s'] = _timed(load) # served from the tile cache
+        app.processEvents()
+
+    result['vertices'] = sum(len(m.points()) for m in main.models)
+    result['triangles'] = sum(len(m.triangles()) for m in main.models)
+    result['scene_items'] = len(main.scene.items())
+
+    main.editor.fit_tile()
+    main.preview.reset_view()
+    app.processEvents()
+
+    # ---- full scene rebuild ----
+    result['rebuild_s'] = _repeat(main._rebuild_scene_all, repeat)
+
+    # ---- paint ----
+    result['editor_paint_s'] = _repeat(main.editor.viewport().grab, repeat)
+    result['preview_paint_s'] = _repeat(main.preview.grab, repeat)
+
+    # ---- drag one vertex of the largest layer ----
+    layer = max(range(len(main.models)), key=lambda mi: len(main.models[mi].triangles()))
+    main.mesh_combo.setCurrentIndex(layer)
+    items = main.mesh_vertex_items[layer]
+    if items:
+        item = items[len(items) // 2]
+        start = QtCore.QPointF(item.pos())
+        step = [0]
+
+        def drag():
+            step[0] += 1
+            item.setPos(start + QtCore.QPointF(step[0] % 7, step[0] % 5))
+            app.processEvents()
+
+        result['drag_update_s'] = _repeat(drag, max(repeat, 20))
+
+    # ---- selection queries on that layer ----
+    result['select_rect_s'] = _repeat(lambda: main.selection.select_rect(layer, QtCore.QRectF(-250, -250, 500, 500)), repeat)
+    result['select_all_invert_s'] = _repeat(lambda: (main.selection.select_all(layer), main.selection.invert(layer)), repeat)
+
+    # ---- delete 1% of that layer's vertices ----
+    if items:
+        main.selection.select_vertices(layer, range(0, len(items), 100))
+        result['delete_s'] = _timed(main.delete_selected)
+
+    result['peak_rss_mb'] = _peak_rss_mb()
+
+    window.close()
+    cache_dir.cleanup()
+    return result
@@ -0,0 +1,45 @@
+import math
+import random
+
+from PySide6 import QtCore
+
+NUM_LAYERS = 11
+
+def grid_layer(num_tris: int, half_size: float, rng: random.Random) -> tuple[list[QtCore.QPointF], list[tuple[int, int, int]]]:
+    '''
+    Jittered grid triangulation of the square [-half_size, half_size]^2 with roughly num_tris triangles.
+    '''
+
+    n = max(2, int(math.sqrt(num_tris / 2)) + 1) # points per side, (n - 1)^2 * 2 triangles
+    step = 2 * half_size / (n - 1)
+    jitter = step * 0.3
+
+    pts = []
+    for j in range(n):
+        for i in range(n):
+            x = -half_size + i * step
+            y = -half_size + j * step
+            # keep the outline straight, jitter the inside
+            if 0 < i < n - 1 and 0 < j < n - 1:
+                x += rng.uniform(-jitter, jitter)
+                y += rng.uniform(-jitter, jitter)
+            pts.append(QtCore.QPointF(x, y))
+
+    tris = []
+    for j in range(n - 1):
+        for i in range(n - 1):
+            a = j * n + i
+            tris.append((a, a + 1, a + n))
+            tris.append((a + 1, a + n + 1, a + n))
+
+    return pts, tris
+
+
+def synthetic_tile(total_tris: int, seed: int = 0) -> list[tuple[list[QtCore.QPointF], list[tuple[int, int, int]]]]:
+    '''
+    Nested squares, one per layer, sharing total_tris triangles between all 11 layers. Same seed, same tile.
+    '''
+
+    rng = random.Random(seed)
+    per_layer = max(2, total_tris // NUM_LAYERS)
+    return [grid_layer(per_layer, 500 - 40 * layer, rng) for layer in range(NUM_LAYERS)]
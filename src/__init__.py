@@ -1,3 +1,4 @@
 from . import utility
 from .components import Main
+from . import tools
 from .windows import MainWindow
\ No newline at end of file
@@ -2,9 +2,16 @@
 
 from . import items
 
+from .topology import MeshTopology
 from .model import MeshModel
 from .grid_background import GridBackground
 from .editor_view import EditorView
+from .tile_renderer import TileRenderer
+from .lod_cache import LodCacheItem
+from .diff_overlay import DiffOverlay, DiffOverlayItem
+from .transform_preview import TransformPreviewItem
+from .selection import SelectionModel, SELECTION_MODES
+from .selection_highlight import SelectionHighlightItem
 from .preview_widget import PreviewWidget
 from .preview_overlay import PreviewOverlay
 from .main import Main
\ No newline at end of file
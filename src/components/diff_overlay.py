@@ -0,0 +1,82 @@
+from typing import Optional
+
+from PySide6 import QtCore, QtGui, QtWidgets
+
+DIFF_COLORS = {
+    'removed': QtGui.QColor(230, 40, 40),
+    'added': QtGui.QColor(40, 190, 60),
+    'moved': QtGui.QColor(255, 150, 0),
+}
+
+class DiffOverlay:
+    """Pre-built paths for a tile diff (old -> new), drawn by both DiffOverlayItem and the PreviewWidget."""
+
+    def __init__(self, diffs, old_layers, new_layers):
+        self.tri_paths = {kind: QtGui.QPainterPath() for kind in DIFF_COLORS}
+        self.points = {kind: QtGui.QPolygonF() for kind in DIFF_COLORS}
+
+        def add_tri(kind, pts, tri):
+            a, b, c = (QtCore.QPointF(*pts[v]) for v in tri)
+            path = self.tri_paths[kind]
+            path.moveTo(a); path.lineTo(b); path.lineTo(c); path.closeSubpath()
+
+        for diff, (old_pts, old_tris), (new_pts, new_tris) in zip(diffs, old_layers, new_layers):
+            for ti in diff.removed_triangles:
+                add_tri('removed', old_pts, old_tris[ti])
+            for ti in diff.added_triangles:
+                add_tri('added', new_pts, new_tris[ti])
+            for vi in diff.removed_vertices:
+                self.points['removed'].append(QtCore.QPointF(*old_pts[vi]))
+            for vi in diff.added_vertices:
+                self.points['added'].append(QtCore.QPointF(*new_pts[vi]))
+            for oi, ni in diff.moved_vertices:
+                old_p, new_p = QtCore.QPointF(*old_pts[oi]), QtCore.QPointF(*new_pts[ni])
+                self.tri_paths['moved'].moveTo(old_p)
+                self.tri_paths['moved'].lineTo(new_p)
+                self.points['moved'].append(new_p)
+
+    def bounding_rect(self) -> QtCore.QRectF:
+        rect = QtCore.QRectF()
+        for kind in DIFF_COLORS:
+            rect = rect.united(self.tri_paths[kind].boundingRect()).united(self.points[kind].boundingRect())
+        return rect
+
+    def paint(self, p: QtGui.QPainter, T: Optional[QtGui.QTransform] = None, cosmetic: bool = True):
+        '''
+        Draw all changes. T maps world -> device if the painter isn't already in world coordinates.
+        '''
+
+        for kind, color in DIFF_COLORS.items():
+            path = self.tri_paths[kind]
+            points = self.points[kind]
+            if T is not None:
+                path = T.map(path)
+                points = T.map(points)
+
+            line_pen = QtGui.QPen(color, 2, QtCore.Qt.DashLine if kind == 'removed' else QtCore.Qt.SolidLine)
+            line_pen.setCosmetic(cosmetic)
+            p.setPen(line_pen)
+            p.setBrush(QtGui.QColor(color.red(), color.green(), color.blue(), 70) if kind != 'moved' else QtCore.Qt.NoBrush)
+            p.drawPath(path)
+
+            point_pen = QtGui.QPen(color, 8, QtCore.Qt.SolidLine, QtCore.Qt.RoundCap)
+            point_pen.setCosmetic(cosmetic)
+            p.setPen(point_pen)
+            p.drawPoints(points)
+
+
+class DiffOverlayItem(QtWidgets.QGraphicsItem):
+    """Shows a DiffOverlay in the editor scene, above the meshes."""
+
+    def __init__(self, overlay: DiffOverlay):
+        super().__init__()
+        self.overlay = overlay
+        self._rect = overlay.bounding_rect().adjusted(-10, -10, 10, 10)
+        self.setZValue(9000)
+        self.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+
+    def boundingRect(self):
+        return self._rect
+
+    def paint(self, p, opt, w):
+        self.overlay.paint(p)
@@ -1,21 +1,57 @@
-from PySide6 import QtCore, QtGui, QtWidgets
+from typing import Optional
+
+from ..utility import PROFILER
+
+from PySide6 import QtCore, QtGui, QtWidgets, Shiboken
+
+import time
 
 class EditorView(QtWidgets.QGraphicsView):
 
     deletePressed = QtCore.Signal()
     sceneMouseMoved = QtCore.Signal(QtCore.QPointF)
     sceneLeftClicked = QtCore.Signal(QtCore.QPointF)
+    zoomChanged = QtCore.Signal(float)
+
+    # selection gestures, in scene coords, with the keyboard modifiers held at release
+    rectSelected = QtCore.Signal(QtCore.QRectF, object)
+    lassoSelected = QtCore.Signal(QtGui.QPolygonF, object)
+    pointClicked = QtCore.Signal(QtCore.QPointF, object)
+    pointDoubleClicked = QtCore.Signal(QtCore.QPointF, object)
 
     def __init__(self, scene):
         super().__init__(scene)
         self.setRenderHints(QtGui.QPainter.Antialiasing)
-        self.setDragMode(QtWidgets.QGraphicsView.RubberBandDrag)
+        self.setDragMode(QtWidgets.QGraphicsView.NoDrag)
         self.setViewportUpdateMode(QtWidgets.QGraphicsView.FullViewportUpdate)
         self.setTransformationAnchor(QtWidgets.QGraphicsView.AnchorUnderMouse)
 
+        # 'rect' / 'lasso' drag on empty space, None disables selection gestures (e.g: while adding vertices)
+        self.selection_tool: Optional[str] = 'rect'
+        self._press_pos: Optional[QtCore.QPoint] = None
+        self._gesture: list[QtCore.QPoint] = []
+        self._gesture_item: Optional[QtWidgets.QGraphicsPathItem] = None
+
+    def view_scale(self) -> float:
+        # screen pixels per scene unit
+        return self.transform().m11()
+
+    def fit_tile(self):
+        self.resetTransform()
+        self.fitInView(QtCore.QRectF(-500, -500, 1000, 1000), QtCore.Qt.KeepAspectRatio)
+        self.zoomChanged.emit(self.view_scale())
+
+    def paintEvent(self, e):
+        if not PROFILER.enabled:
+            return super().paintEvent(e)
+        start = time.perf_counter()
+        super().paintEvent(e)
+        PROFILER.paint('EditorView.paint', start, time.perf_counter())
+
     def wheelEvent(self, e):
         factor = 1.15 if e.angleDelta().y() > 0 else 1/1.15
         self.scale(factor, factor)
+        self.zoomChanged.emit(self.view_scale())
 
     def keyPressEvent(self, e):
         if e.key() in (QtCore.Qt.Key_Delete, QtCore.Qt.Key_Backspace):
@@ -23,11 +59,76 @@ class EditorView(QtWidgets.QGraphicsView):
         else:
             super().keyPressEvent(e)
 
+    def _starts_gesture(self, pos: QtCore.QPoint) -> bool:
+        # dragging an editable handle moves it, anything else starts a selection gesture
+        if self.selection_tool is None:
+            return False
+        # not itemAt(): the topmost item is usually a full-tile overlay, look through it
+        return not any(i.flags() & QtWidgets.QGraphicsItem.ItemIsMovable for i in self.items(pos))
+
+    def _gesture_path(self) -> QtGui.QPainterPath:
+        if self.selection_tool == 'lasso':
+            path = QtGui.QPainterPath()
+            path.addPolygon(self.mapToScene(QtGui.QPolygon(self._gesture)))
+            path.closeSubpath()
+            return path
+        path = QtGui.QPainterPath()
+        path.addPolygon(self.mapToScene(QtCore.QRect(self._press_pos, self._gesture[-1]).normalized()))
+        return path
+
+    def _update_gesture_item(self):
+        if self._gesture_item is None:
+            self._gesture_item = QtWidgets.QGraphicsPathItem()
+            pen = QtGui.QPen(QtGui.QColor(255, 140, 0), 1, QtCore.Qt.DashLine)
+            pen.setCosmetic(True)
+            self._gesture_item.setPen(pen)
+            self._gesture_item.setBrush(QtGui.QColor(255, 140, 0, 30))
+            self._gesture_item.setZValue(9999)
+            self.scene().addItem(self._gesture_item)
+        self._gesture_item.setPath(self._gesture_path())
+
+    def _end_gesture(self):
+        if self._gesture_item is not None and Shiboken.isValid(self._gesture_item) and self._gesture_item.scene() is self.scene():
+            self.scene().removeItem(self._gesture_item)
+        self._gesture_item = None
+        self._press_pos = None
+        self._gesture = []
+
     def mouseMoveEvent(self, e):
         super().mouseMoveEvent(e)
-        self.sceneMouseMoved.emit(self.mapToScene(e.position().toPoint()))
+        pos = e.position().toPoint()
+        if self._press_pos is not None and (self._gesture or (pos - self._press_pos).manhattanLength() >= QtWidgets.QApplication.startDragDistance()):
+            if not self._gesture:
+                self._gesture.append(self._press_pos)
+            self._gesture.append(pos)
+            self._update_gesture_item()
+        self.sceneMouseMoved.emit(self.mapToScene(pos))
 
     def mousePressEvent(self, e):
         if e.button() == QtCore.Qt.LeftButton:
-            self.sceneLeftClicked.emit(self.mapToScene(e.position().toPoint()))
-        super().mousePressEvent(e)
\ No newline at end of file
+            pos = e.position().toPoint()
+            self.sceneLeftClicked.emit(self.mapToScene(pos))
+            self._end_gesture()
+            if self._starts_gesture(pos):
+                self._press_pos = pos
+        super().mousePressEvent(e)
+
+    def mouseReleaseEvent(self, e):
+        super().mouseReleaseEvent(e)
+        if e.button() != QtCore.Qt.LeftButton or self._press_pos is None:
+            return
+
+        modifiers = e.modifiers()
+        if not self._gesture:
+            self.pointClicked.emit(self.mapToScene(self._press_pos), modifiers)
+        elif self.selection_tool == 'lasso':
+            if len(self._gesture) >= 3:
+                self.lassoSelected.emit(self.mapToScene(QtGui.QPolygon(self._gesture)), modifiers)
+        else:
+            self.rectSelected.emit(self.mapToScene(QtCore.QRect(self._press_pos, self._gesture[-1]).normalized()).boundingRect(), modifiers)
+        self._end_gesture()
+
+    def mouseDoubleClickEvent(self, e):
+        if e.button() == QtCore.Qt.LeftButton and self._starts_gesture(e.position().toPoint()):
+            self.pointDoubleClicked.emit(self.mapToScene(e.position().toPoint()), e.modifiers())
+        super().mouseDoubleClickEvent(e)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from ..model import MeshModel
+from ...utility import PROFILER
 
-from PySide6 import QtGui, QtWidgets
+from PySide6 import QtCore, QtGui, QtWidgets
 
 class TriangleItem(QtWidgets.QGraphicsPathItem):
     def __init__(self, model: MeshModel, tri_index: int, color: QtGui.QColor):
@@ -15,14 +16,26 @@ class TriangleItem(QtWidgets.QGraphicsPathItem):
         pen = QtGui.QPen(pen_color, 4)
         pen.setCosmetic(True)  
 
+        self._outline_pen = pen
         self.setPen(pen)
         self.setBrush(QtGui.QBrush(QtGui.QColor(color.red(), color.green(), color.blue(), 90)))
         self.setZValue(1)
-        self.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
         self.model.changed.connect(self.rebuild_path)
         self.rebuild_path()
 
+    def setOutlined(self, on: bool):
+        # zoomed out views skip the outline, fill only
+        self.setPen(self._outline_pen if on else QtGui.QPen(QtCore.Qt.NoPen))
+
+    def detach(self):
+        # disconnect model hooks before the item gets removed / deleted
+        try:
+            self.model.changed.disconnect(self.rebuild_path)
+        except (TypeError, RuntimeError):
+            pass
+
     def rebuild_path(self):
+        PROFILER.count('TriangleItem.rebuild_path')
         tris = self.model.triangles()
         if self.tri_index >= len(tris):
             self.setPath(QtGui.QPainterPath()); return
@@ -27,15 +27,21 @@ class VertexItem(QtCore.QObject, QtWidgets.QGraphicsEllipseItem):
         self.setBrush(self._default_brush)
         self.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, True)
         self.setFlag(QtWidgets.QGraphicsItem.ItemSendsGeometryChanges, True)
-        self.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
         self.setZValue(10)
 
         self.model = model
         self.index = index
-        self.setPos(model.points()[index])
+        self._syncing = False
+        self.sync_from_model()
+
+    def sync_from_model(self):
+        # follow the model without writing the position back into it (no changed storm)
+        self._syncing = True
+        self.setPos(self.model.points()[self.index])
+        self._syncing = False
 
     def itemChange(self, change, value):
-        if change == QtWidgets.QGraphicsItem.ItemPositionChange:
+        if change == QtWidgets.QGraphicsItem.ItemPositionChange and not self._syncing:
             self.model.set_point(self.index, value)
         return super().itemChange(change, value)
 
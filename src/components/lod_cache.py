@@ -0,0 +1,41 @@
+from .model import MeshModel
+from .tile_renderer import TileRenderer, TILE_RECT
+from ..constants import LOD_CACHE_SIZE
+
+from PySide6 import QtCore, QtGui, QtWidgets
+
+class LodCacheItem(QtWidgets.QGraphicsItem):
+    """Far zoom stand-in for all triangle items: the whole tile pre-rendered into one image, re-rendered lazily after edits."""
+
+    def __init__(self, models: list[MeshModel], colors: list[QtGui.QColor]):
+        super().__init__()
+        self.setZValue(1)
+        self.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+
+        self.renderer = TileRenderer(models, colors)
+        self._image = None
+
+        for m in models:
+            m.changed.connect(self.invalidate)
+
+    def set_layer_state(self, visible: list[bool], opacity: list[float]):
+        if visible == self.renderer.visible and opacity == self.renderer.opacity:
+            return
+        self.renderer.visible = list(visible)
+        self.renderer.opacity = list(opacity)
+        self.invalidate()
+
+    def invalidate(self):
+        self._image = None
+        if self.isVisible():
+            self.update()
+
+    def boundingRect(self):
+        return TILE_RECT
+
+    def paint(self, p, opt, w):
+        if self._image is None:
+            self._image = self.renderer.render_image(LOD_CACHE_SIZE, draw_border=False)
+
+        p.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+        p.drawImage(TILE_RECT, self._image)
@@ -1,18 +1,35 @@
+from typing import Optional
+
 from .model import MeshModel
 from .grid_background import GridBackground
 from .preview_overlay import PreviewOverlay
 from .editor_view import EditorView
 from .preview_widget import PreviewWidget
+from .lod_cache import LodCacheItem
+from .diff_overlay import DiffOverlay, DiffOverlayItem
+from .transform_preview import TransformPreviewItem
+from .selection import SelectionModel
+from .selection_highlight import SelectionHighlightItem
 from .items import VertexItem
 from .items import TriangleItem
-from ..utility import darklight_from_lightcolor, snap_point
+from ..utility import darklight_from_lightcolor, snap_point, profiled, transform_coords
 from ..constants import RENDER_ORDER, SNAP_AMOUNTS, LAYER_COLORS
+from ..constants import LOD_HANDLE_MIN_SPACING, LOD_OUTLINE_MIN_SPACING, LOD_CACHE_TRI_DENSITY, LOD_HYSTERESIS
+
+import math
+import threading
+
+import numpy as np
 
 from PySide6 import QtCore, QtGui, QtWidgets, Shiboken
 
-from sw_ducky import MapGeometry
+from ..tools import load_tile_models, model_layers, set_model_layers, EditJournal, TileCache
+from ..tools import diff_tiles, merge_tiles, stitch_tile, BOOLEAN_OPS, check_containment, enforce_containment
+from ..tools import import_raster
 
 class Main(QtWidgets.QWidget):
+    layerJobFinished = QtCore.Signal(object) # report lines of a background layer job
+    _layerJobDone = QtCore.Signal(object)    # worker thread -> gui thread
 
     def __init__(self):
         super().__init__()
@@ -23,6 +40,10 @@ class Main(QtWidgets.QWidget):
         self.models: list[MeshModel] = [MeshModel() for _ in range(11)]
         self.active_mesh = 0
 
+        # hidden layers have no scene items at all, locked layers are view-only
+        self.layer_visible = [True] * 11
+        self.layer_locked = [False] * 11
+
         # Scene & view
         self.scene = QtWidgets.QGraphicsScene()
         self.scene.addItem(GridBackground(self.current_snap_value))
@@ -30,6 +51,13 @@ class Main(QtWidgets.QWidget):
         self.overlay = PreviewOverlay(self)
         self.scene.addItem(self.overlay)
 
+        # Level of detail: far zoom draws every layer from one cached image
+        self.lod_cache = LodCacheItem(self.models, LAYER_COLORS)
+        self.lod_cache.setVisible(False)
+        self.scene.addItem(self.lod_cache)
+        self._lod_far = False
+        self._lod_state: list = [None] * 11 # per layer (handles, outlines, triangles) currently applied
+
         self.ghost_item = QtWidgets.QGraphicsEllipseItem(-6, -6, 12, 12)
         ghost_pen = QtGui.QPen(QtGui.QColor(20, 20, 20, 180), 1)
         ghost_pen.setCosmetic(True)
@@ -40,6 +68,11 @@ class Main(QtWidgets.QWidget):
         self.ghost_item.setFlag(QtWidgets.QGraphicsItem.ItemIgnoresTransformations, True)  # stays constant size
         self.scene.addItem(self.ghost_item)
 
+        # Selection lives in the models' index space, drawn by one item for every layer
+        self.selection = SelectionModel(self.models)
+        self.selection_item = SelectionHighlightItem(self.selection, self.layer_visible)
+        self.scene.addItem(self.selection_item)
+
         self.adding_vertex = False
 
         # re-add border
@@ -57,6 +90,11 @@ class Main(QtWidgets.QWidget):
 
         self.editor.sceneMouseMoved.connect(self._on_scene_mouse_moved)
         self.editor.sceneLeftClicked.connect(self._on_scene_left_clicked)
+        self.editor.zoomChanged.connect(self._apply_lod)
+        self.editor.rectSelected.connect(lambda rect, mods: self._select_area(self.selection.select_rect, rect, mods))
+        self.editor.lassoSelected.connect(lambda poly, mods: self._select_area(self.selection.select_lasso, poly, mods))
+        self.editor.pointClicked.connect(self._on_scene_point_clicked)
+        self.editor.pointDoubleClicked.connect(self._on_scene_point_double_clicked)
 
         # Right preview shows all meshes
         self.preview = PreviewWidget(self.models, LAYER_COLORS)
@@ -85,59 +123,176 @@ class Main(QtWidgets.QWidget):
 
         self.editor.deletePressed.connect(self.delete_selected)
 
-        self.update_displayed_mesh_info()
+        # Tile comparison overlay (editor item + preview), None when not comparing
+        self.diff_item = None
 
-    def open_bin_file(self, file_path: str):
+        # Selection transform in progress (preview item + vertex indices of the active mesh)
+        self.transform_item = None
+        self._transform_indices: list[int] = []
 
-        self.clear()
+        # Background layer job (booleans / containment), one at a time
+        self._layer_job: Optional[threading.Thread] = None
+        self._layerJobDone.connect(self._on_layer_job_done)
 
-        map_geo = MapGeometry.from_file(file_path)
+        # Bumped by every edit / tile change, a layer job that started on an older generation is stale
+        self._edit_generation = 0
+        for model in self.models:
+            model.changed.connect(self._bump_edit_generation)
 
-        for index, key in enumerate(RENDER_ORDER):
+        # Copied (points, triangles), kept across file opens so it can be pasted into other tiles
+        self.clipboard = None
 
-            for x, y in map_geo.terrain_vertices[key]:
-                self._add_vertex_item(index, QtCore.QPointF(x, y))
-            
-            for t in map_geo.terrain_tris[key]:
-                self.models[index].add_triangle(*t)
-                self._add_triangle_item(index)
+        # Decoded tiles, reopening an unchanged file skips parsing
+        self.tile_cache = TileCache()
+
+        # Autosave journal, only records once started (see MainWindow)
+        self.journal = EditJournal()
+        self._compact_timer = QtCore.QTimer(self)
+        self._compact_timer.setInterval(30000)
+        self._compact_timer.timeout.connect(lambda: self.journal.maybe_compact(self.models, force=True))
+        self._compact_timer.start()
 
-        # ensure interactivity states reflect active mesh
-        self._apply_active_mesh_flags()
         self.update_displayed_mesh_info()
 
+    @profiled('Main.open_bin_file')
+    def open_bin_file(self, file_path: str):
+
+        # Parse first, so a broken file doesn't wipe the current meshes
+        load_tile_models(file_path, self.models, cache=self.tile_cache)
+        self._bump_edit_generation()
+
+        # rebuild all items (also re-applies the active mesh flags)
+        self.tri_buffer.clear()
+        self.selection.clear()
+        self._rebuild_scene_all()
+
+        if self.journal.active:
+            self.journal.start(self.models)
+
+    def recover_session(self) -> bool:
+        # Load whatever the autosave journal has from the last session
+        if not self.journal.recover(self.models):
+            return False
+        self._bump_edit_generation()
+        self.tri_buffer.clear()
+        self.selection.clear()
+        self._rebuild_scene_all()
+        return True
+
     def clear(self):
 
         for model in self.models:
 
             model.clear()
 
+        self.selection.clear()
         self._rebuild_scene_all()
 
     # ---- helpers to add items ----
     def _add_vertex_item(self, mesh_idx: int, p: QtCore.QPointF):
         idx = self.models[mesh_idx].add_point(p)
-        color = LAYER_COLORS[mesh_idx]
-        it = VertexItem(self.models[mesh_idx], idx, color)
-        it.clicked.connect(lambda i, m=mesh_idx: self._on_vertex_clicked(m, i))
-        it.dragFinished.connect(self._on_vertex_drag_finished)
-        self.scene.addItem(it)
-        self.mesh_vertex_items[mesh_idx].append(it)
+        self.journal.vertex_added(mesh_idx, p)
+        it = None
+        if self.layer_visible[mesh_idx]:
+            it = self._make_vertex_item(mesh_idx, idx)
+            self._apply_mesh_flags(mesh_idx, [it], [])
+            self._apply_lod_to(mesh_idx, [it], [])
 
         self.update_displayed_mesh_info()
 
         return it
 
     def _add_triangle_item(self, mesh_idx: int):
-        tri_idx = len(self.models[mesh_idx].triangles()) - 1
+        if self.layer_visible[mesh_idx]:
+            tri_idx = len(self.models[mesh_idx].triangles()) - 1
+            it = self._make_triangle_item(mesh_idx, tri_idx)
+            self._apply_mesh_flags(mesh_idx, [], [it])
+            self._apply_lod_to(mesh_idx, [], [it])
+
+        self.update_displayed_mesh_info()
+
+    def _make_vertex_item(self, mesh_idx: int, idx: int) -> VertexItem:
+        it = VertexItem(self.models[mesh_idx], idx, LAYER_COLORS[mesh_idx])
+        it.clicked.connect(lambda i, m=mesh_idx: self._on_vertex_clicked(m, i))
+        it.dragFinished.connect(self._on_vertex_drag_finished)
+        self.scene.addItem(it)
+        self.mesh_vertex_items[mesh_idx].append(it)
+        return it
+
+    def _make_triangle_item(self, mesh_idx: int, tri_idx: int) -> TriangleItem:
         it = TriangleItem(self.models[mesh_idx], tri_idx, LAYER_COLORS[mesh_idx])
         self.scene.addItem(it)
         self.mesh_triangle_items[mesh_idx].append(it)
+        return it
 
-        self.update_displayed_mesh_info()
+    def _build_layer_items(self, mesh_idx: int):
+        # triangles then verts ...
+        for tri_idx in range(len(self.models[mesh_idx].triangles())):
+            self._make_triangle_item(mesh_idx, tri_idx)
+
+        for idx in range(len(self.models[mesh_idx].points())):
+            self._make_vertex_item(mesh_idx, idx)
+
+    def _remove_layer_items(self, mesh_idx: int):
+        for it in self.mesh_triangle_items[mesh_idx]:
+            it.detach()
+            if it.scene() is self.scene:
+                self.scene.removeItem(it)
+        for it in self.mesh_vertex_items[mesh_idx]:
+            if it.scene() is self.scene:
+                self.scene.removeItem(it)
+
+        self.mesh_triangle_items[mesh_idx].clear()
+        self.mesh_vertex_items[mesh_idx].clear()
+
+    # ---- layer visibility / locking ----
+    def layer_editable(self, mesh_idx: int) -> bool:
+        return self.layer_visible[mesh_idx] and not self.layer_locked[mesh_idx]
+
+    def set_layer_visible(self, mesh_idx: int, visible: bool):
+        if self.layer_visible[mesh_idx] == visible:
+            return
+        self.layer_visible[mesh_idx] = visible
+
+        if mesh_idx == self.active_mesh:
+            self._clear_tri_buffer()
+
+        if visible:
+            self._build_layer_items(mesh_idx)
+            self._apply_mesh_flags(mesh_idx)
+        else:
+            self._remove_layer_items(mesh_idx)
+        self._lod_state[mesh_idx] = None
+        self._apply_lod()
+
+        self.selection_item.invalidate()
+        self.preview.set_layer_visible(mesh_idx, visible)
+        self._sync_layer_menus()
+
+    def set_layer_locked(self, mesh_idx: int, locked: bool):
+        if self.layer_locked[mesh_idx] == locked:
+            return
+        self.layer_locked[mesh_idx] = locked
+
+        if mesh_idx == self.active_mesh:
+            self._clear_tri_buffer()
+
+        self._apply_mesh_flags(mesh_idx)
+        self._sync_layer_menus()
+
+    def _clear_tri_buffer(self):
+        for v_idx in self.tri_buffer:
+            if v_idx < len(self.mesh_vertex_items[self.active_mesh]):
+                self.mesh_vertex_items[self.active_mesh][v_idx].setTriPickSelected(False)
+        self.tri_buffer.clear()
 
     def _on_vertex_clicked(self, mesh_idx: int, idx: int):
-        if not self.tri_mode or mesh_idx != self.active_mesh:
+        if mesh_idx != self.active_mesh or not self.layer_editable(mesh_idx):
+            return
+        if not self.tri_mode:
+            mode = self._selection_mode(QtWidgets.QApplication.keyboardModifiers())
+            if mode != 'replace' or not self.selection.vertex_mask(mesh_idx)[idx]:
+                self.selection.select_vertices(mesh_idx, [idx], mode)
             return
         if idx in self.tri_buffer:
             self.tri_buffer.remove(idx)
@@ -150,6 +305,7 @@ class Main(QtWidgets.QWidget):
         if len(self.tri_buffer) == 3:
             i, j, k = self.tri_buffer
             self.models[mesh_idx].add_triangle(i, j, k)
+            self.journal.triangle_added(mesh_idx, i, j, k)
             self._add_triangle_item(mesh_idx)
             for v_idx in self.tri_buffer:
                 self.mesh_vertex_items[mesh_idx][v_idx].setTriPickSelected(False)
@@ -174,6 +330,36 @@ class Main(QtWidgets.QWidget):
         self.mesh_combo.currentIndexChanged.connect(self._on_mesh_changed)
         bar.addWidget(QtWidgets.QLabel(" Active: "))
         bar.addWidget(self.mesh_combo)
+
+        # Per layer visibility / lock toggles
+        self.visible_actions: list[QtGui.QAction] = []
+        self.locked_actions: list[QtGui.QAction] = []
+
+        visible_menu = QtWidgets.QMenu(bar)
+        locked_menu = QtWidgets.QMenu(bar)
+        for mesh_idx, (mesh_name, mesh_color) in enumerate(zip(RENDER_ORDER, LAYER_COLORS)):
+            pm = QtGui.QPixmap(16, 16)
+            pm.fill(mesh_color)
+
+            visible_action = visible_menu.addAction(QtGui.QIcon(pm), mesh_name)
+            visible_action.setCheckable(True)
+            visible_action.setChecked(True)
+            visible_action.toggled.connect(lambda on, mi=mesh_idx: self.set_layer_visible(mi, on))
+            self.visible_actions.append(visible_action)
+
+            locked_action = locked_menu.addAction(QtGui.QIcon(pm), mesh_name)
+            locked_action.setCheckable(True)
+            locked_action.toggled.connect(lambda on, mi=mesh_idx: self.set_layer_locked(mi, on))
+            self.locked_actions.append(locked_action)
+
+        for text, tooltip, menu in (("Visible", "Shown layers", visible_menu), ("Locked", "Locked layers", locked_menu)):
+            button = QtWidgets.QToolButton()
+            button.setText(text)
+            button.setToolTip(tooltip)
+            button.setMenu(menu)
+            button.setPopupMode(QtWidgets.QToolButton.InstantPopup)
+            bar.addWidget(button)
+
         bar.addSeparator()
 
         self.snap_combo = QtWidgets.QComboBox()
@@ -197,6 +383,11 @@ class Main(QtWidgets.QWidget):
         make_tri.setCheckable(True)
         make_tri.setToolTip("Make Triangle")
 
+        lasso = QtGui.QAction(bar)
+        lasso.setIcon(self.style().standardIcon(QtWidgets.QStyle.SP_FileDialogContentsView))
+        lasso.setCheckable(True)
+        lasso.setToolTip("Lasso Select (drag selects a rectangle when off)")
+
         reset_view = QtGui.QAction(bar)
         reset_view.setIcon(self.style().standardIcon(QtWidgets.QStyle.SP_BrowserReload))
         reset_view.setToolTip("Reset View")
@@ -213,39 +404,38 @@ class Main(QtWidgets.QWidget):
             self.adding_vertex = checked
             self.ghost_item.setVisible(checked)
             # avoid rubberband when placing a vertex
-            self.editor.setDragMode(QtWidgets.QGraphicsView.NoDrag if checked
-                                    else QtWidgets.QGraphicsView.RubberBandDrag)
+            self.editor.selection_tool = None if checked else ('lasso' if lasso.isChecked() else 'rect')
             # normal cursor vs plus-like cursor
             self.editor.setCursor(QtCore.Qt.CrossCursor if checked else QtCore.Qt.ArrowCursor)
 
         def on_make_tri_toggled(checked):
             self.tri_mode = checked
             if not checked:
-                for v_idx in self.tri_buffer:
-                    if v_idx < len(self.mesh_vertex_items[self.active_mesh]):
-                        self.mesh_vertex_items[self.active_mesh][v_idx].setTriPickSelected(False)
-                self.tri_buffer.clear()
+                self._clear_tri_buffer()
             self._apply_active_mesh_flags()     # <- update movability immediately
             self._update_triangle_cursor(checked)
             self.overlay.update()
 
+        def on_lasso_toggled(checked):
+            if not self.adding_vertex:
+                self.editor.selection_tool = 'lasso' if checked else 'rect'
+
         def on_reset_view():
-            v = next((vw for vw in self.scene.views()), None)
-            if v:
-                rect = QtCore.QRect(-500, -500, 1000, 1000)
-                v.resetTransform()
-                v.fitInView(rect, QtCore.Qt.KeepAspectRatio)
+            self.editor.fit_tile()
             self.preview.reset_view()
             self.preview.update()
 
         add_vert.toggled.connect(on_add_vertex_toggled)
         make_tri.toggled.connect(on_make_tri_toggled)
+        lasso.toggled.connect(on_lasso_toggled)
         reset_view.triggered.connect(on_reset_view)
 
         bar.addAction(add_vert)
         bar.addSeparator()
         bar.addAction(make_tri)
         bar.addSeparator()
+        bar.addAction(lasso)
+        bar.addSeparator()
         bar.addAction(reset_view)
         bar.addSeparator()
         bar.addAction(undo)
@@ -253,13 +443,29 @@ class Main(QtWidgets.QWidget):
         bar.addAction(redo)
         return bar
     
+    def scene_item_counts(self) -> dict[str, int]:
+        # live scene items per layer (hidden layers have none)
+        return {
+            name: len(self.mesh_vertex_items[mi]) + len(self.mesh_triangle_items[mi])
+            for mi, name in enumerate(RENDER_ORDER)
+        }
+
+    def _sync_layer_menus(self):
+        for mesh_idx in range(11):
+            for action, on in ((self.visible_actions[mesh_idx], self.layer_visible[mesh_idx]),
+                               (self.locked_actions[mesh_idx], self.layer_locked[mesh_idx])):
+                if action.isChecked() != on:
+                    action.blockSignals(True)
+                    action.setChecked(on)
+                    action.blockSignals(False)
+
     def update_displayed_mesh_info(self):
         # Update the displayed info on vertex / edge count to the gui
 
         for mesh_index in range(11):
 
-            num_verts = len(self.mesh_vertex_items[mesh_index])
-            num_tris  = len(self.mesh_triangle_items[mesh_index])
+            num_verts = len(self.models[mesh_index].points())
+            num_tris  = len(self.models[mesh_index].triangles())
 
             # Update tooltip combo box to highlight empty meshes
             is_empty = (num_verts + num_tris) == 0
@@ -269,94 +475,423 @@ class Main(QtWidgets.QWidget):
     def _on_mesh_changed(self, idx: int):
         if idx == self.active_mesh:  # no-op
             return
-        # clear any partial tri selection from previous mesh
-        for v_idx in self.tri_buffer:
-            if v_idx < len(self.mesh_vertex_items[self.active_mesh]):
-                self.mesh_vertex_items[self.active_mesh][v_idx].setTriPickSelected(False)
-        self.tri_buffer.clear()
+        # clear any partial tri selection / selection from previous mesh
+        self._clear_tri_buffer()
+        self.selection.clear(self.active_mesh)
 
         self.active_mesh = idx
         self._apply_active_mesh_flags()
+        self._apply_lod()
 
     def _on_snap_changed(self, idx: int):
         self.current_snap_value = SNAP_AMOUNTS[idx]
         self._rebuild_scene_all()
 
     def _apply_active_mesh_flags(self):
-        # Active mesh items: movable/selectable; others: view-only
         for mi in range(11):
-            active = (mi == self.active_mesh)
-            movable = active and (not self.tri_mode)  # <- freeze while tri mode
-            for it in self.mesh_vertex_items[mi]:
-                it.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, movable)
-                it.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, active)
-                it.setOpacity(1.0 if active else 0.1)
-            for it in self.mesh_triangle_items[mi]:
-                it.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, active)
-                it.setOpacity(1.0 if active else 0.1)
+            self._apply_mesh_flags(mi)
+
+    def _apply_mesh_flags(self, mi: int, vertex_items=None, triangle_items=None):
+        # Active mesh items: movable/selectable; others (and locked layers): view-only
+        active = (mi == self.active_mesh)
+        editable = active and not self.layer_locked[mi]
+        movable = editable and (not self.tri_mode)  # <- freeze while tri mode
+        vertex_items = self.mesh_vertex_items[mi] if vertex_items is None else vertex_items
+        triangle_items = self.mesh_triangle_items[mi] if triangle_items is None else triangle_items
+        for it in vertex_items:
+            it.setFlag(QtWidgets.QGraphicsItem.ItemIsMovable, movable)
+            it.setOpacity(1.0 if active else 0.1)
+        for it in triangle_items:
+            it.setOpacity(1.0 if active else 0.1)
+
+    # ---- level of detail ----
+    @staticmethod
+    def _lod_detail_shown(scale: float, count: int, min_spacing: float, shown) -> bool:
+        # average on-screen spacing of count items spread over the tile, with some hysteresis
+        if count == 0:
+            return True
+        spacing = scale * 1000 / math.sqrt(count)
+        return spacing >= (min_spacing / LOD_HYSTERESIS if shown else min_spacing)
+
+    def _apply_lod(self, *_):
+        scale = self.editor.view_scale()
+        tile_px = (scale * 1000) ** 2
+
+        num_tris = sum(len(m.triangles()) for mi, m in enumerate(self.models) if self.layer_visible[mi])
+        density = num_tris / tile_px if tile_px > 0 else math.inf
+        self._lod_far = density > (LOD_CACHE_TRI_DENSITY / LOD_HYSTERESIS if self._lod_far else LOD_CACHE_TRI_DENSITY)
+
+        self.lod_cache.set_layer_state(self.layer_visible, [1.0 if mi == self.active_mesh else 0.1 for mi in range(11)])
+        self.lod_cache.setVisible(self._lod_far)
+
+        for mi in range(11):
+            if not self.layer_visible[mi]:
+                continue
+            old = self._lod_state[mi]
+            handles = not self._lod_far and self._lod_detail_shown(
+                scale, len(self.models[mi].points()), LOD_HANDLE_MIN_SPACING, old is None or old[0])
+            outlines = not self._lod_far and self._lod_detail_shown(
+                scale, len(self.models[mi].triangles()), LOD_OUTLINE_MIN_SPACING, old is None or old[1])
+            state = (handles, outlines, not self._lod_far)
+            if state == old:
+                continue
+            self._lod_state[mi] = state
+            self._apply_lod_to(mi, self.mesh_vertex_items[mi], self.mesh_triangle_items[mi])
+
+    def _apply_lod_to(self, mi: int, vertex_items, triangle_items):
+        state = self._lod_state[mi]
+        if state is None:
+            return
+        handles, outlines, triangles = state
+        for it in vertex_items:
+            it.setVisible(handles)
+        for it in triangle_items:
+            it.setVisible(triangles)
+            it.setOutlined(outlines)
+
+    # ---- compare / merge ----
+    def compare_with(self, other_layers):
+        '''
+        Show what changed from other_layers (i.e: another version of this tile) to the current meshes.
+        '''
+        self.clear_comparison()
+
+        current = model_layers(self.models)
+        diffs = diff_tiles(other_layers, current)
+
+        overlay = DiffOverlay(diffs, other_layers, current)
+        self.diff_item = DiffOverlayItem(overlay)
+        self.scene.addItem(self.diff_item)
+        self.preview.set_diff_overlay(overlay)
+
+        return diffs
+
+    def clear_comparison(self):
+        if self.diff_item is not None and Shiboken.isValid(self.diff_item) and self.diff_item.scene() is self.scene:
+            self.scene.removeItem(self.diff_item)
+        self.diff_item = None
+        self.preview.set_diff_overlay(None)
+
+    def merge_with(self, base_layers, their_layers):
+        '''
+        Three-way merge: the current meshes are "ours". Returns the conflicts (ours won those).
+        '''
+        merged, conflicts = merge_tiles(base_layers, model_layers(self.models), their_layers)
+
+        self.clear_comparison()
+        set_model_layers(self.models, merged)
+        self._bump_edit_generation()
+        for mesh_idx, model in enumerate(self.models):
+            self.journal.layer_set(mesh_idx, model)
+
+        self.tri_buffer.clear()
+        self.selection.clear()
+        self._rebuild_scene_all()
+        return conflicts
+
+    # ---- seams ----
+    def stitch_seams(self, neighbours) -> list[str]:
+        '''
+        Snap / insert border vertices so this tile matches its neighbours ({side: neighbour layers}). Returns report lines.
+        '''
+        current = model_layers(self.models)
+        stitched, report = stitch_tile(current, neighbours)
+
+        changed = [mi for mi, (old, new) in enumerate(zip(current, stitched)) if old != new]
+        if changed:
+            set_model_layers([self.models[mi] for mi in changed], [stitched[mi] for mi in changed])
+            self._bump_edit_generation()
+            for mi in changed:
+                self.journal.layer_set(mi, self.models[mi])
+            self.tri_buffer.clear()
+            self.selection.clear()
+            self._rebuild_scene_all()
+
+        return report
+
+    # ---- layer booleans / containment (worker thread) ----
+    def _bump_edit_generation(self):
+        self._edit_generation += 1
+
+    def layer_job_running(self) -> bool:
+        return self._layer_job is not None and self._layer_job.is_alive()
+
+    def run_layer_job(self, job) -> bool:
+        '''
+        Run job(layers) -> ({layer index: new layer}, report lines) on a worker thread, on a copy of the current meshes.
+        The result is applied (and layerJobFinished emitted) back on the gui thread, unless the meshes were edited or another
+        tile was opened in the meantime. Returns False if a job is already running.
+        '''
+        if self.layer_job_running():
+            return False
+
+        layers = model_layers(self.models)
+        generation = self._edit_generation
+
+        def work():
+            try:
+                result = job(layers)
+            except Exception as e:
+                result = e
+            self._layerJobDone.emit((generation, result))
+
+        self._layer_job = threading.Thread(target=work, name='layer-job', daemon=True)
+        self._layer_job.start()
+        return True
+
+    def _on_layer_job_done(self, done):
+        self._layer_job = None
+        generation, result = done
+        if isinstance(result, Exception):
+            self.layerJobFinished.emit([f"Failed: {result}"])
+            return
+        if generation != self._edit_generation:
+            # the result was computed from meshes that no longer exist, applying it would undo the edits made since
+            self.layerJobFinished.emit(["Tile changed while the job was running, job discarded"])
+            return
 
+        changed, report = result
+        if changed:
+            set_model_layers([self.models[mi] for mi in changed], list(changed.values()))
+            for mi in changed:
+                self.journal.layer_set(mi, self.models[mi])
+            self.tri_buffer.clear()
+            self.selection.clear()
+            self._rebuild_scene_all()
+
+        self.layerJobFinished.emit(report)
+
+    def boolean_layers(self, op: str, target: int, operand: int) -> bool:
+        '''
+        target = target <op> operand, op being one of BOOLEAN_OPS (union / difference / intersection / clip).
+        '''
+        fn = BOOLEAN_OPS[op]
+
+        def job(layers):
+            result = fn(layers[target], layers[operand])
+            return {target: result}, [f"{RENDER_ORDER[target]} {op} {RENDER_ORDER[operand]}: {len(result[1])} triangles"]
+
+        return self.run_layer_job(job)
+
+    def check_layer_containment(self) -> bool:
+        def job(layers):
+            violations = check_containment(layers)
+            return {}, [f"{RENDER_ORDER[c]}: {area:.3f} outside {RENDER_ORDER[p]}" for c, p, area in violations]
+
+        return self.run_layer_job(job)
+
+    def enforce_layer_containment(self) -> bool:
+        def job(layers):
+            new_layers, report = enforce_containment(layers)
+            return {mi: new for mi, (old, new) in enumerate(zip(layers, new_layers)) if old is not new}, report
+
+        return self.run_layer_job(job)
+
+    def import_raster_layers(self, file_path: str, kind: str) -> bool:
+        '''
+        Replace layers with the ones traced from a material map / heightmap (kind is one of RASTER_KINDS), in the background.
+        A heightmap describes the whole terrain, so layers without a height band are cleared.
+        '''
+        def job(layers):
+            imported = import_raster(file_path, kind)
+            report = []
+            for mi in range(len(layers)):
+                if mi in imported:
+                    report.append(f"{RENDER_ORDER[mi]}: {len(imported[mi][1])} triangles")
+                else:
+                    imported[mi] = ([], [])
+                    report.append(f"{RENDER_ORDER[mi]}: cleared (no height band)")
+            return imported, report
+
+        return self.run_layer_job(job)
+
+    # ---- selection transforms / clipboard ----
+    def selected_vertex_indices(self, mesh_idx: int) -> list[int]:
+        '''
+        Selected vertices of a mesh, including the corners of selected triangles.
+        '''
+        return self.selection.touched_vertices(mesh_idx).tolist()
+
+    def begin_transform(self) -> Optional[QtCore.QPointF]:
+        '''
+        Start previewing a transform of the active mesh's selection. Returns the pivot (selection center), or None if there is nothing to transform.
+        '''
+        self.cancel_transform()
+        mi = self.active_mesh
+        if not self.layer_editable(mi):
+            return None
+        indices = self.selected_vertex_indices(mi)
+        if not indices:
+            return None
+
+        self._transform_indices = indices
+        self.transform_item = TransformPreviewItem(self.models[mi], indices, LAYER_COLORS[mi])
+        self.scene.addItem(self.transform_item)
+
+        pts = self.models[mi].points()
+        xs = [pts[i].x() for i in indices]
+        ys = [pts[i].y() for i in indices]
+        return QtCore.QPointF((min(xs) + max(xs)) / 2, (min(ys) + max(ys)) / 2)
+
+    def preview_transform(self, T: QtGui.QTransform):
+        if self.transform_item is not None:
+            self.transform_item.set_transform(T, self.current_snap_value)
+
+    def cancel_transform(self):
+        if self.transform_item is not None and Shiboken.isValid(self.transform_item) and self.transform_item.scene() is self.scene:
+            self.scene.removeItem(self.transform_item)
+        self.transform_item = None
+        self._transform_indices = []
+
+    @profiled('Main.apply_transform')
+    def apply_transform(self, T: QtGui.QTransform, indices: Optional[list[int]] = None):
+        '''
+        Move / rotate / scale / mirror vertices of the active mesh (default: the ones from begin_transform, else the selection) in one model update.
+        '''
+        mi = self.active_mesh
+        if indices is None:
+            indices = self._transform_indices or self.selected_vertex_indices(mi)
+        self.cancel_transform()
+        if not indices or not self.layer_editable(mi):
+            return
+
+        model = self.models[mi]
+        pts = model.points()
+        coords = np.array([(pts[i].x(), pts[i].y()) for i in indices], dtype=np.float64)
+        new_coords = transform_coords(coords, T, self.current_snap_value).tolist()
+
+        model.set_points(indices, new_coords)
+
+        vertex_items = self.mesh_vertex_items[mi]
+        for i in indices:
+            if i < len(vertex_items):
+                vertex_items[i].sync_from_model()
+            self.journal.vertex_moved(mi, i, pts[i])
+
+    def copy_selection(self) -> int:
+        '''
+        Copy the active mesh's selected vertices, plus the triangles fully inside the selection. Returns the number of vertices copied.
+        '''
+        mi = self.active_mesh
+        indices = self.selected_vertex_indices(mi)
+        if not indices:
+            return 0
+
+        model = self.models[mi]
+        pts = model.points()
+        remap = {v: i for i, v in enumerate(indices)}
+        self.clipboard = (
+            [(pts[v].x(), pts[v].y()) for v in indices],
+            [tuple(remap[v] for v in tri) for tri in model.triangles() if all(v in remap for v in tri)],
+        )
+        return len(indices)
+
+    @profiled('Main.paste')
+    def paste(self) -> list[int]:
+        '''
+        Paste the clipboard into the active mesh, at the same tile coordinates. The pasted vertices end up selected, ready to be transformed.
+        '''
+        mi = self.active_mesh
+        if self.clipboard is None or not self.layer_editable(mi):
+            return []
+
+        coords, tris = self.clipboard
+        model = self.models[mi]
+        first_tri = len(model.triangles())
+        offset = model.extend(coords, tris)
+        new_indices = list(range(offset, len(model.points())))
+
+        pts = model.points()
+        for i in new_indices:
+            self.journal.vertex_added(mi, pts[i])
+        for i, j, k in model.triangles()[first_tri:]:
+            self.journal.triangle_added(mi, i, j, k)
+
+        tri_items = [self._make_triangle_item(mi, t) for t in range(first_tri, len(model.triangles()))]
+        vertex_items = [self._make_vertex_item(mi, i) for i in new_indices]
+        self._apply_mesh_flags(mi, vertex_items, tri_items)
+        self._apply_lod_to(mi, vertex_items, tri_items)
+
+        self.selection.select_vertices(mi, new_indices)
+
+        self.update_displayed_mesh_info()
+        return new_indices
+
+    @profiled('Main.delete_selected')
     def delete_selected(self):
-        selected_items = self.scene.selectedItems()
-        if not selected_items:
+        # like the transforms and the clipboard, only the active mesh is edited (and only if it is editable)
+        mi = self.active_mesh
+        if not self.layer_editable(mi) or not self.selection.has_selection(mi):
             return
 
-        # Collect removals per model
-        verts_to_remove: dict[MeshModel, set[int]] = {}
-        tris_to_remove:  dict[MeshModel, set[int]] = {}
-
-        def ensure(d, m): d.setdefault(m, set())
-
-        for it in selected_items:
-            if isinstance(it, VertexItem):
-                ensure(verts_to_remove, it.model)
-                verts_to_remove[it.model].add(it.index)
-
-            elif isinstance(it, TriangleItem):
-                ensure(tris_to_remove, it.model)
-                tris_to_remove[it.model].add(it.tri_index)
-                # disconnect triangle hooks before nuking
-                try:
-                    it.model.changed.disconnect(it.rebuild_path)
-                except (TypeError, RuntimeError):
-                    pass
-
-        # also remove any triangles referencing removed vertices
-        for m in self.models:
-            if m not in verts_to_remove: continue # there are no vertices to remove, continue
-            vset = verts_to_remove[m]
-            for tri_idx, tri in enumerate(m.triangles()):
-                if any(v in vset for v in tri):
-                    ensure(tris_to_remove, m); tris_to_remove[m].add(tri_idx)
-
-        # Rebuild each affected model, then rebuild scene (all meshes, simpler & safe)
-        for m in set(list(verts_to_remove.keys()) + list(tris_to_remove.keys())):
-            old_pts = m.points()
-            old_tris = m.triangles()
-            vset = verts_to_remove.get(m, set())
-            tset = tris_to_remove.get(m, set())
-
-            idx_map = {}
-            new_pts = []
-            for old_idx, pt in enumerate(old_pts):
-                if old_idx not in vset:
-                    idx_map[old_idx] = len(new_pts)
-                    new_pts.append(pt)
-
-            new_tris = []
-            for old_idx, tri in enumerate(old_tris):
-                if old_idx in tset: continue
-                try:
-                    new_tris.append(tuple(idx_map[v] for v in tri))
-                except KeyError:
-                    pass
-
-            m._pts = new_pts
-            m._tris = new_tris
-            m.changed.emit()
+        # Rebuild the model (triangles referencing removed vertices go too), then rebuild scene (all meshes, simpler & safe)
+        self._bump_edit_generation()
+        vset = set(self.selection.vertex_indices(mi).tolist())
+        tset = set(self.selection.triangle_indices(mi).tolist())
+        self.journal.removed(mi, vset, tset)
+        self.models[mi].remove(vset, tset)
 
         self._rebuild_scene_all()
 
+    # ---- selection ----
+    @staticmethod
+    def _selection_mode(modifiers) -> str:
+        # shift adds, ctrl toggles, alt subtracts
+        if modifiers & QtCore.Qt.AltModifier:
+            return 'subtract'
+        if modifiers & QtCore.Qt.ControlModifier:
+            return 'toggle'
+        if modifiers & QtCore.Qt.ShiftModifier:
+            return 'add'
+        return 'replace'
+
+    def _selectable(self) -> bool:
+        return not self.tri_mode and not self.adding_vertex and self.layer_editable(self.active_mesh)
+
+    @profiled('Main.select_area')
+    def _select_area(self, query, shape, modifiers):
+        if self._selectable():
+            query(self.active_mesh, shape, self._selection_mode(modifiers))
+
+    def _on_scene_point_clicked(self, scene_pt: QtCore.QPointF, modifiers):
+        if not self._selectable():
+            return
+        mi = self.active_mesh
+        mode = self._selection_mode(modifiers)
+        tri_idx = self.selection.pick_triangle(mi, scene_pt)
+        if tri_idx >= 0:
+            self.selection.select_triangles(mi, [tri_idx], mode)
+        elif mode == 'replace':
+            self.selection.clear()
+
+    def _on_scene_point_double_clicked(self, scene_pt: QtCore.QPointF, modifiers):
+        if not self._selectable():
+            return
+        tri_idx = self.selection.pick_triangle(self.active_mesh, scene_pt)
+        if tri_idx >= 0:
+            self.selection.select_connected(self.active_mesh, tri_idx, self._selection_mode(modifiers))
+
+    def select_all(self):
+        if self.layer_editable(self.active_mesh):
+            self.selection.select_all(self.active_mesh)
+
+    def invert_selection(self):
+        if self.layer_editable(self.active_mesh):
+            self.selection.invert(self.active_mesh)
+
+    def select_connected(self):
+        '''
+        Grow the active mesh's triangle selection to every triangle connected to it.
+        '''
+        if self.layer_editable(self.active_mesh):
+            self.selection.grow_connected(self.active_mesh)
+
+    def clear_selection(self):
+        self.selection.clear()
+
+    @profiled('Main._rebuild_scene_all')
     def _rebuild_scene_all(self):
+        self.cancel_transform()
 
         overlay = None
         if getattr(self, "overlay", None) and Shiboken.isValid(self.overlay):
@@ -364,33 +899,44 @@ class Main(QtWidgets.QWidget):
                 self.scene.removeItem(self.overlay)
             overlay = self.overlay
 
+        lod_cache = None
+        if getattr(self, "lod_cache", None) and Shiboken.isValid(self.lod_cache):
+            if self.lod_cache.scene() is self.scene:
+                self.scene.removeItem(self.lod_cache)
+            lod_cache = self.lod_cache
+
+        diff_item = None
+        if getattr(self, "diff_item", None) and Shiboken.isValid(self.diff_item):
+            if self.diff_item.scene() is self.scene:
+                self.scene.removeItem(self.diff_item)
+            diff_item = self.diff_item
+
+        selection_item = None
+        if getattr(self, "selection_item", None) and Shiboken.isValid(self.selection_item):
+            if self.selection_item.scene() is self.scene:
+                self.scene.removeItem(self.selection_item)
+            selection_item = self.selection_item
+
         ghost = None
         if getattr(self, "ghost_item", None) and Shiboken.isValid(self.ghost_item):
             if self.ghost_item.scene() is self.scene:
                 self.scene.removeItem(self.ghost_item)
             ghost = self.ghost_item
 
+        # disconnect triangle hooks before nuking
+        for lst in self.mesh_triangle_items:
+            for it in lst: it.detach()
+
         self.scene.clear()
 
         self.scene.addItem(GridBackground(self.current_snap_value))
         for lst in self.mesh_vertex_items: lst.clear()
         for lst in self.mesh_triangle_items: lst.clear()
 
-        # triangles then verts ...
-        for mi, m in enumerate(self.models):
-            for tri_idx, _ in enumerate(m.triangles()):
-                tri_item = TriangleItem(m, tri_idx, LAYER_COLORS[mi])
-                self.scene.addItem(tri_item)
-                self.mesh_triangle_items[mi].append(tri_item)
-
-        for mi, m in enumerate(self.models):
-            color = LAYER_COLORS[mi]
-            for idx, pt in enumerate(m.points()):
-                v_item = VertexItem(m, idx, color)
-                v_item.clicked.connect(lambda i, mesh_i=mi: self._on_vertex_clicked(mesh_i, i))
-                v_item.dragFinished.connect(self._on_vertex_drag_finished)
-                self.scene.addItem(v_item)
-                self.mesh_vertex_items[mi].append(v_item)
+        # only visible layers get items
+        for mi in range(11):
+            if self.layer_visible[mi]:
+                self._build_layer_items(mi)
 
         border_rect = QtWidgets.QGraphicsRectItem(-500, -500, 1000, 1000)
 
@@ -416,7 +962,27 @@ class Main(QtWidgets.QWidget):
             self.overlay = PreviewOverlay()
             self.scene.addItem(self.overlay)
 
+        if lod_cache and Shiboken.isValid(lod_cache):
+            self.scene.addItem(lod_cache)
+            self.lod_cache = lod_cache
+        else:
+            self.lod_cache = LodCacheItem(self.models, LAYER_COLORS)
+            self.scene.addItem(self.lod_cache)
+
+        if diff_item is not None:
+            self.scene.addItem(diff_item)
+
+        if selection_item and Shiboken.isValid(selection_item):
+            self.scene.addItem(selection_item)
+            self.selection_item = selection_item
+        else:
+            self.selection_item = SelectionHighlightItem(self.selection, self.layer_visible)
+            self.scene.addItem(self.selection_item)
+        self.selection_item.invalidate()
+
         self._apply_active_mesh_flags()
+        self._lod_state = [None] * 11
+        self._apply_lod()
         self.update_displayed_mesh_info()
 
 
@@ -432,7 +998,7 @@ class Main(QtWidgets.QWidget):
 
     def _on_scene_left_clicked(self, scene_pt: QtCore.QPointF):
         # In add-vertex mode, drop a vertex here
-        if self.adding_vertex:
+        if self.adding_vertex and self.layer_editable(self.active_mesh):
             self._add_vertex_item(self.active_mesh, snap_point(scene_pt, self.current_snap_value))
 
     def _update_triangle_cursor(self, on: bool):
@@ -463,11 +1029,9 @@ class Main(QtWidgets.QWidget):
     def _on_vertex_drag_finished(self, model: MeshModel, idx: int, dropped_pos: QtCore.QPointF):
         snapped = snap_point(dropped_pos, self.current_snap_value)
         if snapped != dropped_pos:
-            # Update model and item position. setPos will also trigger itemChange -> set_point; harmless.
+            # Update model, then let the item follow without writing back
             model.set_point(idx, snapped)
             sender = self.sender()
             if isinstance(sender, VertexItem):
-                # avoid duplicate signals while nudging into place
-                sender.blockSignals(True)
-                sender.setPos(snapped)
-                sender.blockSignals(False)
\ No newline at end of file
+                sender.sync_from_model()
+        self.journal.vertex_moved(self.models.index(model), idx, model.points()[idx])
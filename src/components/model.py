@@ -1,5 +1,32 @@
+from typing import Iterable, Optional
+
+from .topology import MeshTopology
+from ..utility import PROFILER
+
 from PySide6 import QtCore
 
+def remove_elements(pts: list, tris: list, vset: set[int], tset: set[int]) -> tuple[list, list]:
+    '''
+    Drop vertices in vset and triangles in tset from plain lists, compacting indices. Triangles which reference a removed vertex are dropped as well.
+    '''
+
+    idx_map = {}
+    new_pts = []
+    for old_idx, pt in enumerate(pts):
+        if old_idx not in vset:
+            idx_map[old_idx] = len(new_pts)
+            new_pts.append(pt)
+
+    new_tris = []
+    for old_idx, tri in enumerate(tris):
+        if old_idx in tset: continue
+        try:
+            new_tris.append(tuple(idx_map[v] for v in tri))
+        except KeyError:
+            pass
+
+    return new_pts, new_tris
+
 class MeshModel(QtCore.QObject):
     changed = QtCore.Signal()
 
@@ -8,10 +35,17 @@ class MeshModel(QtCore.QObject):
         self._pts: list[QtCore.QPointF] = []
         self._tris: list[tuple[int, int, int]] = []
 
+        # edge adjacency, only built once someone asks for it
+        self._topology: Optional[MeshTopology] = None
+
+    def _emit_changed(self):
+        PROFILER.count('MeshModel.changed')
+        self.changed.emit()
+
     # vertices
     def add_point(self, p: QtCore.QPointF) -> int:
         self._pts.append(QtCore.QPointF(p))
-        self.changed.emit()
+        self._emit_changed()
         return len(self._pts) - 1
 
     def points(self):
@@ -19,7 +53,32 @@ class MeshModel(QtCore.QObject):
 
     def set_point(self, i: int, p: QtCore.QPointF):
         self._pts[i] = QtCore.QPointF(p)
-        self.changed.emit()
+        self._emit_changed()
+
+    def set_points(self, indices: Iterable[int], coords: Iterable[tuple[float, float]]):
+        '''
+        Move many vertices at once, with a single changed emission.
+        '''
+        for i, (x, y) in zip(indices, coords):
+            self._pts[i] = QtCore.QPointF(x, y)
+        self._emit_changed()
+
+    def extend(self, coords: Iterable[tuple[float, float]], tris: Iterable[tuple[int, int, int]]) -> int:
+        '''
+        Append vertices and triangles (indices relative to the new vertices) in one go. Returns the index of the first new vertex.
+        '''
+        offset = len(self._pts)
+        self._pts.extend(QtCore.QPointF(x, y) for x, y in coords)
+        n = len(self._pts)
+        for tri in tris:
+            i, j, k = (v + offset for v in tri)
+            if len({i, j, k}) != 3 or any(idx < offset or idx >= n for idx in (i, j, k)):
+                continue
+            self._tris.append((i, j, k))
+            if self._topology is not None:
+                self._topology.add_triangle(len(self._tris) - 1, (i, j, k))
+        self._emit_changed()
+        return offset
 
     # triangles (indices into points)
     def triangles(self):
@@ -32,8 +91,105 @@ class MeshModel(QtCore.QObject):
         if any(idx < 0 or idx >= n for idx in (i, j, k)):
             return
         self._tris.append((i, j, k))
-        self.changed.emit()
-    
+        if self._topology is not None:
+            self._topology.add_triangle(len(self._tris) - 1, (i, j, k))
+        self._emit_changed()
+
+    def remove(self, vertex_indices: Iterable[int] = (), tri_indices: Iterable[int] = ()):
+        '''
+        Remove vertices and triangles, compacting indices. Triangles which reference a removed vertex are dropped as well.
+        '''
+        vset = set(vertex_indices)
+        tset = set(tri_indices)
+        if not vset and not tset:
+            return
+
+        new_pts, new_tris = remove_elements(self._pts, self._tris, vset, tset)
+
+        self._pts = new_pts
+        self._tris = new_tris
+        self._topology = None # indices all shifted, rebuild lazily
+        self._emit_changed()
+
+    def set_geometry(self, pts: Iterable[QtCore.QPointF], tris: Iterable[tuple[int, int, int]]):
+        '''
+        Replace the whole mesh in one go (single changed emission). Used when loading tiles.
+        '''
+        self._pts = [QtCore.QPointF(p) for p in pts]
+        n = len(self._pts)
+        self._tris = [
+            (i, j, k) for i, j, k in tris
+            if len({i, j, k}) == 3 and all(0 <= idx < n for idx in (i, j, k))
+        ]
+        self._topology = None
+        self._emit_changed()
+
     def clear(self):
         self._pts.clear()
         self._tris.clear()
+        self._topology = None
+
+    # topology
+    def topology(self) -> MeshTopology:
+        if self._topology is None:
+            self._topology = MeshTopology(self._tris)
+        return self._topology
+
+    def flip_edge(self, a: int, b: int) -> bool:
+        '''
+        Flip the interior edge a-b shared by exactly two triangles. Returns False if the edge can't be flipped.
+        '''
+        topo = self.topology()
+        owners = topo.edge_triangles(a, b)
+        if len(owners) != 2:
+            return False
+
+        t0, t1 = owners
+        tri0, tri1 = self._tris[t0], self._tris[t1]
+        c = next(v for v in tri0 if v not in (a, b))
+        d = next(v for v in tri1 if v not in (a, b))
+        if c == d or topo.edge_triangles(c, d):
+            return False # degenerate, or the flipped edge already exists
+
+        # only flip if the quad a-c-b-d is convex, otherwise the new triangles overlap
+        pa, pb, pc, pd = (self._pts[v] for v in (a, b, c, d))
+        def cross(o, p, q):
+            return (p.x() - o.x()) * (q.y() - o.y()) - (p.y() - o.y()) * (q.x() - o.x())
+        if cross(pc, pd, pa) * cross(pc, pd, pb) >= 0:
+            return False
+
+        # keep the winding of the original triangles
+        def wound_like(tri, new_tri):
+            orient = cross(*(self._pts[v] for v in tri))
+            if cross(*(self._pts[v] for v in new_tri)) * orient < 0:
+                return (new_tri[0], new_tri[2], new_tri[1])
+            return new_tri
+
+        new0 = wound_like(tri0, (c, d, a))
+        new1 = wound_like(tri1, (d, c, b))
+
+        topo.remove_triangle(t0, tri0)
+        topo.remove_triangle(t1, tri1)
+        self._tris[t0] = new0
+        self._tris[t1] = new1
+        topo.add_triangle(t0, new0)
+        topo.add_triangle(t1, new1)
+
+        self._emit_changed()
+        return True
+
+    # convenience wrappers, so callers don't have to poke the topology directly
+    def boundary_edges(self):
+        return self.topology().boundary_edges()
+
+    def is_boundary_edge(self, a: int, b: int) -> bool:
+        return self.topology().is_boundary_edge(a, b)
+
+    def triangle_neighbours(self, tri_idx: int) -> list[int]:
+        return self.topology().neighbours(tri_idx, self._tris[tri_idx])
+
+    def connected_triangles(self, tri_idx: int) -> set[int]:
+        return self.topology().connected_region(tri_idx, self._tris)
+
+    def is_manifold(self) -> bool:
+        return self.topology().is_manifold()
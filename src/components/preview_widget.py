@@ -1,13 +1,18 @@
 from PySide6 import QtCore, QtGui, QtWidgets
 
 from .model import MeshModel
-from ..utility import darklight_from_lightcolor
+from .tile_renderer import TileRenderer
+from ..utility import darklight_from_lightcolor, PROFILER
+
+import time
 
 class PreviewWidget(QtWidgets.QWidget):
     def __init__(self, models: list[MeshModel], colors: list[QtGui.QColor]):
         super().__init__()
         self.models = models
         self.colors = colors
+        self.renderer = TileRenderer(models, colors)
+        self.diff_overlay = None
         for m in self.models:
             m.changed.connect(self.update)
         self.setMinimumWidth(500)
@@ -20,6 +25,14 @@ class PreviewWidget(QtWidgets.QWidget):
         # Smooth edges
         self.setAttribute(QtCore.Qt.WA_OpaquePaintEvent, True)
 
+    def set_layer_visible(self, mesh_idx: int, visible: bool):
+        self.renderer.visible[mesh_idx] = visible
+        self.update()
+
+    def set_diff_overlay(self, overlay):
+        self.diff_overlay = overlay
+        self.update()
+
     def reset_view(self):
         self._init_rect = QtCore.QRectF(-500, -500, 1000, 1000)
         self._apply_fit(self._init_rect)   # compute zoom/center now
@@ -117,6 +130,13 @@ class PreviewWidget(QtWidgets.QWidget):
         )
 
     def paintEvent(self, e):
+        if not PROFILER.enabled:
+            return self._paint(e)
+        start = time.perf_counter()
+        self._paint(e)
+        PROFILER.paint('PreviewWidget.paint', start, time.perf_counter())
+
+    def _paint(self, e):
         p = QtGui.QPainter(self)
         p.setRenderHint(QtGui.QPainter.Antialiasing)
         p.fillRect(self.rect(), darklight_from_lightcolor(250, 250, 250))
@@ -132,32 +152,7 @@ class PreviewWidget(QtWidgets.QWidget):
         # world -> device transform
         T = self._world_to_device_transform()
 
-        p.setPen(QtGui.QPen(QtGui.QColor("red"), 2, QtCore.Qt.DashLine))
-        p.setBrush(QtGui.QColor(40, 100, 110))
-        border_poly = QtGui.QPolygonF([
-            QtCore.QPointF(-500, -500),
-            QtCore.QPointF(500, -500),
-            QtCore.QPointF(500, 500),
-            QtCore.QPointF(-500, 500)
-        ])
-        mapped_border = T.map(border_poly)
-        p.drawPolygon(mapped_border)
-
-        # draw all meshes in their colors
-        for mi, m in enumerate(self.models):
-            tris = m.triangles()
-            pts  = m.points()
-            if not tris or not pts:
-                continue
-            pen_color = QtGui.QColor(self.colors[mi])
-            brush = QtGui.QColor(self.colors[mi].red(), self.colors[mi].green(), self.colors[mi].blue())
-
-            p.setPen(QtGui.QPen(pen_color, 1.5))
-            p.setBrush(brush)
-
-            for i, j, k in tris:
-                if max(i, j, k) >= len(pts): 
-                    continue
-                poly = QtGui.QPolygonF([pts[i], pts[j], pts[k]])
-                mapped = T.map(poly)
-                p.drawPolygon(mapped)
\ No newline at end of file
+        self.renderer.paint(p, T)
+
+        if self.diff_overlay is not None:
+            self.diff_overlay.paint(p, T, cosmetic=False)
@@ -0,0 +1,223 @@
+from typing import Iterable, Optional
+
+from .model import MeshModel
+
+import numpy as np
+
+from PySide6 import QtCore, QtGui
+
+# how a query combines with what is already selected
+SELECTION_MODES = ('replace', 'add', 'subtract', 'toggle')
+
+class SelectionModel(QtCore.QObject):
+    """Selected vertices / triangles of every layer, as numpy bool masks. Area queries go through a sorted-by-x vertex index."""
+
+    changed = QtCore.Signal()
+
+    def __init__(self, models: list[MeshModel]):
+        super().__init__()
+        self.models = models
+        self._verts = [np.zeros(0, dtype=bool) for _ in models]
+        self._tris = [np.zeros(0, dtype=bool) for _ in models]
+
+        # per layer caches, dropped whenever the model changes
+        self._coords: list[Optional[np.ndarray]] = [None] * len(models)     # (n, 2) vertex positions
+        self._tri_array: list[Optional[np.ndarray]] = [None] * len(models)  # (m, 3) vertex indices
+        self._x_order: list[Optional[np.ndarray]] = [None] * len(models)    # vertex indices sorted by x
+
+        for mi, m in enumerate(models):
+            m.changed.connect(lambda mi=mi: self._on_model_changed(mi))
+
+    # ---- model sync ----
+    def _on_model_changed(self, mi: int):
+        self._coords[mi] = self._tri_array[mi] = self._x_order[mi] = None
+
+        n_verts = len(self.models[mi].points())
+        n_tris = len(self.models[mi].triangles())
+        if n_verts < len(self._verts[mi]) or n_tris < len(self._tris[mi]):
+            # things got removed and indices shifted, the old selection means nothing now
+            self._verts[mi] = np.zeros(n_verts, dtype=bool)
+            self._tris[mi] = np.zeros(n_tris, dtype=bool)
+            self.changed.emit()
+            return
+
+        had_selection = self._verts[mi].any() or self._tris[mi].any()
+        self._verts[mi] = self._resized(self._verts[mi], n_verts)
+        self._tris[mi] = self._resized(self._tris[mi], n_tris)
+        if had_selection:
+            self.changed.emit() # selected geometry moved
+
+    @staticmethod
+    def _resized(mask: np.ndarray, n: int) -> np.ndarray:
+        if len(mask) == n:
+            return mask
+        out = np.zeros(n, dtype=bool)
+        out[:min(n, len(mask))] = mask[:n]
+        return out
+
+    def coords(self, mi: int) -> np.ndarray:
+        if self._coords[mi] is None:
+            pts = self.models[mi].points()
+            self._coords[mi] = np.array([(p.x(), p.y()) for p in pts], dtype=np.float64).reshape(-1, 2)
+        return self._coords[mi]
+
+    def triangle_array(self, mi: int) -> np.ndarray:
+        if self._tri_array[mi] is None:
+            self._tri_array[mi] = np.array(self.models[mi].triangles(), dtype=np.int64).reshape(-1, 3)
+        return self._tri_array[mi]
+
+    def _sorted_x(self, mi: int) -> tuple[np.ndarray, np.ndarray]:
+        if self._x_order[mi] is None:
+            self._x_order[mi] = np.argsort(self.coords(mi)[:, 0], kind='stable')
+        order = self._x_order[mi]
+        return order, self.coords(mi)[order, 0]
+
+    # ---- state ----
+    def vertex_mask(self, mi: int) -> np.ndarray:
+        self._verts[mi] = self._resized(self._verts[mi], len(self.models[mi].points()))
+        return self._verts[mi]
+
+    def triangle_mask(self, mi: int) -> np.ndarray:
+        self._tris[mi] = self._resized(self._tris[mi], len(self.models[mi].triangles()))
+        return self._tris[mi]
+
+    def vertex_indices(self, mi: int) -> np.ndarray:
+        return np.flatnonzero(self.vertex_mask(mi))
+
+    def triangle_indices(self, mi: int) -> np.ndarray:
+        return np.flatnonzero(self.triangle_mask(mi))
+
+    def touched_vertices(self, mi: int) -> np.ndarray:
+        '''
+        Selected vertices plus the corners of selected triangles, sorted.
+        '''
+        tris = self.triangle_array(mi)[self.triangle_mask(mi)]
+        return np.union1d(self.vertex_indices(mi), tris.ravel())
+
+    def has_selection(self, mi: Optional[int] = None) -> bool:
+        layers = range(len(self.models)) if mi is None else (mi,)
+        return any(self._verts[i].any() or self._tris[i].any() for i in layers)
+
+    def _apply(self, mi: int, verts: Optional[np.ndarray], tris: Optional[np.ndarray], mode: str):
+        # verts / tris: bool masks of the query result (None = no change to that part)
+        for current, hit in ((self.vertex_mask(mi), verts), (self.triangle_mask(mi), tris)):
+            if hit is None:
+                if mode == 'replace':
+                    current[:] = False
+            elif mode == 'replace':
+                current[:] = hit
+            elif mode == 'add':
+                current |= hit
+            elif mode == 'subtract':
+                current &= ~hit
+            elif mode == 'toggle':
+                current ^= hit
+            else:
+                raise ValueError(f"Unknown selection mode {mode}")
+        self.changed.emit()
+
+    # ---- whole layer ----
+    def clear(self, mi: Optional[int] = None):
+        for i in (range(len(self.models)) if mi is None else (mi,)):
+            self.vertex_mask(i)[:] = False
+            self.triangle_mask(i)[:] = False
+        self.changed.emit()
+
+    def select_all(self, mi: int):
+        self.vertex_mask(mi)[:] = True
+        self.triangle_mask(mi)[:] = True
+        self.changed.emit()
+
+    def invert(self, mi: int):
+        np.logical_not(self.vertex_mask(mi), out=self._verts[mi])
+        np.logical_not(self.triangle_mask(mi), out=self._tris[mi])
+        self.changed.emit()
+
+    # ---- by index ----
+    def _mask_of(self, n: int, indices: Iterable[int]) -> np.ndarray:
+        mask = np.zeros(n, dtype=bool)
+        idx = np.fromiter(indices, dtype=np.int64)
+        mask[idx[(idx >= 0) & (idx < n)]] = True
+        return mask
+
+    def select_vertices(self, mi: int, indices: Iterable[int], mode: str = 'replace'):
+        self._apply(mi, self._mask_of(len(self.vertex_mask(mi)), indices), None, mode)
+
+    def select_triangles(self, mi: int, indices: Iterable[int], mode: str = 'replace'):
+        self._apply(mi, None, self._mask_of(len(self.triangle_mask(mi)), indices), mode)
+
+    def select_connected(self, mi: int, tri_idx: int, mode: str = 'replace'):
+        '''
+        Flood select every triangle connected to tri_idx through shared edges.
+        '''
+        self.select_triangles(mi, self.models[mi].connected_triangles(tri_idx), mode)
+
+    def grow_connected(self, mi: int):
+        '''
+        Add every triangle connected to an already selected one.
+        '''
+        grown = self.triangle_mask(mi).copy()
+        flooded = np.zeros(len(grown), dtype=bool)
+        for seed in np.flatnonzero(grown).tolist():
+            if flooded[seed]:
+                continue # already part of an earlier seed's region
+            region = list(self.models[mi].connected_triangles(seed))
+            grown[region] = True
+            flooded[region] = True
+        self._apply(mi, None, grown, 'add')
+
+    # ---- area queries ----
+    def _vertices_in_rect(self, mi: int, rect: QtCore.QRectF) -> np.ndarray:
+        # candidate vertices from the x index, then a vectorized y test
+        order, xs = self._sorted_x(mi)
+        lo, hi = np.searchsorted(xs, rect.left(), side='left'), np.searchsorted(xs, rect.right(), side='right')
+        cand = order[lo:hi]
+        ys = self.coords(mi)[cand, 1]
+        return cand[(ys >= rect.top()) & (ys <= rect.bottom())]
+
+    def _area_result(self, mi: int, inside: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # vertices inside, plus the triangles with all three corners inside
+        verts = np.zeros(len(self.vertex_mask(mi)), dtype=bool)
+        verts[inside] = True
+        tri_array = self.triangle_array(mi)
+        tris = verts[tri_array].all(axis=1) if len(tri_array) else np.zeros(0, dtype=bool)
+        return verts, tris
+
+    def select_rect(self, mi: int, rect: QtCore.QRectF, mode: str = 'replace'):
+        self._apply(mi, *self._area_result(mi, self._vertices_in_rect(mi, rect.normalized())), mode)
+
+    def select_lasso(self, mi: int, polygon: QtGui.QPolygonF, mode: str = 'replace'):
+        if polygon.size() < 3:
+            return
+        cand = self._vertices_in_rect(mi, polygon.boundingRect())
+        xy = self.coords(mi)[cand]
+        poly = np.array([(p.x(), p.y()) for p in polygon], dtype=np.float64)
+
+        # even-odd rule, one polygon edge at a time over all candidates
+        inside = np.zeros(len(cand), dtype=bool)
+        x, y = xy[:, 0], xy[:, 1]
+        for (x0, y0), (x1, y1) in zip(poly, np.roll(poly, -1, axis=0)):
+            crosses = (y0 > y) != (y1 > y)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_at = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+            inside ^= crosses & (x < x_at)
+
+        self._apply(mi, *self._area_result(mi, cand[inside]), mode)
+
+    def pick_triangle(self, mi: int, point: QtCore.QPointF) -> int:
+        '''
+        Topmost (last drawn) triangle containing point, or -1.
+        '''
+        tri_array = self.triangle_array(mi)
+        if not len(tri_array):
+            return -1
+        t = self.coords(mi)[tri_array] # (m, 3, 2)
+        px, py = point.x(), point.y()
+
+        def side(a, b):
+            return (b[:, 0] - a[:, 0]) * (py - a[:, 1]) - (b[:, 1] - a[:, 1]) * (px - a[:, 0])
+
+        s0, s1, s2 = side(t[:, 0], t[:, 1]), side(t[:, 1], t[:, 2]), side(t[:, 2], t[:, 0])
+        hit = ((s0 >= 0) & (s1 >= 0) & (s2 >= 0)) | ((s0 <= 0) & (s1 <= 0) & (s2 <= 0))
+        found = np.flatnonzero(hit)
+        return int(found[-1]) if len(found) else -1
@@ -0,0 +1,62 @@
+from .selection import SelectionModel
+
+from PySide6 import QtCore, QtGui, QtWidgets
+
+SELECTION_COLOR = QtGui.QColor(255, 140, 0)
+
+class SelectionHighlightItem(QtWidgets.QGraphicsItem):
+    """Draws the whole selection (every layer) as one item, rebuilt lazily when the selection changes."""
+
+    def __init__(self, selection: SelectionModel, layer_visible: list[bool]):
+        super().__init__()
+        self.selection = selection
+        self.layer_visible = layer_visible # shared with Main, hidden layers aren't drawn
+        self.setZValue(9)                  # above triangles, just below the vertex handles
+        self.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+
+        self._dirty = True
+        self._tri_path = QtGui.QPainterPath()
+        self._points: list[QtCore.QPointF] = []
+        selection.changed.connect(self.invalidate)
+
+    def invalidate(self):
+        self._dirty = True
+        self.update()
+
+    def _rebuild(self):
+        path = QtGui.QPainterPath()
+        points = []
+        for mi in range(len(self.selection.models)):
+            if not self.layer_visible[mi] or not self.selection.has_selection(mi):
+                continue
+            coords = self.selection.coords(mi)
+            for tri in self.selection.triangle_array(mi)[self.selection.triangle_mask(mi)].tolist():
+                path.addPolygon(QtGui.QPolygonF([QtCore.QPointF(*coords[v]) for v in tri + tri[:1]]))
+            points.extend(QtCore.QPointF(x, y) for x, y in coords[self.selection.vertex_mask(mi)].tolist())
+
+        self._tri_path = path
+        self._points = points
+        self._dirty = False
+
+    def boundingRect(self):
+        # selection never leaves the tile (+ the cosmetic halo)
+        return QtCore.QRectF(-520, -520, 1040, 1040)
+
+    def paint(self, p, opt, w):
+        if self._dirty:
+            self._rebuild()
+
+        if not self._tri_path.isEmpty():
+            pen = QtGui.QPen(SELECTION_COLOR, 2)
+            pen.setCosmetic(True)
+            p.setPen(pen)
+            fill = QtGui.QColor(SELECTION_COLOR)
+            fill.setAlpha(70)
+            p.setBrush(fill)
+            p.drawPath(self._tri_path)
+
+        if self._points:
+            halo = QtGui.QPen(SELECTION_COLOR, 18, QtCore.Qt.SolidLine, QtCore.Qt.RoundCap)
+            halo.setCosmetic(True)
+            p.setPen(halo)
+            p.drawPoints(self._points)
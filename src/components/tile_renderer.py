@@ -0,0 +1,81 @@
+from typing import Optional
+
+from .model import MeshModel
+
+from PySide6 import QtCore, QtGui
+
+TILE_RECT = QtCore.QRectF(-500, -500, 1000, 1000)
+
+class TileRenderer:
+    """Paints the tile border and all meshes with a QPainter. Not tied to a widget, so it can draw into offscreen images too."""
+
+    def __init__(self, models: list[MeshModel], colors: list[QtGui.QColor]):
+        self.models = models
+        self.colors = colors
+        self.visible = [True] * len(models)
+        self.opacity = [1.0] * len(models)
+
+    def paint(self, p: QtGui.QPainter, T: QtGui.QTransform, border_width: float = 2, draw_border: bool = True):
+        '''
+        Draw everything, using T to map world -> device coordinates.
+        '''
+
+        if draw_border:
+            p.setPen(QtGui.QPen(QtGui.QColor("red"), border_width, QtCore.Qt.DashLine))
+            p.setBrush(QtGui.QColor(40, 100, 110))
+            border_poly = QtGui.QPolygonF([
+                QtCore.QPointF(-500, -500),
+                QtCore.QPointF(500, -500),
+                QtCore.QPointF(500, 500),
+                QtCore.QPointF(-500, 500)
+            ])
+            mapped_border = T.map(border_poly)
+            p.drawPolygon(mapped_border)
+
+        # draw all meshes in their colors
+        for mi, m in enumerate(self.models):
+            if not self.visible[mi]:
+                continue
+            tris = m.triangles()
+            pts  = m.points()
+            if not tris or not pts:
+                continue
+            pen_color = QtGui.QColor(self.colors[mi])
+            brush = QtGui.QColor(self.colors[mi].red(), self.colors[mi].green(), self.colors[mi].blue())
+
+            p.setPen(QtGui.QPen(pen_color, 1.5))
+            p.setBrush(brush)
+            p.setOpacity(self.opacity[mi])
+
+            for i, j, k in tris:
+                if max(i, j, k) >= len(pts): 
+                    continue
+                poly = QtGui.QPolygonF([pts[i], pts[j], pts[k]])
+                mapped = T.map(poly)
+                p.drawPolygon(mapped)
+
+        p.setOpacity(1.0)
+
+    def render_image(self, width: int, height: Optional[int] = None, world_rect: QtCore.QRectF = TILE_RECT,
+                     background: QtGui.QColor = QtGui.QColor(0, 0, 0, 0), draw_border: bool = True) -> QtGui.QImage:
+        '''
+        Render world_rect (the whole tile by default) into a new ARGB image, keeping the aspect ratio.
+        '''
+
+        height = width if height is None else height
+
+        img = QtGui.QImage(width, height, QtGui.QImage.Format_ARGB32_Premultiplied)
+        img.fill(background)
+
+        scale = min(width / world_rect.width(), height / world_rect.height())
+        T = QtGui.QTransform()
+        T.translate(width / 2, height / 2)
+        T.scale(scale, scale)
+        T.translate(-world_rect.center().x(), -world_rect.center().y())
+
+        p = QtGui.QPainter(img)
+        p.setRenderHint(QtGui.QPainter.Antialiasing)
+        self.paint(p, T, border_width=1, draw_border=draw_border)
+        p.end()
+
+        return img
@@ -0,0 +1,110 @@
+from typing import Iterable
+
+Edge = tuple[int, int]
+
+def edge_key(a: int, b: int) -> Edge:
+    # undirected edge, always stored low -> high
+    return (a, b) if a < b else (b, a)
+
+class MeshTopology:
+    """Edge / vertex -> triangle adjacency for a single MeshModel."""
+
+    def __init__(self, tris: Iterable[tuple[int, int, int]] = ()):
+        self._edge_tris: dict[Edge, list[int]] = {}
+        self._vert_tris: dict[int, list[int]] = {}
+        self._boundary: set[Edge] = set()
+
+        for tri_idx, tri in enumerate(tris):
+            self.add_triangle(tri_idx, tri)
+
+    # ---- maintenance ----
+    def add_triangle(self, tri_idx: int, tri: tuple[int, int, int]):
+        i, j, k = tri
+        for a, b in ((i, j), (j, k), (k, i)):
+            key = edge_key(a, b)
+            owners = self._edge_tris.setdefault(key, [])
+            owners.append(tri_idx)
+            self._update_boundary(key, owners)
+
+        for v in tri:
+            self._vert_tris.setdefault(v, []).append(tri_idx)
+
+    def remove_triangle(self, tri_idx: int, tri: tuple[int, int, int]):
+        # NOTE: does not renumber, only used when a triangle is rewritten in place (edge flips)
+        i, j, k = tri
+        for a, b in ((i, j), (j, k), (k, i)):
+            key = edge_key(a, b)
+            owners = self._edge_tris.get(key)
+            if not owners or tri_idx not in owners:
+                continue
+            owners.remove(tri_idx)
+            if owners:
+                self._update_boundary(key, owners)
+            else:
+                del self._edge_tris[key]
+                self._boundary.discard(key)
+
+        for v in tri:
+            owners = self._vert_tris.get(v)
+            if owners and tri_idx in owners:
+                owners.remove(tri_idx)
+                if not owners:
+                    del self._vert_tris[v]
+
+    def _update_boundary(self, key: Edge, owners: list[int]):
+        if len(owners) == 1:
+            self._boundary.add(key)
+        else:
+            self._boundary.discard(key)
+
+    # ---- queries ----
+    def edges(self):
+        return self._edge_tris.keys()
+
+    def edge_triangles(self, a: int, b: int) -> list[int]:
+        return self._edge_tris.get(edge_key(a, b), [])
+
+    def vertex_triangles(self, v: int) -> list[int]:
+        return self._vert_tris.get(v, [])
+
+    def is_boundary_edge(self, a: int, b: int) -> bool:
+        return edge_key(a, b) in self._boundary
+
+    def boundary_edges(self) -> set[Edge]:
+        return self._boundary
+
+    def non_manifold_edges(self) -> list[Edge]:
+        return [key for key, owners in self._edge_tris.items() if len(owners) > 2]
+
+    def is_manifold(self) -> bool:
+        '''
+        Edge manifold check: every edge is shared by at most 2 triangles.
+        '''
+        return all(len(owners) <= 2 for owners in self._edge_tris.values())
+
+    def neighbours(self, tri_idx: int, tri: tuple[int, int, int]) -> list[int]:
+        # triangles sharing an edge with tri
+        i, j, k = tri
+        out = []
+        for a, b in ((i, j), (j, k), (k, i)):
+            for other in self._edge_tris.get(edge_key(a, b), ()):
+                if other != tri_idx and other not in out:
+                    out.append(other)
+        return out
+
+    def connected_region(self, seed: int, tris: list[tuple[int, int, int]]) -> set[int]:
+        '''
+        Flood fill across shared edges, starting at triangle index seed.
+        '''
+        if seed < 0 or seed >= len(tris):
+            return set()
+
+        region = {seed}
+        stack = [seed]
+        while stack:
+            cur = stack.pop()
+            for other in self.neighbours(cur, tris[cur]):
+                if other not in region:
+                    region.add(other)
+                    stack.append(other)
+        return region
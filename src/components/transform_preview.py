@@ -0,0 +1,62 @@
+from typing import Optional
+
+from .model import MeshModel
+from ..utility import transform_coords
+
+import numpy as np
+
+from PySide6 import QtCore, QtGui, QtWidgets
+
+class TransformPreviewItem(QtWidgets.QGraphicsItem):
+    """Ghost of a selection while a transform is set up, one item however big the selection is."""
+
+    def __init__(self, model: MeshModel, indices: list[int], color: QtGui.QColor):
+        super().__init__()
+        self.setZValue(9001)
+        self.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+
+        moving = set(indices)
+        tris = [tri for tri in model.triangles() if moving.intersection(tri)]
+
+        # local copy of just the touched vertices: selected ones move, the rest keep triangles attached
+        local = sorted(moving.union(*tris)) if tris else sorted(moving)
+        remap = {v: i for i, v in enumerate(local)}
+        pts = model.points()
+        self._base = np.array([(pts[v].x(), pts[v].y()) for v in local], dtype=np.float64).reshape(-1, 2)
+        self._moving = np.array([v in moving for v in local], dtype=bool)
+        self._tris = [tuple(remap[v] for v in tri) for tri in tris]
+
+        self._color = QtGui.QColor(color)
+        self._path = QtGui.QPainterPath()
+        self._points: list[QtCore.QPointF] = []
+        self._rect = QtCore.QRectF()
+        self.set_transform(QtGui.QTransform())
+
+    def set_transform(self, T: QtGui.QTransform, snap: Optional[float] = None):
+        coords = self._base.copy()
+        coords[self._moving] = transform_coords(self._base[self._moving], T, snap)
+
+        path = QtGui.QPainterPath()
+        for i, j, k in self._tris:
+            path.addPolygon(QtGui.QPolygonF([QtCore.QPointF(*coords[v]) for v in (i, j, k, i)]))
+
+        self.prepareGeometryChange()
+        self._path = path
+        self._points = [QtCore.QPointF(x, y) for x, y in coords[self._moving].tolist()]
+        self._rect = path.boundingRect().united(QtGui.QPolygonF(self._points).boundingRect()).adjusted(-10, -10, 10, 10)
+        self.update()
+
+    def boundingRect(self):
+        return self._rect
+
+    def paint(self, p, opt, w):
+        pen = QtGui.QPen(self._color.darker(150), 1, QtCore.Qt.DashLine)
+        pen.setCosmetic(True)
+        p.setPen(pen)
+        p.setBrush(QtCore.Qt.NoBrush)
+        p.drawPath(self._path)
+
+        point_pen = QtGui.QPen(self._color.darker(150), 6, QtCore.Qt.SolidLine, QtCore.Qt.RoundCap)
+        point_pen.setCosmetic(True)
+        p.setPen(point_pen)
+        p.drawPoints(self._points)
@@ -1,2 +1,2 @@
-from .ui_params import SNAP_AMOUNTS
-from .layers import RENDER_ORDER, LAYER_COLORS
\ No newline at end of file
+from .ui_params import SNAP_AMOUNTS, LOD_HANDLE_MIN_SPACING, LOD_OUTLINE_MIN_SPACING, LOD_CACHE_TRI_DENSITY, LOD_CACHE_SIZE, LOD_HYSTERESIS
+from .layers import RENDER_ORDER, LAYER_COLORS, LAYER_CONTAINMENT
\ No newline at end of file
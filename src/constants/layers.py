@@ -6,4 +6,16 @@ LAYER_COLORS = [
         QtGui.QColor('#53B9D1'), QtGui.QColor('#D0D0C6'), QtGui.QColor('#A4B875'),
         QtGui.QColor('#E3D08D'), QtGui.QColor('#53B9D1'), QtGui.QColor('#FFFFFF'),
         QtGui.QColor('#8B6E5C'), QtGui.QColor('#583E2D'),
-    ]
\ No newline at end of file
+    ]
+
+# layer -> the layer it has to sit inside of (see tools.booleans)
+LAYER_CONTAINMENT = {
+    'Sea-1': 'Sea-0',
+    'Sea-2': 'Sea-1',
+    'Sea-3': 'Sea-2',
+    'Grass': 'Land',
+    'Sand': 'Land',
+    'Snow': 'Land',
+    'Gravel': 'Land',
+    'Rock': 'Land',
+}
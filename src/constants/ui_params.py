@@ -1 +1,8 @@
-SNAP_AMOUNTS = [100, 10, 1, .1, .01, .001]
\ No newline at end of file
+SNAP_AMOUNTS = [100, 10, 1, .1, .01, .001]
+
+# Level of detail (editor view)
+LOD_HANDLE_MIN_SPACING = 6      # px, hide a layers vertex handles once its average vertex spacing gets smaller than this
+LOD_OUTLINE_MIN_SPACING = 12    # px, same idea for triangle outlines (fill only below this)
+LOD_CACHE_TRI_DENSITY = 0.05    # triangles per screen pixel above which all layers are drawn from one cached image
+LOD_CACHE_SIZE = 2048           # px, resolution of that cached image
+LOD_HYSTERESIS = 1.25           # switch back at threshold / this, so zooming around a threshold does not flicker
\ No newline at end of file
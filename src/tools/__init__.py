@@ -0,0 +1,11 @@
+# Headless tile tools (no widgets required)
+
+from .tile_io import read_tile_layers, load_tile_models, model_layers, set_model_layers, layer_arrays
+from .rasterize import rasterize_layer, rasterize_materials, rasterize_masks, NO_MATERIAL
+from .thumbnails import ThumbnailCache, render_thumbnail
+from .journal import EditJournal
+from .tile_cache import TileCache
+from .tile_diff import diff_layer, diff_tiles, merge_layer, merge_tiles, LayerDiff, MergeConflict
+from .seams import check_tile_seam, stitch_tile, check_grid, SeamMismatch, SIDES
+from .booleans import union, difference, intersection, clip_layer, BOOLEAN_OPS, check_containment, enforce_containment
+from .raster_import import import_raster, import_masks, material_masks, height_masks, read_material_map, read_heightmap, RASTER_KINDS
@@ -0,0 +1,319 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from ..constants import RENDER_ORDER, LAYER_CONTAINMENT
+
+import numpy as np
+
+EPS = 1e-9          # polygons / triangles with less area than this are dropped
+WELD_DECIMALS = 6   # output vertices closer than this are merged
+
+Layer = tuple[list[tuple[float, float]], list[tuple[int, int, int]]]
+Polygon = list[tuple[float, float]]
+
+# ---- convex polygon helpers (counter-clockwise in x/y, i.e: positive signed area) ----
+def _signed_area(poly: Polygon) -> float:
+    area = 0.0
+    for (x0, y0), (x1, y1) in zip(poly, poly[1:] + poly[:1]):
+        area += x0 * y1 - x1 * y0
+    return area / 2
+
+
+def _clip_half_plane(poly: Polygon, p, q, keep_left: bool) -> Polygon:
+    # Sutherland-Hodgman against the line p->q, keeping the left (inside for ccw) or right side
+    px, py = p
+    dx, dy = q[0] - px, q[1] - py
+    if not keep_left:
+        dx, dy = -dx, -dy
+
+    sides = [dx * (y - py) - dy * (x - px) for x, y in poly]
+    if min(sides) >= 0:
+        return poly # all on the kept side
+    if max(sides) < 0:
+        return []
+
+    out = []
+    n = len(poly)
+    for i in range(n):
+        cur, nxt = poly[i], poly[(i + 1) % n]
+        s_cur, s_nxt = sides[i], sides[(i + 1) % n]
+        if s_cur >= 0:
+            out.append(cur)
+        if (s_cur >= 0) != (s_nxt >= 0):
+            t = s_cur / (s_cur - s_nxt)
+            out.append((cur[0] + t * (nxt[0] - cur[0]), cur[1] + t * (nxt[1] - cur[1])))
+    return out
+
+
+def _intersect_convex(poly: Polygon, clip: Polygon) -> Polygon:
+    out = poly
+    for p, q in zip(clip, clip[1:] + clip[:1]):
+        out = _clip_half_plane(out, p, q, True)
+        if len(out) < 3:
+            return []
+    return out
+
+
+def _subtract_convex(poly: Polygon, clip: Polygon) -> list[Polygon]:
+    # poly minus clip, as convex pieces: peel off what lies outside each clip edge
+    pieces = []
+    rest = poly
+    for p, q in zip(clip, clip[1:] + clip[:1]):
+        outside = _clip_half_plane(rest, p, q, False)
+        if len(outside) >= 3 and _signed_area(outside) > EPS:
+            pieces.append(outside)
+        rest = _clip_half_plane(rest, p, q, True)
+        if len(rest) < 3 or _signed_area(rest) <= EPS:
+            return pieces
+    return pieces # whatever is left is inside clip
+
+
+# ---- layer <-> triangles ----
+class _TriangleSet:
+    """Triangles of a layer as ccw polygons, with their bounding boxes in a uniform grid."""
+
+    def __init__(self, layer: Layer):
+        pts, tris = layer
+        self.polys: list[Polygon] = []
+        self.ccw: list[bool] = []   # winding of the source triangle, output keeps it
+
+        coords = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+        for tri in tris:
+            poly = [tuple(coords[v]) for v in tri]
+            area = _signed_area(poly)
+            if abs(area) <= EPS:
+                continue
+            self.ccw.append(area > 0)
+            self.polys.append(poly if area > 0 else poly[::-1])
+
+        if self.polys:
+            boxes = np.array(self.polys, dtype=np.float64) # (n, 3, 2)
+            self.lo = boxes.min(axis=1)
+            self.hi = boxes.max(axis=1)
+            # cells about the size of an average triangle
+            self.cell = max(float(np.mean(self.hi - self.lo)), 1e-6)
+        else:
+            self.lo = self.hi = np.empty((0, 2))
+            self.cell = 1.0
+
+        self.grid: dict[tuple[int, int], list[int]] = {}
+        lo_cells = np.floor(self.lo / self.cell).astype(np.int64)
+        hi_cells = np.floor(self.hi / self.cell).astype(np.int64)
+        for idx, ((x0, y0), (x1, y1)) in enumerate(zip(lo_cells.tolist(), hi_cells.tolist())):
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    self.grid.setdefault((cx, cy), []).append(idx)
+
+    def candidates(self, poly: Polygon) -> list[int]:
+        '''
+        Triangles whose bounding box overlaps poly's.
+        '''
+        xs = [p[0] for p in poly]
+        ys = [p[1] for p in poly]
+        x0, y0 = int(np.floor(min(xs) / self.cell)), int(np.floor(min(ys) / self.cell))
+        x1, y1 = int(np.floor(max(xs) / self.cell)), int(np.floor(max(ys) / self.cell))
+
+        found = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                found.update(self.grid.get((cx, cy), ()))
+        if not found:
+            return []
+
+        idx = np.fromiter(found, dtype=np.int64, count=len(found))
+        hit = ((self.lo[idx, 0] <= max(xs)) & (self.hi[idx, 0] >= min(xs))
+               & (self.lo[idx, 1] <= max(ys)) & (self.hi[idx, 1] >= min(ys)))
+        return sorted(idx[hit].tolist())
+
+
+class _LayerBuilder:
+    """Collects output polygons, welding shared vertices and fan-triangulating."""
+
+    def __init__(self):
+        self.pts: list[tuple[float, float]] = []
+        self.tris: list[tuple[int, int, int]] = []
+        self._index: dict[tuple[float, float], int] = {}
+
+    def vertex(self, p) -> int:
+        key = (round(p[0], WELD_DECIMALS) + 0.0, round(p[1], WELD_DECIMALS) + 0.0)
+        idx = self._index.get(key)
+        if idx is None:
+            idx = self._index[key] = len(self.pts)
+            self.pts.append(key)
+        return idx
+
+    def add(self, poly: Polygon, ccw: bool = True):
+        if len(poly) < 3 or _signed_area(poly) <= EPS:
+            return
+        ids = [self.vertex(p) for p in poly]
+        ids = [v for i, v in enumerate(ids) if v != ids[i - 1]] # drop welded duplicates
+        for i in range(1, len(ids) - 1):
+            tri = (ids[0], ids[i], ids[i + 1])
+            if len(set(tri)) != 3 or abs(_signed_area([self.pts[v] for v in tri])) <= EPS:
+                continue
+            self.tris.append(tri if ccw else (tri[0], tri[2], tri[1]))
+
+    def layer(self) -> Layer:
+        return self.pts, self.tris
+
+
+# ---- operations ----
+def _overlaps(sa: "_TriangleSet", sb: "_TriangleSet"):
+    # per triangle of a: (polygon, winding, area, [(b triangle, a & b piece)] for every b it really overlaps)
+    for poly, ccw in zip(sa.polys, sa.ccw):
+        parts = []
+        for j in sb.candidates(poly):
+            piece = _intersect_convex(poly, sb.polys[j])
+            if len(piece) >= 3 and _signed_area(piece) > EPS:
+                parts.append((j, piece))
+        yield poly, ccw, _signed_area(poly), parts
+
+
+def _covered(area: float, parts) -> bool:
+    # b's triangles don't overlap each other, so the pieces add up to a's area when a is fully inside b
+    return sum(_signed_area(piece) for _, piece in parts) >= area * (1 - 1e-9) - EPS
+
+
+def intersection(a: Layer, b: Layer) -> Layer:
+    '''
+    Parts of a which lie inside b (b's triangles are assumed not to overlap each other). Triangles fully inside b are kept whole.
+    '''
+    out = _LayerBuilder()
+    for poly, ccw, area, parts in _overlaps(_TriangleSet(a), _TriangleSet(b)):
+        if _covered(area, parts):
+            out.add(poly, ccw)
+            continue
+        for _, piece in parts:
+            out.add(piece, ccw)
+    return out.layer()
+
+
+def difference(a: Layer, b: Layer) -> Layer:
+    '''
+    Parts of a which lie outside b. Only triangles crossing b's outline get cut up, the rest is kept whole or dropped.
+    '''
+    sb = _TriangleSet(b)
+    out = _LayerBuilder()
+    for poly, ccw, area, parts in _overlaps(_TriangleSet(a), sb):
+        if not parts:
+            out.add(poly, ccw)
+            continue
+        if _covered(area, parts):
+            continue
+
+        pieces = [poly]
+        for j, _ in parts:
+            pieces = [rest for piece in pieces for rest in _subtract_convex(piece, sb.polys[j])]
+            if not pieces:
+                break
+        for piece in pieces:
+            out.add(piece, ccw)
+    return out.layer()
+
+
+def union(a: Layer, b: Layer) -> Layer:
+    '''
+    a, plus whatever of b lies outside of it (no overlapping triangles).
+    '''
+    out = _LayerBuilder()
+    for part in (_TriangleSet(a), _TriangleSet(difference(b, a))):
+        for poly, ccw in zip(part.polys, part.ccw):
+            out.add(poly, ccw)
+    return out.layer()
+
+
+def clip_layer(layer: Layer, by: Layer) -> Layer:
+    '''
+    Cut layer down to what lies inside by. Same as intersection(layer, by), named for the containment use.
+    '''
+    return intersection(layer, by)
+
+
+BOOLEAN_OPS = {
+    'union': union,
+    'difference': difference,
+    'intersection': intersection,
+    'clip': clip_layer,
+}
+
+
+def layer_area(layer: Layer) -> float:
+    pts, tris = layer
+    if not tris:
+        return 0.0
+    coords = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+    t = coords[np.asarray(tris, dtype=np.int64)] # (n, 3, 2)
+    cross = ((t[:, 1, 0] - t[:, 0, 0]) * (t[:, 2, 1] - t[:, 0, 1])
+             - (t[:, 1, 1] - t[:, 0, 1]) * (t[:, 2, 0] - t[:, 0, 0]))
+    return float(np.abs(cross).sum() / 2)
+
+
+# ---- containment (see constants.LAYER_CONTAINMENT) ----
+def containment_pairs(names: list[str] = RENDER_ORDER) -> list[tuple[int, int]]:
+    '''
+    (child, parent) layer indices, parents before their children.
+    '''
+    pairs = []
+    def depth(name):
+        return 0 if name not in LAYER_CONTAINMENT else 1 + depth(LAYER_CONTAINMENT[name])
+    for child in sorted(LAYER_CONTAINMENT, key=depth):
+        parent = LAYER_CONTAINMENT[child]
+        if child in names and parent in names:
+            pairs.append((names.index(child), names.index(parent)))
+    return pairs
+
+
+def _outside_area(child: Layer, parent: Layer) -> float:
+    return layer_area(difference(child, parent))
+
+
+def _contain(child: Layer, parent: Layer, min_area: float) -> tuple[float, Optional[Layer]]:
+    # (area outside, clipped child or None when it already fits), one worker job
+    area = _outside_area(child, parent)
+    return area, (clip_layer(child, parent) if area > min_area else None)
+
+
+def _map(fn, args: list[tuple], workers: Optional[int]) -> list:
+    # workers=0 runs in this process, otherwise a (spawn) process pool
+    if workers == 0 or len(args) < 2:
+        return [fn(*a) for a in args]
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [pool.submit(fn, *a) for a in args]
+        return [f.result() for f in futures]
+
+
+def check_containment(layers: list[Layer], workers: Optional[int] = None, min_area: float = 1e-6) -> list[tuple[int, int, float]]:
+    '''
+    Containment violations as (child, parent, area of child outside parent), all pairs checked in parallel.
+    '''
+    pairs = [(c, p) for c, p in containment_pairs() if c < len(layers) and p < len(layers) and layers[c][1]]
+    areas = _map(_outside_area, [(layers[c], layers[p]) for c, p in pairs], workers)
+    return [(c, p, area) for (c, p), area in zip(pairs, areas) if area > min_area]
+
+
+def enforce_containment(layers: list[Layer], workers: Optional[int] = None, min_area: float = 1e-6) -> tuple[list[Layer], list[str]]:
+    '''
+    Clip every layer which sticks out of its parent. Parents are fixed first (Sea-1 before Sea-2), layers of the same depth in parallel.
+    Returns (new layers, report lines).
+    '''
+    layers = list(layers)
+    report = []
+
+    pending = [(c, p) for c, p in containment_pairs() if c < len(layers) and p < len(layers)]
+    while pending:
+        # a pair is ready once its parent isn't waiting on a fix itself
+        waiting = {c for c, _ in pending}
+        ready = [(c, p) for c, p in pending if p not in waiting]
+        pending = [pair for pair in pending if pair not in ready]
+
+        ready = [(c, p) for c, p in ready if layers[c][1]]
+        results = _map(_contain, [(layers[c], layers[p], min_area) for c, p in ready], workers)
+
+        for (c, p), (area, layer) in zip(ready, results):
+            if layer is not None:
+                layers[c] = layer
+                report.append(f"{RENDER_ORDER[c]}: clipped {area:.3f} outside {RENDER_ORDER[p]}")
+
+    return layers, report
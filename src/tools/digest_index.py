@@ -0,0 +1,41 @@
+import json
+import os
+
+from ..utility import file_digest
+
+class DigestIndex:
+    """
+    Persistent path -> content hash map. Files are only re-hashed when their size or mtime changed.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = index_path
+        self._index: dict[str, dict] = {}
+        try:
+            with open(index_path) as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            pass
+        self._dirty = False
+
+    def digest(self, file_path: str) -> str:
+        file_path = os.path.abspath(file_path)
+        st = os.stat(file_path)
+
+        entry = self._index.get(file_path)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            return entry['digest']
+
+        digest = file_digest(file_path)
+        self._index[file_path] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'digest': digest}
+        self._dirty = True
+        return digest
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmp_path = self.index_path + f'.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
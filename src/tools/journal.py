@@ -0,0 +1,323 @@
+import glob
+import os
+import struct
+import threading
+from array import array
+from typing import Optional
+
+from ..components.model import MeshModel, remove_elements
+from ..utility import data_dir
+from .tile_io import layer_arrays
+
+from PySide6 import QtCore
+
+import numpy as np
+
+SNAPSHOT_MAGIC = b'SWTS'
+JOURNAL_MAGIC = b'SWTJ'
+FORMAT_VERSION = 1
+
+# record ops, every record starts with <op u8, layer u8>
+OP_VERTEX_ADD = 1   # x f64, y f64
+OP_VERTEX_MOVE = 2  # index u32, x f64, y f64
+OP_TRI_ADD = 3      # i, j, k u32
+OP_REMOVE = 4       # num verts u32, num tris u32, vertex indices u32..., triangle indices u32...
+OP_LAYER_SET = 5    # whole layer: num verts u32, num tris u32, coords f64..., indices u32...
+
+_HEADER = struct.Struct('<4sHI')  # magic, version, generation
+_RECORD = struct.Struct('<BB')
+_VERTEX = struct.Struct('<dd')
+_MOVE = struct.Struct('<Idd')
+_TRI = struct.Struct('<III')
+_COUNTS = struct.Struct('<II')
+
+def _pack_layer(points: np.ndarray, tris: np.ndarray) -> bytes:
+    # layer_arrays output -> f64 coords, u32 indices
+    return _COUNTS.pack(len(points), len(tris)) + points.astype('<f8').tobytes() + tris.astype('<u4').tobytes()
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def remaining(self) -> int:
+        return len(self.data) - self.pos
+
+    def unpack(self, st: struct.Struct):
+        if self.remaining() < st.size:
+            raise EOFError
+        out = st.unpack_from(self.data, self.pos)
+        self.pos += st.size
+        return out
+
+    def array(self, typecode: str, count: int) -> array:
+        out = array(typecode)
+        size = out.itemsize * count
+        if self.remaining() < size:
+            raise EOFError
+        out.frombytes(self.data[self.pos:self.pos + size])
+        self.pos += size
+        return out
+
+    def layer(self) -> tuple[list, list]:
+        num_pts, num_tris = self.unpack(_COUNTS)
+        coords = self.array('d', 2 * num_pts)
+        indices = self.array('I', 3 * num_tris)
+        pts = list(zip(coords[0::2], coords[1::2]))
+        tris = list(zip(indices[0::3], indices[1::3], indices[2::3]))
+        return pts, tris
+
+
+class EditJournal:
+    """
+    Crash-safe autosave: an append-only log of edit records on top of a full snapshot.
+
+    Files (in directory):
+        snapshot.bin            full geometry of every layer, tagged with a generation
+        journal-<gen>.bin       edits made after snapshot <gen>
+
+    compact() rotates to a new journal right away and writes the new snapshot in a background thread, old journals are only deleted once the snapshot is safely in place. Recovery replays every journal from the snapshots generation on.
+    """
+
+    def __init__(self, directory: Optional[str] = None, compact_every: int = 5000):
+        self.directory = directory or data_dir('autosave')
+        os.makedirs(self.directory, exist_ok=True)
+        self.compact_every = compact_every
+
+        self.generation = 0
+        self.records = 0 # since the last compaction
+        self._file = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- paths ----
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, 'snapshot.bin')
+
+    def _journal_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f'journal-{generation}.bin')
+
+    def _journal_generations(self) -> list[int]:
+        gens = []
+        for path in glob.glob(os.path.join(self.directory, 'journal-*.bin')):
+            try:
+                gens.append(int(os.path.basename(path)[len('journal-'):-len('.bin')]))
+            except ValueError:
+                pass
+        return sorted(gens)
+
+    # ---- session ----
+    @property
+    def active(self) -> bool:
+        return self._file is not None
+
+    def start(self, models: list[MeshModel]):
+        '''
+        Start a new session from the current model state (i.e: after opening a tile). Writes the snapshot synchronously.
+        '''
+
+        self.wait()
+        self._close_file()
+
+        self.generation = max([self.generation] + self._journal_generations()) + 1
+        layers = [layer_arrays(m) for m in models]
+        self._write_snapshot(self.generation, layers)
+        self._open_journal(self.generation)
+        self._delete_journals_before(self.generation)
+
+    def close(self, discard: bool = False):
+        self.wait()
+        self._close_file()
+        if discard:
+            self.discard()
+
+    def discard(self):
+        for gen in self._journal_generations():
+            self._remove(self._journal_path(gen))
+        self._remove(self.snapshot_path)
+
+    def _open_journal(self, generation: int):
+        self._file = open(self._journal_path(generation), 'ab')
+        if self._file.tell() == 0:
+            self._file.write(_HEADER.pack(JOURNAL_MAGIC, FORMAT_VERSION, generation))
+            self._file.flush()
+        self.records = 0
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _delete_journals_before(self, generation: int):
+        for gen in self._journal_generations():
+            if gen < generation:
+                self._remove(self._journal_path(gen))
+
+    # ---- records ----
+    def _append(self, data: bytes):
+        if self._file is None:
+            return
+        self._file.write(data)
+        self._file.flush() # hand it to the OS now, survives the editor crashing
+        self.records += 1
+
+    def vertex_added(self, layer: int, p: QtCore.QPointF):
+        self._append(_RECORD.pack(OP_VERTEX_ADD, layer) + _VERTEX.pack(p.x(), p.y()))
+
+    def vertex_moved(self, layer: int, index: int, p: QtCore.QPointF):
+        self._append(_RECORD.pack(OP_VERTEX_MOVE, layer) + _MOVE.pack(index, p.x(), p.y()))
+
+    def triangle_added(self, layer: int, i: int, j: int, k: int):
+        self._append(_RECORD.pack(OP_TRI_ADD, layer) + _TRI.pack(i, j, k))
+
+    def removed(self, layer: int, vertex_indices, tri_indices):
+        verts = array('I', sorted(vertex_indices))
+        tris = array('I', sorted(tri_indices))
+        self._append(_RECORD.pack(OP_REMOVE, layer) + _COUNTS.pack(len(verts), len(tris)) + verts.tobytes() + tris.tobytes())
+
+    def layer_set(self, layer: int, model: MeshModel):
+        '''
+        Record a layer wholesale, for bulk edits where per-element records don't make sense.
+        '''
+        self._append(_RECORD.pack(OP_LAYER_SET, layer) + _pack_layer(*layer_arrays(model)))
+
+    # ---- compaction ----
+    def maybe_compact(self, models: list[MeshModel], force: bool = False):
+        if self.records and (force or self.records >= self.compact_every):
+            self.compact(models)
+
+    def compact(self, models: list[MeshModel]):
+        '''
+        Fold everything journaled so far into a new snapshot. Model state is copied here (main thread), the file writing happens in the background.
+        '''
+
+        if self._file is None or (self._thread is not None and self._thread.is_alive()):
+            return
+
+        layers = [layer_arrays(m) for m in models]
+
+        new_gen = self.generation + 1
+        self._close_file()
+        self._open_journal(new_gen)
+        self.generation = new_gen
+
+        def work():
+            self._write_snapshot(new_gen, layers)
+            self._delete_journals_before(new_gen)
+
+        self._thread = threading.Thread(target=work, name='journal-compaction', daemon=True)
+        self._thread.start()
+
+    def wait(self):
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _write_snapshot(self, generation: int, layers: list[tuple[np.ndarray, np.ndarray]]):
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(SNAPSHOT_MAGIC, FORMAT_VERSION, generation))
+            f.write(struct.pack('<H', len(layers)))
+            for coords, indices in layers:
+                f.write(_pack_layer(coords, indices))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+    # ---- recovery ----
+    def has_recovery(self) -> bool:
+        '''
+        True if a previous session left a snapshot / journal with any content behind.
+        '''
+
+        layers = self.read()
+        return layers is not None and any(pts or tris for pts, tris in layers)
+
+    def read(self) -> Optional[list[tuple[list, list]]]:
+        '''
+        Snapshot + journals replayed, as (points [(x, y)], triangles) per layer. None if there is nothing (valid) to recover.
+        '''
+
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                reader = _Reader(f.read())
+            magic, version, generation = reader.unpack(_HEADER)
+            if magic != SNAPSHOT_MAGIC or version != FORMAT_VERSION:
+                return None
+            (num_layers,) = reader.unpack(struct.Struct('<H'))
+            layers = [reader.layer() for _ in range(num_layers)]
+        except (OSError, EOFError, struct.error):
+            return None
+
+        for gen in self._journal_generations():
+            if gen >= generation:
+                self._replay(self._journal_path(gen), layers)
+
+        return layers
+
+    @staticmethod
+    def _replay(path: str, layers: list[tuple[list, list]]):
+        try:
+            with open(path, 'rb') as f:
+                reader = _Reader(f.read())
+            magic, version, _ = reader.unpack(_HEADER)
+        except (OSError, EOFError):
+            return
+        if magic != JOURNAL_MAGIC or version != FORMAT_VERSION:
+            return
+
+        # a crash can leave a half written record at the end, just stop there
+        try:
+            while reader.remaining():
+                op, layer = reader.unpack(_RECORD)
+                if layer >= len(layers):
+                    break
+                pts, tris = layers[layer]
+
+                if op == OP_VERTEX_ADD:
+                    pts.append(reader.unpack(_VERTEX))
+
+                elif op == OP_VERTEX_MOVE:
+                    index, x, y = reader.unpack(_MOVE)
+                    if index < len(pts):
+                        pts[index] = (x, y)
+
+                elif op == OP_TRI_ADD:
+                    i, j, k = reader.unpack(_TRI)
+                    if len({i, j, k}) == 3 and max(i, j, k) < len(pts):
+                        tris.append((i, j, k))
+
+                elif op == OP_REMOVE:
+                    num_verts, num_tris = reader.unpack(_COUNTS)
+                    vset = set(reader.array('I', num_verts))
+                    tset = set(reader.array('I', num_tris))
+                    layers[layer] = remove_elements(pts, tris, vset, tset)
+
+                elif op == OP_LAYER_SET:
+                    layers[layer] = reader.layer()
+
+                else:
+                    break # unknown op, can't know its size
+        except EOFError:
+            pass
+
+    def recover(self, models: list[MeshModel]) -> bool:
+        '''
+        Load the recovered session into models (one set_geometry per layer).
+        '''
+
+        layers = self.read()
+        if layers is None:
+            return False
+
+        for model, (pts, tris) in zip(models, layers):
+            model.set_geometry((QtCore.QPointF(x, y) for x, y in pts), tris)
+        return True
@@ -0,0 +1,590 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from ..constants import RENDER_ORDER, LAYER_COLORS
+from .rasterize import TILE_MIN, TILE_SIZE, NO_MATERIAL
+from .booleans import containment_pairs
+
+from PySide6 import QtGui
+
+import numpy as np
+
+Layer = tuple[list[tuple[float, float]], list[tuple[int, int, int]]]
+
+BLOCK_SIZE = 256                   # squares per side of one contouring job
+PARALLEL_MIN_SAMPLES = 1024 * 1024 # smaller inputs aren't worth spawning processes for
+DEFAULT_TOLERANCE = 0.75           # simplification tolerance, in samples
+DEFAULT_MIN_AREA = 2.0             # rings smaller than this (in samples^2) are dropped
+MAX_BLOCK_VERTICES = 2000          # busier blocks get split up before triangulating
+MIN_SPLIT_SIZE = 8                 # ... down to this many samples per side
+MAX_COLOR_DISTANCE = 48            # image colors further than this from every layer color are empty cells
+EPS = 1e-9
+
+# normalized height (0..1, sea level at 0.5) -> [lo, hi) band per layer, for heightmap imports
+DEFAULT_HEIGHT_BANDS = {
+    'Sea-0': (-np.inf, 0.5),
+    'Sea-1': (-np.inf, 0.4),
+    'Sea-2': (-np.inf, 0.3),
+    'Sea-3': (-np.inf, 0.2),
+    'Shallows': (0.45, 0.5),
+    'Land': (0.5, np.inf),
+    'Sand': (0.5, 0.53),
+    'Grass': (0.53, 0.75),
+    'Rock': (0.75, 0.9),
+    'Snow': (0.9, np.inf),
+}
+
+# ---- marching squares case table ----
+# corner (x, y) in the unit square and its bit in the case index, edges by the two corners they join
+_CORNERS = {'tl': ((0, 0), 8), 'tr': ((1, 0), 4), 'br': ((1, 1), 2), 'bl': ((0, 1), 1)}
+_EDGES = {'T': ('tl', 'tr'), 'R': ('tr', 'br'), 'B': ('bl', 'br'), 'L': ('tl', 'bl')}
+_EDGE_MID = {'T': (0.5, 0.0), 'R': (1.0, 0.5), 'B': (0.5, 1.0), 'L': (0.0, 0.5)}
+
+def _case_segments(case: int) -> list[tuple[str, str]]:
+    # directed (from edge, to edge) segments of one case, inside always on the same side
+    inside = {name for name, (_, bit) in _CORNERS.items() if case & bit}
+    crossed = [e for e, (a, b) in _EDGES.items() if (a in inside) != (b in inside)]
+    if not crossed:
+        return []
+
+    if len(crossed) == 4:
+        # saddle: keep the two inside corners apart (the outside stays connected)
+        pairs = [tuple(e for e in _EDGES if corner in _EDGES[e]) for corner in sorted(inside)]
+    else:
+        pairs = [tuple(crossed)]
+
+    out = []
+    for a, b in pairs:
+        shared = set(_EDGES[a]) & set(_EDGES[b])
+        ref = next(iter(shared & inside), None) or next(iter(inside))
+        (kx, ky), _ = _CORNERS[ref]
+        (px, py), (qx, qy) = _EDGE_MID[a], _EDGE_MID[b]
+        cross = (qx - px) * (ky - py) - (qy - py) * (kx - px)
+        out.append((a, b) if cross > 0 else (b, a))
+    return out
+
+_CASE_TABLE = [_case_segments(case) for case in range(16)]
+
+
+# ---- contours of one block ----
+def _segments(samples: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Directed contour segments of a (padded) bool grid as (start edge id, end edge id). Horizontal edges come first, then vertical ones.
+    '''
+    h, w = samples.shape
+    s = samples.astype(np.uint8)
+    case = (s[:-1, :-1] << 3) | (s[:-1, 1:] << 2) | (s[1:, 1:] << 1) | s[1:, :-1]
+
+    n_h = h * (w - 1)
+    def edge_id(edge, r, c):
+        if edge == 'T':
+            return r * (w - 1) + c
+        if edge == 'B':
+            return (r + 1) * (w - 1) + c
+        if edge == 'L':
+            return n_h + r * w + c
+        return n_h + r * w + c + 1
+
+    starts, ends = [], []
+    for k, segs in enumerate(_CASE_TABLE):
+        if not segs:
+            continue
+        r, c = np.nonzero(case == k)
+        if not len(r):
+            continue
+        for a, b in segs:
+            starts.append(edge_id(a, r, c))
+            ends.append(edge_id(b, r, c))
+
+    if not starts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(starts), np.concatenate(ends)
+
+
+def _edge_xy(ids: np.ndarray, w: int, n_h: int) -> np.ndarray:
+    # crossing point (x, y) of each edge, in padded sample coords
+    horiz = ids < n_h
+    v = ids - n_h
+    r = np.where(horiz, ids // (w - 1), v // w)
+    c = np.where(horiz, ids % (w - 1), v % w)
+    return np.stack([c + np.where(horiz, 0.5, 0.0), r + np.where(horiz, 0.0, 0.5)], axis=1)
+
+
+def _link_rings(starts: np.ndarray, ends: np.ndarray) -> list[np.ndarray]:
+    # every crossing point starts exactly one segment and ends another, so following them closes each ring
+    nxt = dict(zip(starts.tolist(), ends.tolist()))
+    rings = []
+    for s in starts.tolist():
+        if s not in nxt:
+            continue
+        ring = []
+        e = s
+        while e in nxt:
+            ring.append(e)
+            e = nxt.pop(e)
+        rings.append(np.array(ring, dtype=np.int64))
+    return rings
+
+
+def _signed_area(ring: np.ndarray) -> float:
+    x, y = ring[:, 0], ring[:, 1]
+    return float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) / 2
+
+
+def _douglas_peucker(pts: np.ndarray, idx: np.ndarray, tol: float, keep: np.ndarray):
+    # mark the points of the open chain idx which survive simplification (its ends are kept by the caller)
+    stack = [(0, len(idx) - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j <= i + 1:
+            continue
+        a, b = pts[idx[i]], pts[idx[j]]
+        seg = pts[idx[i + 1:j]]
+        d = b - a
+        length = np.hypot(*d)
+        if length <= EPS:
+            dist = np.hypot(seg[:, 0] - a[0], seg[:, 1] - a[1])
+        else:
+            dist = np.abs(d[0] * (seg[:, 1] - a[1]) - d[1] * (seg[:, 0] - a[0])) / length
+        k = int(np.argmax(dist))
+        if dist[k] > tol:
+            keep[idx[i + 1 + k]] = True
+            stack.append((i, i + 1 + k))
+            stack.append((i + 1 + k, j))
+
+
+def _simplify(ring: np.ndarray, locked: np.ndarray, tol: float) -> np.ndarray:
+    '''
+    Douglas-Peucker on a closed ring, never dropping locked points.
+    '''
+    n = len(ring)
+    keep = locked.copy()
+    anchors = np.flatnonzero(keep).tolist()
+    if len(anchors) < 2:
+        first = anchors[0] if anchors else 0
+        far = int(np.argmax(np.hypot(ring[:, 0] - ring[first, 0], ring[:, 1] - ring[first, 1])))
+        anchors = sorted({first, far})
+        keep[anchors] = True
+    if len(anchors) < 2:
+        return ring[:0]
+
+    for a, b in zip(anchors, anchors[1:] + anchors[:1]):
+        chain = np.arange(a, b + 1) if b > a else np.r_[a:n, 0:b + 1]
+        _douglas_peucker(ring, chain, tol, keep)
+    return ring[keep]
+
+
+def _block_rings(mask: np.ndarray, tolerance: float, min_area: float) -> list[np.ndarray]:
+    '''
+    Simplified contour rings of a block (bool, h x w samples), in block sample coords. Outlines have positive area, holes negative.
+
+    Outside the block counts as empty, and contours running out there get clamped onto the block border. Neighbouring blocks share
+    their border samples, so they end up with the same border points and the pieces join without gaps.
+    '''
+    h, w = mask.shape
+    padded = np.zeros((h + 2, w + 2), dtype=bool)
+    padded[1:-1, 1:-1] = mask
+
+    starts, ends = _segments(padded)
+    if not len(starts):
+        return []
+    n_h = (h + 2) * (w + 1)
+
+    rings = []
+    for ids in _link_rings(starts, ends):
+        ring = _edge_xy(ids, w + 2, n_h) - 1.0
+        np.clip(ring[:, 0], 0, w - 1, out=ring[:, 0])
+        np.clip(ring[:, 1], 0, h - 1, out=ring[:, 1])
+
+        # clamping can stack points on top of each other
+        ring = ring[np.any(ring != np.roll(ring, 1, axis=0), axis=1)]
+        if len(ring) < 3:
+            continue
+
+        # which border line(s) each point sits on (left, right, top, bottom)
+        on = np.stack([ring[:, 0] == 0, ring[:, 0] == w - 1, ring[:, 1] == 0, ring[:, 1] == h - 1], axis=1)
+        # points in the middle of a straight run along the border add nothing
+        inner = (on & np.roll(on, 1, axis=0) & np.roll(on, -1, axis=0)).any(axis=1)
+        ring, on = ring[~inner], on[~inner]
+
+        ring = _simplify(ring, on.any(axis=1), tolerance)
+        if len(ring) >= 3 and abs(_signed_area(ring)) >= min_area:
+            rings.append(ring)
+    return rings
+
+
+# ---- triangulation ----
+def _point_in_ring(px: float, py: float, ring: np.ndarray) -> bool:
+    x0, y0 = ring[:, 0], ring[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    crosses = (y0 > py) != (y1 > py)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_at = x0 + (py - y0) * (x1 - x0) / (y1 - y0)
+    return bool(np.count_nonzero(crosses & (px < x_at)) % 2)
+
+
+def _blocked(p, q, a: np.ndarray, b: np.ndarray) -> bool:
+    # does segment p-q cross one of the segments a[i]-b[i], or run through one of their end points? (p and q themselves don't count)
+    def orient(o, s, t):
+        return (s[..., 0] - o[..., 0]) * (t[..., 1] - o[..., 1]) - (s[..., 1] - o[..., 1]) * (t[..., 0] - o[..., 0])
+    p = np.asarray(p, dtype=np.float64)
+    q = np.asarray(q, dtype=np.float64)
+    d1, d2 = orient(a, b, p), orient(a, b, q)
+    d3, d4 = orient(p, q, a), orient(p, q, b)
+    if ((d1 * d2 < -EPS) & (d3 * d4 < -EPS)).any():
+        return True
+
+    # grid aligned contours line up a lot, so also catch vertices sitting right on the segment
+    d = q - p
+    t = ((a - p) @ d) / max(float(d @ d), EPS)
+    on = (np.abs(d3) <= EPS) & (t > EPS) & (t < 1 - EPS)
+    return bool(on.any())
+
+
+def _in_corner(a, v, b, p) -> bool:
+    # does p lie inside the polygon's interior angle at v (a -> v -> b, interior on the left)?
+    def left(o, s):
+        return (s[0] - o[0]) * (p[1] - o[1]) - (s[1] - o[1]) * (p[0] - o[0]) > 0
+    convex = (v[0] - a[0]) * (b[1] - a[1]) - (v[1] - a[1]) * (b[0] - a[0]) > 0
+    if convex:
+        return left(a, v) and left(v, b)
+    return left(a, v) or left(v, b)
+
+
+def _find_bridge(coords: np.ndarray, poly: list[int], hole: list[int], a: np.ndarray, b: np.ndarray) -> tuple[int, int]:
+    # (hole position, polygon position) of a bridge running through the polygon's interior only
+    pts = coords[poly]
+    hole_pts = coords[hole]
+    n, m = len(poly), len(hole)
+    fallback = None
+    for h in np.argsort(-hole_pts[:, 0], kind='stable').tolist():
+        hp = hole_pts[h]
+        order = np.argsort(np.hypot(pts[:, 0] - hp[0], pts[:, 1] - hp[1]), kind='stable')
+        if fallback is None:
+            fallback = (h, int(order[0]))
+        for cand in order.tolist():
+            # the bridge has to leave the hole into the polygon, and enter the right copy of a vertex earlier bridges doubled up
+            if not _in_corner(hole_pts[h - 1], hp, hole_pts[(h + 1) % m], pts[cand]):
+                continue
+            if not _in_corner(pts[cand - 1], pts[cand], pts[(cand + 1) % n], hp):
+                continue
+            if not _blocked(hp, pts[cand], a, b):
+                return h, cand
+    return fallback
+
+
+def _bridge_holes(coords: np.ndarray, outline: list[int], holes: list[list[int]]) -> list[int]:
+    '''
+    Merge holes into the outline through zero-width bridges, so the result can be ear clipped as one polygon.
+    '''
+    poly = list(outline)
+    if not holes:
+        return poly
+
+    # everything a bridge must not cross: the outline, every hole and the bridges made so far
+    rings = [outline] + holes
+    a = np.concatenate([coords[ring] for ring in rings])
+    b = np.concatenate([coords[np.roll(ring, -1)] for ring in rings])
+
+    # rightmost holes first, they tend to find a bridge among the first few candidates
+    for hole in sorted(holes, key=lambda hole: -coords[hole, 0].max()):
+        start, target = _find_bridge(coords, poly, hole, a, b)
+        a = np.vstack([a, coords[hole[start]]])
+        b = np.vstack([b, coords[poly[target]]])
+        loop = hole[start:] + hole[:start + 1]
+        poly = poly[:target + 1] + loop + poly[target:]
+    return poly
+
+
+def _ear_clip(coords: np.ndarray, poly: list[int]) -> list[tuple[int, int, int]]:
+    '''
+    Ear clipping of a simple polygon with positive area (coordinate indices, bridge vertices may repeat).
+    '''
+    n = len(poly)
+    if n < 3:
+        return []
+    idx = np.array(poly, dtype=np.int64)
+    xy = coords[idx]
+    prev = np.roll(np.arange(n), 1)
+    nxt = np.roll(np.arange(n), -1)
+    alive = np.ones(n, dtype=bool)
+
+    def cross(i, j, k):
+        (ax, ay), (bx, by), (cx, cy) = xy[i], xy[j], xy[k]
+        return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+    def is_ear(i, j, k):
+        # no reflex vertex (besides copies of the corners) may sit inside or on the triangle, convex ones can't without a reflex one
+        test = np.flatnonzero(alive & (idx != idx[i]) & (idx != idx[j]) & (idx != idx[k]))
+        if not len(test):
+            return True
+        p, before, after = xy[test], xy[prev[test]], xy[nxt[test]]
+        reflex = (p[:, 0] - before[:, 0]) * (after[:, 1] - before[:, 1]) - (p[:, 1] - before[:, 1]) * (after[:, 0] - before[:, 0]) <= EPS
+        p = p[reflex]
+        (ax, ay), (bx, by), (cx, cy) = xy[i], xy[j], xy[k]
+        s0 = (bx - ax) * (p[:, 1] - ay) - (by - ay) * (p[:, 0] - ax)
+        s1 = (cx - bx) * (p[:, 1] - by) - (cy - by) * (p[:, 0] - bx)
+        s2 = (ax - cx) * (p[:, 1] - cy) - (ay - cy) * (p[:, 0] - cx)
+        return not ((s0 >= -EPS) & (s1 >= -EPS) & (s2 >= -EPS)).any()
+
+    def remove(j):
+        alive[j] = False
+        nxt[prev[j]] = nxt[j]
+        prev[nxt[j]] = prev[j]
+
+    tris = []
+    remaining = n
+    j = 0
+    stalled = 0
+    relaxed = False
+    while remaining > 3:
+        i, k = int(prev[j]), int(nxt[j])
+        c = cross(i, j, k)
+        if abs(c) <= EPS or idx[i] == idx[j] or idx[j] == idx[k]:
+            remove(j) # collinear / doubled back (bridges), no triangle
+            remaining -= 1
+            j, stalled = i, 0
+            continue
+        if c > 0 and (relaxed or is_ear(i, j, k)):
+            tris.append((int(idx[i]), int(idx[j]), int(idx[k])))
+            remove(j)
+            remaining -= 1
+            j, stalled, relaxed = i, 0, False
+            continue
+
+        j = k
+        stalled += 1
+        if stalled > remaining:
+            if relaxed:
+                break # nothing convex left, the rest is degenerate
+            relaxed = True # self-touching input (e.g. after simplification): clip any convex corner
+            stalled = 0
+
+    if remaining == 3:
+        i = int(np.flatnonzero(alive)[0])
+        j, k = int(nxt[i]), int(nxt[nxt[i]])
+        if cross(i, j, k) > EPS:
+            tris.append((int(idx[i]), int(idx[j]), int(idx[k])))
+    return tris
+
+
+def _triangulate_rings(rings: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Triangles filling the outlines minus their holes, as (coords (n, 2), triangles (m, 3)).
+    '''
+    if not rings:
+        return np.empty((0, 2)), np.empty((0, 3), dtype=np.int64)
+
+    coords = np.concatenate(rings)
+    offsets = np.cumsum([0] + [len(r) for r in rings])
+    indexed = [list(range(offsets[i], offsets[i + 1])) for i in range(len(rings))]
+    areas = [_signed_area(r) for r in rings]
+
+    outlines = [i for i, a in enumerate(areas) if a > 0]
+    holes_of = {i: [] for i in outlines}
+    for h, area in enumerate(areas):
+        if area > 0:
+            continue
+        px, py = rings[h][0]
+        # innermost (smallest) outline around it
+        around = [i for i in outlines if _point_in_ring(px, py, rings[i])]
+        if around:
+            holes_of[min(around, key=lambda i: areas[i])].append(indexed[h])
+
+    tris = []
+    for i in outlines:
+        tris.extend(_ear_clip(coords, _bridge_holes(coords, indexed[i], holes_of[i])))
+    return coords, np.array(tris, dtype=np.int64).reshape(-1, 3)
+
+
+def _contour_block(mask: np.ndarray, row: int, col: int, tolerance: float, min_area: float) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    One worker job: triangles of a block, coords in sample units of the whole raster.
+
+    Ear clipping is quadratic, so blocks with busy contours get split into quarters (which share their middle row / column, like
+    the blocks themselves) until each piece is small enough.
+    '''
+    if not mask.any():
+        return np.empty((0, 2)), np.empty((0, 3), dtype=np.int64)
+
+    rings = _block_rings(mask, tolerance, min_area)
+    h, w = mask.shape
+    if sum(len(r) for r in rings) > MAX_BLOCK_VERTICES and min(h, w) > 2 * MIN_SPLIT_SIZE:
+        mid_r, mid_c = h // 2, w // 2
+        parts = [_contour_block(mask[r0:r1, c0:c1], row + r0, col + c0, tolerance, min_area)
+                 for r0, r1 in ((0, mid_r + 1), (mid_r, h)) for c0, c1 in ((0, mid_c + 1), (mid_c, w))]
+        offsets = np.cumsum([0] + [len(c) for c, _ in parts])
+        return np.concatenate([c for c, _ in parts]), np.concatenate([t + o for (_, t), o in zip(parts, offsets)])
+
+    coords, tris = _triangulate_rings(rings)
+    return coords + (col, row), tris
+
+
+# ---- whole rasters ----
+def _blocks(shape: tuple[int, int], block_size: int):
+    # (row, col) of each block, neighbours share their border row / column of samples
+    h, w = shape
+    for row in range(0, max(h - 1, 1), block_size):
+        for col in range(0, max(w - 1, 1), block_size):
+            yield row, col
+
+
+def _to_layer(coords: np.ndarray, tris: np.ndarray, shape: tuple[int, int]) -> Layer:
+    # weld block borders (points are on the half sample grid, so exact), then map samples to tile coords
+    if not len(tris):
+        return [], []
+    keys, inverse = np.unique(np.round(coords * 2).astype(np.int64), axis=0, return_inverse=True)
+    tris = inverse.reshape(-1)[tris]
+
+    # the outer samples sit on the tile edge, so full layers meet the neighbouring tiles (and the mapping stays affine, no flipped triangles)
+    h, w = shape
+    x = TILE_MIN + keys[:, 0] / 2 * (TILE_SIZE / (w - 1))
+    y = TILE_MIN + keys[:, 1] / 2 * (TILE_SIZE / (h - 1))
+
+    return list(zip(x.tolist(), y.tolist())), [tuple(t) for t in tris.tolist()]
+
+
+def import_masks(masks: dict[int, np.ndarray], tolerance: float = DEFAULT_TOLERANCE, min_area: float = DEFAULT_MIN_AREA,
+                 block_size: int = BLOCK_SIZE, workers: Optional[int] = None) -> dict[int, Layer]:
+    '''
+    Trace, simplify and triangulate coverage masks ({layer index: bool mask}, row 0 is y = -500) into layers.
+
+    Each mask is cut into block_size square blocks which are contoured independently, in a (spawn) process pool once the input
+    is large enough. workers=0 keeps everything in this process.
+    '''
+    jobs = []
+    for mi, mask in masks.items():
+        mask = np.asarray(mask, dtype=bool)
+        if mask.ndim != 2 or min(mask.shape) < 2:
+            raise ValueError(f"Mask of {RENDER_ORDER[mi]} has to be 2D and at least 2x2, got {mask.shape}")
+        for row, col in _blocks(mask.shape, block_size):
+            block = mask[row:row + block_size + 1, col:col + block_size + 1]
+            if block.any():
+                jobs.append((mi, block, row, col))
+
+    total = sum(np.asarray(m).size for m in masks.values())
+    if workers == 0 or total < PARALLEL_MIN_SAMPLES or len(jobs) < 2:
+        results = [_contour_block(block, row, col, tolerance, min_area) for _, block, row, col in jobs]
+    else:
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = [pool.submit(_contour_block, block, row, col, tolerance, min_area) for _, block, row, col in jobs]
+            results = [f.result() for f in futures]
+
+    parts: dict[int, list] = {mi: [] for mi in masks}
+    for (mi, *_), result in zip(jobs, results):
+        parts[mi].append(result)
+
+    layers = {}
+    for mi, blocks in parts.items():
+        if not blocks:
+            layers[mi] = ([], [])
+            continue
+        coords, tris, offset = [], [], 0
+        for c, t in blocks:
+            coords.append(c)
+            tris.append(t + offset)
+            offset += len(c)
+        layers[mi] = _to_layer(np.concatenate(coords), np.concatenate(tris), np.asarray(masks[mi]).shape)
+    return layers
+
+
+# ---- raster -> masks ----
+def material_masks(materials: np.ndarray) -> dict[int, np.ndarray]:
+    '''
+    Coverage of every layer from a material map (as written by rasterize_materials). A cell showing a child layer (e.g: Grass)
+    is covered by its parents (Land) too, since the material map only keeps the topmost layer.
+    '''
+    materials = np.asarray(materials)
+    masks = {mi: materials == mi for mi in range(len(RENDER_ORDER))}
+    for child, parent in reversed(containment_pairs()):
+        masks[parent] |= masks[child]
+    return masks
+
+
+def height_masks(heights: np.ndarray, bands: Optional[dict[str, tuple[float, float]]] = None) -> dict[int, np.ndarray]:
+    '''
+    Coverage of every layer with a height band ({layer name: (lo, hi)}, cells with lo <= height < hi). Defaults to DEFAULT_HEIGHT_BANDS.
+    '''
+    heights = np.asarray(heights, dtype=np.float64)
+    bands = DEFAULT_HEIGHT_BANDS if bands is None else bands
+    return {RENDER_ORDER.index(name): (heights >= lo) & (heights < hi) for name, (lo, hi) in bands.items()}
+
+
+# ---- reading ----
+def _read_image(file_path: str) -> QtGui.QImage:
+    img = QtGui.QImage(file_path)
+    if img.isNull():
+        raise IOError(f"Could not read {file_path}")
+    return img
+
+
+def _image_array(img: QtGui.QImage, dtype) -> np.ndarray:
+    # pixels of an already converted image, without the scanline padding
+    item = np.dtype(dtype).itemsize
+    data = np.frombuffer(img.constBits(), dtype=dtype, count=img.height() * img.bytesPerLine() // item)
+    return data.reshape(img.height(), img.bytesPerLine() // item)[:, :img.width()].copy()
+
+
+def _nearest_layer(rgba: np.ndarray) -> np.ndarray:
+    # layer index per 0xAARRGGBB color, NO_MATERIAL for (mostly) transparent or unknown ones. Layers sharing a color resolve to the first.
+    colors = np.array([(c.red(), c.green(), c.blue()) for c in LAYER_COLORS], dtype=np.int64)
+    rgb = np.stack([(rgba >> 16) & 0xFF, (rgba >> 8) & 0xFF, rgba & 0xFF], axis=1).astype(np.int64)
+    dist = ((rgb[:, None, :] - colors[None, :, :]) ** 2).sum(axis=2)
+    out = np.argmin(dist, axis=1).astype(np.uint8)
+    out[(((rgba >> 24) & 0xFF) < 128) | (dist.min(axis=1) > MAX_COLOR_DISTANCE ** 2)] = NO_MATERIAL
+    return out
+
+
+def read_material_map(file_path: str) -> np.ndarray:
+    '''
+    Material index per cell (uint8) from a .npy map or an image. Indexed PNGs written by save_materials_png map back exactly,
+    other images by nearest layer color.
+    '''
+    if file_path.lower().endswith('.npy'):
+        return np.asarray(np.load(file_path, mmap_mode='r'), dtype=np.uint8)
+
+    img = _read_image(file_path)
+    if img.format() == QtGui.QImage.Format_Indexed8:
+        table = np.array(img.colorTable(), dtype=np.int64) & 0xFFFFFFFF
+        lut = _nearest_layer(table) if len(table) else np.zeros(0, dtype=np.uint8)
+        for mi, color in enumerate(LAYER_COLORS[:len(table)]):
+            if table[mi] == color.rgba():
+                lut[mi] = mi # our own palette, keeps layers with the same color apart
+        lut = np.concatenate([lut, np.full(256 - len(lut), NO_MATERIAL, dtype=np.uint8)])
+        return lut[_image_array(img, np.uint8)]
+
+    pixels = _image_array(img.convertToFormat(QtGui.QImage.Format_ARGB32), np.uint32)
+    colors, inverse = np.unique(pixels, return_inverse=True)
+    return _nearest_layer(colors.astype(np.int64))[inverse.reshape(pixels.shape)]
+
+
+def read_heightmap(file_path: str) -> np.ndarray:
+    '''
+    Heights (float64) from a .npy array, or a grayscale image scaled to 0..1.
+    '''
+    if file_path.lower().endswith('.npy'):
+        return np.asarray(np.load(file_path, mmap_mode='r'), dtype=np.float64)
+
+    img = _read_image(file_path).convertToFormat(QtGui.QImage.Format_Grayscale16)
+    return _image_array(img, np.uint16) / 65535.0
+
+
+RASTER_KINDS = ('materials', 'heightmap')
+
+def import_raster(file_path: str, kind: str = 'materials', bands: Optional[dict[str, tuple[float, float]]] = None, **kwargs) -> dict[int, Layer]:
+    '''
+    Read a material map / heightmap and turn it into layers ({layer index: layer}). Material maps define all 11 layers,
+    heightmaps only the ones with a band. kwargs go to import_masks.
+    '''
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(file_path)
+    if kind == 'materials':
+        masks = material_masks(read_material_map(file_path))
+    elif kind == 'heightmap':
+        masks = height_masks(read_heightmap(file_path), bands)
+    else:
+        raise ValueError(f"Unknown raster kind {kind}")
+    return import_masks(masks, **kwargs)
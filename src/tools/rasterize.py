@@ -0,0 +1,206 @@
+import argparse
+import os
+from typing import Optional, Sequence
+
+from ..constants import RENDER_ORDER, LAYER_COLORS
+
+from PySide6 import QtGui
+
+import numpy as np
+
+TILE_MIN = -500.0
+TILE_SIZE = 1000.0
+
+NO_MATERIAL = 255 # material index for cells not covered by any layer
+
+def _cell_range(lo: np.ndarray, hi: np.ndarray, origin: float, cell: float, count: int):
+    # first / last cell whose *center* lies inside [lo, hi]
+    first = np.ceil((lo - origin) / cell - 0.5).astype(np.int64)
+    last = np.floor((hi - origin) / cell - 0.5).astype(np.int64)
+    return np.maximum(first, 0), np.minimum(last, count - 1)
+
+
+def _rasterize_rows(points: np.ndarray, tris: np.ndarray, resolution: int, row_start: int, row_stop: int) -> np.ndarray:
+    '''
+    Coverage for rows [row_start, row_stop) as a bool array.
+
+    Every (triangle, row) pair becomes one horizontal span, which is written into a difference array and summed up, so there is no python loop over triangles.
+    '''
+
+    rows = row_stop - row_start
+    out = np.zeros((rows, resolution), dtype=bool)
+    if len(tris) == 0:
+        return out
+
+    cell = TILE_SIZE / resolution
+    corners = points[tris] # (M, 3, 2)
+    ys = corners[:, :, 1]
+
+    r0, r1 = _cell_range(ys.min(axis=1), ys.max(axis=1), TILE_MIN, cell, resolution)
+    r0 = np.maximum(r0, row_start)
+    r1 = np.minimum(r1, row_stop - 1)
+    hit = r1 >= r0
+    if not hit.any():
+        return out
+
+    corners, r0, r1 = corners[hit], r0[hit], r1[hit]
+
+    # expand to one entry per (triangle, row)
+    counts = r1 - r0 + 1
+    tri_of_pair = np.repeat(np.arange(len(corners)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    pair_rows = np.repeat(r0, counts) + offsets
+    y = TILE_MIN + (pair_rows + 0.5) * cell
+
+    # intersect the row center line with all 3 edges
+    a = corners[tri_of_pair]
+    b = np.roll(a, -1, axis=1)
+    ya, yb = a[:, :, 1], b[:, :, 1]
+    dy = yb - ya
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (y[:, None] - ya) / dy
+        xs = a[:, :, 0] + t * (b[:, :, 0] - a[:, :, 0])
+    valid = (dy != 0) & (t >= 0) & (t <= 1)
+    xs_lo = np.where(valid, xs, np.inf).min(axis=1)
+    xs_hi = np.where(valid, xs, -np.inf).max(axis=1)
+
+    c0, c1 = _cell_range(xs_lo, xs_hi, TILE_MIN, cell, resolution)
+    span = c1 >= c0
+    local_rows = pair_rows[span] - row_start
+
+    diff = np.zeros((rows, resolution + 1), dtype=np.int32)
+    np.add.at(diff, (local_rows, c0[span]), 1)
+    np.add.at(diff, (local_rows, c1[span] + 1), -1)
+    np.cumsum(diff[:, :resolution], axis=1, out=diff[:, :resolution])
+
+    out |= diff[:, :resolution] > 0
+    return out
+
+
+def rasterize_layer(points, tris, resolution: int = 1024, chunk_rows: int = 256, out: Optional[np.ndarray] = None) -> np.ndarray:
+    '''
+    Coverage mask (resolution x resolution, bool) of one layer over the +-500 tile. Row 0 is y = -500.
+    '''
+
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    tris = np.asarray(tris, dtype=np.int64).reshape(-1, 3)
+
+    if out is None:
+        out = np.zeros((resolution, resolution), dtype=bool)
+
+    for start in range(0, resolution, chunk_rows):
+        stop = min(resolution, start + chunk_rows)
+        out[start:stop] = _rasterize_rows(points, tris, resolution, start, stop)
+
+    return out
+
+
+def rasterize_materials(layers: Sequence, resolution: int = 1024, chunk_rows: int = 256, out: Optional[np.ndarray] = None) -> np.ndarray:
+    '''
+    Material index per cell (uint8). Layers later in RENDER_ORDER win, same as the preview draw order. Empty cells are NO_MATERIAL.
+
+    layers: sequence of (points, tris) in RENDER_ORDER.
+    '''
+
+    layers = [(np.asarray(p, dtype=np.float64).reshape(-1, 2), np.asarray(t, dtype=np.int64).reshape(-1, 3)) for p, t in layers]
+
+    if out is None:
+        out = np.empty((resolution, resolution), dtype=np.uint8)
+
+    for start in range(0, resolution, chunk_rows):
+        stop = min(resolution, start + chunk_rows)
+        chunk = np.full((stop - start, resolution), NO_MATERIAL, dtype=np.uint8)
+        for index, (points, tris) in enumerate(layers):
+            chunk[_rasterize_rows(points, tris, resolution, start, stop)] = index
+        out[start:stop] = chunk
+
+    return out
+
+
+def rasterize_masks(layers: Sequence, resolution: int = 1024, chunk_rows: int = 256, out: Optional[np.ndarray] = None) -> np.ndarray:
+    '''
+    Coverage mask for every layer, shape (len(layers), resolution, resolution). Pass a memmap as out to keep big rasters off the heap.
+    '''
+
+    if out is None:
+        out = np.zeros((len(layers), resolution, resolution), dtype=bool)
+
+    for index, (points, tris) in enumerate(layers):
+        rasterize_layer(points, tris, resolution, chunk_rows, out=out[index])
+
+    return out
+
+
+# ---- export ----
+def save_materials_png(materials: np.ndarray, file_path: str):
+    '''
+    Save a material map as an indexed PNG using the layer colors (transparent where empty).
+    '''
+
+    h, w = materials.shape
+    data = np.ascontiguousarray(materials, dtype=np.uint8)
+    img = QtGui.QImage(data.data, w, h, w, QtGui.QImage.Format_Indexed8)
+
+    table = [QtGui.qRgba(0, 0, 0, 0)] * 256
+    for index, color in enumerate(LAYER_COLORS):
+        table[index] = color.rgba()
+    img.setColorTable(table)
+
+    if not img.copy().save(file_path):
+        raise IOError(f"Could not write {file_path}")
+
+
+def save_mask_png(mask: np.ndarray, file_path: str):
+    h, w = mask.shape
+    data = np.ascontiguousarray(mask, dtype=np.uint8) * np.uint8(255)
+    img = QtGui.QImage(data.data, w, h, w, QtGui.QImage.Format_Grayscale8)
+
+    if not img.copy().save(file_path):
+        raise IOError(f"Could not write {file_path}")
+
+
+def export_tile(layers: Sequence, out_dir: str, resolution: int = 1024, chunk_rows: int = 256, formats: Sequence[str] = ('png', 'npy'), masks: bool = True):
+    '''
+    Write materials.(png|npy) and one mask_<layer>.(png|npy) per layer into out_dir.
+
+    NPY output is written straight into memory mapped files, so only a chunk of rows is ever held in memory.
+    '''
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    def target(name, dtype, shape):
+        if 'npy' in formats:
+            return np.lib.format.open_memmap(os.path.join(out_dir, name + '.npy'), mode='w+', dtype=dtype, shape=shape)
+        return None
+
+    materials = rasterize_materials(layers, resolution, chunk_rows, out=target('materials', np.uint8, (resolution, resolution)))
+    if 'png' in formats:
+        save_materials_png(materials, os.path.join(out_dir, 'materials.png'))
+    if isinstance(materials, np.memmap):
+        materials.flush()
+
+    if not masks:
+        return
+
+    for name, (points, tris) in zip(RENDER_ORDER, layers):
+        mask = rasterize_layer(points, tris, resolution, chunk_rows, out=target(f'mask_{name}', bool, (resolution, resolution)))
+        if 'png' in formats:
+            save_mask_png(mask, os.path.join(out_dir, f'mask_{name}.png'))
+        if isinstance(mask, np.memmap):
+            mask.flush()
+
+
+if __name__ == '__main__':
+
+    from .tile_io import read_tile_layers
+
+    parser = argparse.ArgumentParser(description="Rasterize a .bin tile into material / coverage maps.")
+    parser.add_argument('tile', help="path to the .bin tile")
+    parser.add_argument('out_dir', help="output directory")
+    parser.add_argument('--resolution', type=int, default=1024)
+    parser.add_argument('--chunk-rows', type=int, default=256)
+    parser.add_argument('--format', nargs='+', choices=['png', 'npy'], default=['png', 'npy'])
+    parser.add_argument('--no-masks', action='store_true', help="only write the material map")
+    args = parser.parse_args()
+
+    export_tile(read_tile_layers(args.tile), args.out_dir, args.resolution, args.chunk_rows, args.format, not args.no_masks)
@@ -0,0 +1,293 @@
+import argparse
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from ..components.topology import MeshTopology, edge_key
+from ..constants import RENDER_ORDER
+from .tile_io import read_tile_layers
+
+import numpy as np
+
+DEFAULT_TOLERANCE = 1e-3     # closer than this along a seam is the same vertex
+DEFAULT_SNAP_TOLERANCE = 0.5 # closer than this gets snapped onto the neighbour's vertex, further away gets a new vertex
+
+# side -> (axis of the fixed coordinate, its value). Scene y points down, so north is y = -500.
+SIDES = {
+    'west': (0, -500.0),
+    'east': (0, 500.0),
+    'north': (1, -500.0),
+    'south': (1, 500.0),
+}
+OPPOSITE = {'west': 'east', 'east': 'west', 'north': 'south', 'south': 'north'}
+
+# grid step to the neighbour on each side, tiles named <anything>_<x>_<y>.bin with y growing southwards
+GRID_OFFSETS = {'west': (-1, 0), 'east': (1, 0), 'north': (0, -1), 'south': (0, 1)}
+GRID_NAME = re.compile(r'_(-?\d+)_(-?\d+)\.bin$', re.IGNORECASE)
+
+Layer = tuple[list[tuple[float, float]], list[tuple[int, int, int]]]
+
+def side_vertices(pts: list[tuple[float, float]], side: str, tol: float = DEFAULT_TOLERANCE) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Vertices lying on a tile side, as (position along the side, vertex index), sorted by position.
+    '''
+
+    axis, value = SIDES[side]
+    if not pts:
+        return np.empty(0), np.empty(0, dtype=np.int64)
+
+    coords = np.asarray(pts, dtype=np.float64).reshape(-1, 2)
+    on_side = np.flatnonzero(np.abs(coords[:, axis] - value) <= tol)
+    along = coords[on_side, 1 - axis]
+    order = np.argsort(along, kind='stable')
+    return along[order], on_side[order]
+
+
+def _nearest_distance(values: np.ndarray, sorted_other: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # distance from every value to the closest entry of sorted_other (and that entry's position), vectorized
+    if not len(sorted_other):
+        return np.full(len(values), np.inf), np.zeros(len(values), dtype=np.int64)
+
+    right = np.clip(np.searchsorted(sorted_other, values), 0, len(sorted_other) - 1)
+    left = np.clip(right - 1, 0, len(sorted_other) - 1)
+    d_right = np.abs(sorted_other[right] - values)
+    d_left = np.abs(sorted_other[left] - values)
+    use_left = d_left < d_right
+    return np.where(use_left, d_left, d_right), np.where(use_left, left, right)
+
+
+class SeamMismatch:
+    """
+    One vertex on a seam without a partner on the other tile.
+
+    kind: 'offset'  - ours is close to theirs (within snap tolerance) but not on it, fixed by snapping
+          'missing' - theirs has a vertex here that ours doesn't, fixed by inserting one
+          'extra'   - ours has a vertex the neighbour lacks, only the neighbour can fix that
+    """
+
+    def __init__(self, layer: int, side: str, kind: str, along: float, target: Optional[float] = None):
+        self.layer = layer
+        self.side = side
+        self.kind = kind
+        self.along = along
+        self.target = target
+
+    def position(self) -> tuple[float, float]:
+        axis, value = SIDES[self.side]
+        return (value, self.along) if axis == 0 else (self.along, value)
+
+    def __str__(self):
+        name = RENDER_ORDER[self.layer] if self.layer < len(RENDER_ORDER) else str(self.layer)
+        x, y = self.position()
+        return f"{name} {self.side}: {self.kind} vertex at ({x:.3f}, {y:.3f})"
+
+
+def check_layer_seam(ours: Layer, theirs: Layer, side: str, layer: int = 0,
+                     tol: float = DEFAULT_TOLERANCE, snap_tol: float = DEFAULT_SNAP_TOLERANCE) -> list[SeamMismatch]:
+    '''
+    Compare our vertices on side with the neighbour's vertices on the opposite side.
+    '''
+
+    our_along, _ = side_vertices(ours[0], side, tol)
+    their_along, _ = side_vertices(theirs[0], OPPOSITE[side], tol)
+
+    out = []
+    dist, nearest = _nearest_distance(our_along, their_along)
+    for along, d, n in zip(our_along.tolist(), dist.tolist(), nearest.tolist()):
+        if d <= tol:
+            continue
+        if d <= snap_tol:
+            out.append(SeamMismatch(layer, side, 'offset', along, float(their_along[n])))
+        else:
+            out.append(SeamMismatch(layer, side, 'extra', along))
+
+    # neighbour vertices nothing of ours comes close to
+    dist, _ = _nearest_distance(their_along, our_along)
+    for along in their_along[dist > snap_tol].tolist():
+        out.append(SeamMismatch(layer, side, 'missing', along, along))
+
+    return out
+
+
+def check_tile_seam(ours: list[Layer], theirs: list[Layer], side: str,
+                    tol: float = DEFAULT_TOLERANCE, snap_tol: float = DEFAULT_SNAP_TOLERANCE) -> list[SeamMismatch]:
+    out = []
+    for layer, (a, b) in enumerate(zip(ours, theirs)):
+        out.extend(check_layer_seam(a, b, side, layer, tol, snap_tol))
+    return out
+
+
+def stitch_layer(layer: Layer, side: str, targets: np.ndarray,
+                 tol: float = DEFAULT_TOLERANCE, snap_tol: float = DEFAULT_SNAP_TOLERANCE) -> tuple[Layer, int, int, list[float]]:
+    '''
+    Make a layer have a vertex at every target position along side.
+
+    Close vertices are snapped onto the target, otherwise the boundary edge spanning the target is split (and its triangle with it).
+    Returns (layer, snapped, inserted, targets which no boundary edge spans, i.e: the layer doesn't reach the seam there).
+    '''
+
+    pts = list(layer[0])
+    tris = list(layer[1])
+    axis, value = SIDES[side]
+
+    def make_point(along: float) -> tuple[float, float]:
+        return (value, along) if axis == 0 else (along, value)
+
+    targets = np.unique(np.asarray(targets, dtype=np.float64))
+    snapped = inserted = 0
+    missed: list[float] = []
+
+    # 1. snap: pair each target with our closest side vertex, closest pairs first
+    along, indices = side_vertices(pts, side, tol)
+    unresolved = []
+    if len(targets):
+        dist, nearest = _nearest_distance(targets, along)
+        used = set()
+        for t in np.argsort(dist, kind='stable').tolist():
+            d, n = float(dist[t]), int(nearest[t])
+            if d <= snap_tol and n not in used:
+                used.add(n)
+                if pts[indices[n]] != make_point(float(targets[t])):
+                    pts[indices[n]] = make_point(float(targets[t]))
+                    snapped += 1
+            elif d > tol:
+                unresolved.append(float(targets[t]))
+
+    # 2. insert: split the boundary edge on this side which spans the target
+    topo = MeshTopology(tris)
+    side_edges = []
+    for a, b in topo.boundary_edges():
+        if abs(pts[a][axis] - value) <= tol and abs(pts[b][axis] - value) <= tol:
+            side_edges.append((a, b))
+
+    for t in sorted(unresolved):
+        edge = next((
+            (a, b) for a, b in side_edges
+            if min(pts[a][1 - axis], pts[b][1 - axis]) + tol < t < max(pts[a][1 - axis], pts[b][1 - axis]) - tol
+        ), None)
+        if edge is None:
+            missed.append(t)
+            continue
+
+        a, b = edge
+        tri_idx = topo.edge_triangles(a, b)[0]
+        tri = tris[tri_idx]
+        new = len(pts)
+        pts.append(make_point(t))
+
+        # keep the winding: the edge a-b appears in tri as (p, q), replace by (p, new) + (new, q)
+        i = next(i for i in range(3) if edge_key(tri[i], tri[(i + 1) % 3]) == edge_key(a, b))
+        p, q, r = tri[i], tri[(i + 1) % 3], tri[(i + 2) % 3]
+        topo.remove_triangle(tri_idx, tri)
+        tris[tri_idx] = (p, new, r)
+        topo.add_triangle(tri_idx, tris[tri_idx])
+        tris.append((new, q, r))
+        topo.add_triangle(len(tris) - 1, tris[-1])
+
+        side_edges.remove(edge)
+        side_edges.extend(((a, new), (new, b)))
+        inserted += 1
+
+    return (pts, tris), snapped, inserted, missed
+
+
+def stitch_tile(ours: list[Layer], neighbours: dict[str, list[Layer]],
+                tol: float = DEFAULT_TOLERANCE, snap_tol: float = DEFAULT_SNAP_TOLERANCE) -> tuple[list[Layer], list[str]]:
+    '''
+    Stitch our tile onto its neighbours ({side: neighbour layers}). Only our tile changes, so vertices the neighbour lacks stay reported.
+    Returns (new layers, report lines).
+    '''
+
+    layers = list(ours)
+    report = []
+    for side, theirs in neighbours.items():
+        for layer, their_layer in enumerate(theirs[:len(layers)]):
+            targets, _ = side_vertices(their_layer[0], OPPOSITE[side], tol)
+            if not len(targets):
+                continue
+
+            layers[layer], snapped, inserted, missed = stitch_layer(layers[layer], side, targets, tol, snap_tol)
+            name = RENDER_ORDER[layer] if layer < len(RENDER_ORDER) else str(layer)
+            if snapped or inserted:
+                report.append(f"{name} {side}: snapped {snapped}, inserted {inserted}")
+            if missed:
+                report.append(f"{name} {side}: {len(missed)} neighbour vertices where this layer doesn't reach the seam")
+
+        extra = [m for m in check_tile_seam(layers, theirs, side, tol, snap_tol) if m.kind == 'extra']
+        if extra:
+            report.append(f"{side}: {len(extra)} vertices the neighbour is missing")
+
+    return layers, report
+
+
+# ---- batch (whole map grid) ----
+def grid_positions(paths: list[str]) -> dict[tuple[int, int], str]:
+    '''
+    {(x, y): path} for tiles named <anything>_<x>_<y>.bin. Other files are ignored.
+    '''
+
+    out = {}
+    for path in paths:
+        match = GRID_NAME.search(os.path.basename(path))
+        if match:
+            out[(int(match.group(1)), int(match.group(2)))] = path
+    return out
+
+
+def _check_pair(path: str, neighbour_path: str, side: str, tol: float, snap_tol: float) -> list[SeamMismatch]:
+    return check_tile_seam(read_tile_layers(path), read_tile_layers(neighbour_path), side, tol, snap_tol)
+
+
+def check_grid(paths: list[str], workers: Optional[int] = None,
+               tol: float = DEFAULT_TOLERANCE, snap_tol: float = DEFAULT_SNAP_TOLERANCE) -> dict[tuple[str, str, str], list[SeamMismatch]]:
+    '''
+    Check every east / south seam of a map grid, one process per seam. Returns {(tile, side, neighbour): mismatches} for seams with mismatches.
+    '''
+
+    grid = grid_positions(paths)
+    pairs = []
+    for (x, y), path in sorted(grid.items()):
+        for side in ('east', 'south'):
+            dx, dy = GRID_OFFSETS[side]
+            neighbour = grid.get((x + dx, y + dy))
+            if neighbour is not None:
+                pairs.append((path, side, neighbour))
+
+    result = {}
+    if not pairs:
+        return result
+
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = {pool.submit(_check_pair, path, neighbour, side, tol, snap_tol): (path, side, neighbour) for path, side, neighbour in pairs}
+        for future, key in futures.items():
+            mismatches = future.result()
+            if mismatches:
+                result[key] = mismatches
+
+    return result
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Report seam mismatches between neighbouring tiles (named <name>_<x>_<y>.bin).")
+    parser.add_argument('directory')
+    parser.add_argument('--tol', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--snap-tol', type=float, default=DEFAULT_SNAP_TOLERANCE)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    tiles = sorted(
+        os.path.join(args.directory, name) for name in os.listdir(args.directory)
+        if name.lower().endswith('.bin')
+    )
+
+    result = check_grid(tiles, args.workers, args.tol, args.snap_tol)
+    for (path, side, neighbour), mismatches in result.items():
+        print(f'{os.path.basename(path)} {side} -> {os.path.basename(neighbour)}: {len(mismatches)} mismatches')
+        for m in mismatches:
+            print(f'    {m}')
+    if not result:
+        print('all seams match')
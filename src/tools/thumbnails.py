@@ -0,0 +1,113 @@
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from ..components.tile_renderer import TileRenderer
+from ..constants import LAYER_COLORS
+from ..utility import cache_dir
+from .digest_index import DigestIndex
+from .tile_io import load_tile_models
+
+from PySide6 import QtGui
+
+INDEX_NAME = 'index.json'
+
+def render_thumbnail(file_path: str, size: int) -> QtGui.QImage:
+    '''
+    Render a tile file to a size x size image. Needs a QGuiApplication (QT_QPA_PLATFORM=offscreen works fine).
+    '''
+
+    renderer = TileRenderer(load_tile_models(file_path), LAYER_COLORS)
+    return renderer.render_image(size)
+
+
+def _init_worker():
+    # each worker process needs its own (headless) gui application
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    if QtGui.QGuiApplication.instance() is None:
+        global _worker_app
+        _worker_app = QtGui.QGuiApplication([])
+
+
+def _render_to_file(file_path: str, out_path: str, size: int) -> str:
+    img = render_thumbnail(file_path, size)
+    tmp_path = out_path + '.tmp.png'
+    if not img.save(tmp_path):
+        raise IOError(f"Could not write {out_path}")
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+class ThumbnailCache:
+    """On-disk tile thumbnails, keyed by file content. Size / mtime are only used to skip re-hashing unchanged files."""
+
+    def __init__(self, directory: Optional[str] = None, size: int = 256):
+        self.directory = directory or cache_dir('thumbnails')
+        os.makedirs(self.directory, exist_ok=True)
+        self.size = size
+
+        self._digests = DigestIndex(os.path.join(self.directory, INDEX_NAME))
+
+    def digest(self, file_path: str) -> str:
+        return self._digests.digest(file_path)
+
+    def thumbnail_path(self, file_path: str) -> str:
+        return os.path.join(self.directory, f'{self.digest(file_path)}_{self.size}.png')
+
+    def get(self, file_path: str) -> QtGui.QImage:
+        '''
+        Cached thumbnail for file_path, rendering it in-process if missing.
+        '''
+
+        out_path = self.thumbnail_path(file_path)
+        self._digests.save()
+
+        if not os.path.exists(out_path):
+            _render_to_file(file_path, out_path, self.size)
+
+        return QtGui.QImage(out_path)
+
+    def render_directory(self, directory: str, workers: Optional[int] = None) -> dict[str, str]:
+        '''
+        Make sure every .bin file in directory has a thumbnail, rendering the missing ones in a process pool. Returns {tile path: thumbnail path}.
+        '''
+
+        tiles = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+            if name.lower().endswith('.bin')
+        )
+
+        result = {path: self.thumbnail_path(path) for path in tiles}
+        self._digests.save()
+
+        # identical files share a thumbnail, only render each once
+        todo = {}
+        for path, out_path in result.items():
+            if not os.path.exists(out_path):
+                todo.setdefault(out_path, path)
+
+        if todo:
+            ctx = multiprocessing.get_context('spawn') # don't fork a process which might already own a QApplication
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker) as pool:
+                futures = [pool.submit(_render_to_file, path, out_path, self.size) for out_path, path in todo.items()]
+                for future in futures:
+                    future.result()
+
+        return result
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description="Render (cached) thumbnails for every tile in a directory.")
+    parser.add_argument('directory')
+    parser.add_argument('--size', type=int, default=256)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-dir', default=None)
+    args = parser.parse_args()
+
+    _init_worker()
+    cache = ThumbnailCache(args.cache_dir, args.size)
+    for tile, thumb in cache.render_directory(args.directory, args.workers).items():
+        print(f'{tile} -> {thumb}')
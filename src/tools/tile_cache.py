@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+from typing import Optional
+
+from ..utility import cache_dir
+from .digest_index import DigestIndex
+from .tile_io import read_tile_layers
+
+import numpy as np
+
+CACHE_VERSION = 1
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+INDEX_NAME = 'index.json'
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            pass
+    return total
+
+
+class TileCache:
+    """
+    Decoded tiles on disk, so reopening an unchanged tile skips parsing.
+
+    One directory per file content hash, holding points.npy (all layers, float64 (N, 2)), tris.npy (int32 (M, 3)) and offsets.npy (per layer start / end into both). Entries are memory mapped on load, and the least recently used ones are evicted past max_bytes.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or cache_dir('tiles')
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self._digests = DigestIndex(os.path.join(self.directory, INDEX_NAME))
+
+    def _entry_path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest)
+
+    def load(self, file_path: str) -> list[tuple[np.ndarray, np.ndarray]]:
+        '''
+        (points, triangles) arrays per layer in RENDER_ORDER, from the cache if possible, parsed (and cached) otherwise.
+        '''
+
+        digest = self._digests.digest(file_path)
+        self._digests.save()
+
+        layers = self._read_entry(digest)
+        if layers is not None:
+            return layers
+
+        layers = [
+            (np.asarray(verts, dtype=np.float64).reshape(-1, 2), np.asarray(tris, dtype=np.int32).reshape(-1, 3))
+            for verts, tris in read_tile_layers(file_path)
+        ]
+        self._write_entry(digest, layers)
+        self.evict()
+        return layers
+
+    def _read_entry(self, digest: str) -> Optional[list[tuple[np.ndarray, np.ndarray]]]:
+        path = self._entry_path(digest)
+        try:
+            with open(os.path.join(path, 'meta.json')) as f:
+                if json.load(f).get('version') != CACHE_VERSION:
+                    return None
+            points = np.load(os.path.join(path, 'points.npy'), mmap_mode='r')
+            tris = np.load(os.path.join(path, 'tris.npy'), mmap_mode='r')
+            offsets = np.load(os.path.join(path, 'offsets.npy'))
+        except (OSError, ValueError):
+            return None
+
+        os.utime(path) # mark as recently used
+
+        return [
+            (points[p0:p1], tris[t0:t1])
+            for p0, p1, t0, t1 in offsets.tolist()
+        ]
+
+    def _write_entry(self, digest: str, layers: list[tuple[np.ndarray, np.ndarray]]):
+        offsets = []
+        p0 = t0 = 0
+        for points, tris in layers:
+            offsets.append((p0, p0 + len(points), t0, t0 + len(tris)))
+            p0 += len(points)
+            t0 += len(tris)
+
+        # write into a private directory first, then move it in place in one go
+        tmp_path = self._entry_path(f'{digest}.{os.getpid()}.tmp')
+        os.makedirs(tmp_path, exist_ok=True)
+        np.save(os.path.join(tmp_path, 'points.npy'), np.concatenate([p for p, _ in layers]) if layers else np.empty((0, 2)))
+        np.save(os.path.join(tmp_path, 'tris.npy'), np.concatenate([t for _, t in layers]) if layers else np.empty((0, 3), np.int32))
+        np.save(os.path.join(tmp_path, 'offsets.npy'), np.asarray(offsets, dtype=np.int64).reshape(-1, 4))
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump({'version': CACHE_VERSION}, f)
+
+        try:
+            os.rename(tmp_path, self._entry_path(digest))
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True) # someone else cached it first
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.tmp') or not os.path.isdir(path):
+                continue
+            entries.append((os.path.getmtime(path), _dir_size(path), path))
+        return entries
+
+    def evict(self):
+        '''
+        Drop least recently used entries until the cache fits in max_bytes.
+        '''
+
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self._entries():
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,239 @@
+from collections import defaultdict
+
+from ..components.topology import edge_key
+from ..constants import RENDER_ORDER
+from ..utility import SpatialHash
+
+DEFAULT_TOLERANCE = 1e-3
+
+Layer = tuple[list[tuple[float, float]], list[tuple[int, int, int]]]
+
+class LayerDiff:
+    """
+    Differences between two versions (old -> new) of one layer.
+
+    Vertex / triangle indices refer to the old or the new lists, as named.
+    """
+
+    def __init__(self):
+        self.vertex_map: dict[int, int] = {}                # old -> new, for every vertex which survived (moved or not)
+        self.added_vertices: list[int] = []                 # new
+        self.removed_vertices: list[int] = []               # old
+        self.moved_vertices: list[tuple[int, int]] = []     # (old, new)
+        self.added_triangles: list[int] = []                # new
+        self.removed_triangles: list[int] = []              # old
+
+    def is_empty(self) -> bool:
+        return not (self.added_vertices or self.removed_vertices or self.moved_vertices
+                    or self.added_triangles or self.removed_triangles)
+
+    def summary(self) -> str:
+        return (f"+{len(self.added_vertices)} -{len(self.removed_vertices)} ~{len(self.moved_vertices)} vertices, "
+                f"+{len(self.added_triangles)} -{len(self.removed_triangles)} triangles")
+
+
+def _tri_key(tri) -> tuple[int, int, int]:
+    return tuple(sorted(tri))
+
+
+def diff_layer(old: Layer, new: Layer, tol: float = DEFAULT_TOLERANCE) -> LayerDiff:
+    '''
+    Match the vertices of two versions of a layer, and report what changed.
+
+    1. vertices at the same spot (within tol) are the same vertex (spatial hash, so linear-ish)
+    2. a leftover old vertex whose triangle lost it, where the matching new triangle (same other two vertices) has a leftover new vertex instead, was moved. This spreads across the mesh with a work queue.
+    3. whatever is still unmatched was removed / added, triangles are compared through the vertex map.
+    '''
+
+    old_pts, old_tris = old
+    new_pts, new_tris = new
+    diff = LayerDiff()
+
+    # 1. positional matching
+    grid = SpatialHash(max(tol, 1e-9) * 2, new_pts)
+    matched_new: set[int] = set()
+    for oi, (x, y) in enumerate(old_pts):
+        ni = grid.nearest(x, y, tol, matched_new)
+        if ni >= 0:
+            diff.vertex_map[oi] = ni
+            matched_new.add(ni)
+
+    # 2. moved vertices, by topology
+    new_edge_thirds: dict[tuple[int, int], list[int]] = defaultdict(list)
+    for i, j, k in new_tris:
+        new_edge_thirds[edge_key(i, j)].append(k)
+        new_edge_thirds[edge_key(j, k)].append(i)
+        new_edge_thirds[edge_key(k, i)].append(j)
+
+    old_vert_tris: dict[int, list[int]] = defaultdict(list)
+    for ti, tri in enumerate(old_tris):
+        for v in tri:
+            old_vert_tris[v].append(ti)
+
+    queue = list(range(len(old_tris)))
+    while queue:
+        ti = queue.pop()
+        tri = old_tris[ti]
+        unmatched = [v for v in tri if v not in diff.vertex_map]
+        if len(unmatched) != 1:
+            continue
+        u = unmatched[0]
+        a, b = (diff.vertex_map[v] for v in tri if v != u)
+        candidates = [w for w in new_edge_thirds.get(edge_key(a, b), ()) if w not in matched_new]
+        if len(candidates) != 1:
+            continue
+
+        w = candidates[0]
+        diff.vertex_map[u] = w
+        matched_new.add(w)
+        diff.moved_vertices.append((u, w))
+        queue.extend(old_vert_tris[u]) # neighbours may be resolvable now
+
+    diff.removed_vertices = [oi for oi in range(len(old_pts)) if oi not in diff.vertex_map]
+    diff.added_vertices = [ni for ni in range(len(new_pts)) if ni not in matched_new]
+
+    # 3. triangles, through the vertex map
+    new_keys: dict[tuple[int, int, int], list[int]] = defaultdict(list)
+    for ti, tri in enumerate(new_tris):
+        new_keys[_tri_key(tri)].append(ti)
+
+    kept_new: set[int] = set()
+    for ti, tri in enumerate(old_tris):
+        if all(v in diff.vertex_map for v in tri):
+            owners = new_keys.get(_tri_key(diff.vertex_map[v] for v in tri))
+            if owners:
+                kept_new.add(owners.pop())
+                continue
+        diff.removed_triangles.append(ti)
+
+    diff.added_triangles = [ti for ti in range(len(new_tris)) if ti not in kept_new]
+
+    return diff
+
+
+def diff_tiles(old_layers: list[Layer], new_layers: list[Layer], tol: float = DEFAULT_TOLERANCE) -> list[LayerDiff]:
+    return [diff_layer(old, new, tol) for old, new in zip(old_layers, new_layers)]
+
+
+class MergeConflict:
+    """A change which could not be merged automatically. position is in tile coordinates."""
+
+    def __init__(self, layer: int, kind: str, position: tuple[float, float]):
+        self.layer = layer
+        self.kind = kind
+        self.position = position
+
+    def __str__(self):
+        name = RENDER_ORDER[self.layer] if self.layer < len(RENDER_ORDER) else str(self.layer)
+        return f"{name}: {self.kind} at ({self.position[0]:.3f}, {self.position[1]:.3f})"
+
+
+def _moved(p, q, tol) -> bool:
+    return (p[0] - q[0]) ** 2 + (p[1] - q[1]) ** 2 > tol * tol
+
+
+def merge_layer(base: Layer, ours: Layer, theirs: Layer, tol: float = DEFAULT_TOLERANCE, layer: int = 0) -> tuple[Layer, list[MergeConflict]]:
+    '''
+    Three-way merge of one layer. Non-conflicting edits from both sides are applied; on conflicts ours wins and the conflict is reported.
+    '''
+
+    base_pts, base_tris = base
+    ours_pts, ours_tris = ours
+    theirs_pts, theirs_tris = theirs
+
+    d_ours = diff_layer(base, ours, tol)
+    d_theirs = diff_layer(base, theirs, tol)
+    conflicts: list[MergeConflict] = []
+
+    merged_pts: list[tuple[float, float]] = []
+    ours_to_merged: dict[int, int] = {}
+    theirs_to_merged: dict[int, int] = {}
+    base_to_merged: dict[int, int] = {}
+
+    # base vertices: removed / moved on either side
+    for bi, bp in enumerate(base_pts):
+        oi = d_ours.vertex_map.get(bi)
+        ti = d_theirs.vertex_map.get(bi)
+        op = ours_pts[oi] if oi is not None else None
+        tp = theirs_pts[ti] if ti is not None else None
+        ours_moved = op is not None and _moved(op, bp, tol)
+        theirs_moved = tp is not None and _moved(tp, bp, tol)
+
+        if op is None and tp is None:
+            continue # removed on both sides
+
+        if op is None or tp is None:
+            # removed on one side; fine unless the other side moved it
+            if (op is None and theirs_moved) or (tp is None and ours_moved):
+                conflicts.append(MergeConflict(layer, "vertex moved on one side, removed on the other", bp))
+                if op is None:
+                    continue # ours wins: stays removed
+            else:
+                continue
+            pos = op
+        elif ours_moved and theirs_moved and _moved(op, tp, tol):
+            conflicts.append(MergeConflict(layer, "vertex moved differently on both sides", bp))
+            pos = op
+        else:
+            pos = tp if theirs_moved else op
+
+        base_to_merged[bi] = len(merged_pts)
+        merged_pts.append(pos)
+        if oi is not None:
+            ours_to_merged[oi] = base_to_merged[bi]
+        if ti is not None:
+            theirs_to_merged[ti] = base_to_merged[bi]
+
+    # added vertices, the same new point on both sides is only added once
+    added = SpatialHash(max(tol, 1e-9) * 2)
+    added_merged: list[int] = []
+    for oi in d_ours.added_vertices:
+        ours_to_merged[oi] = len(merged_pts)
+        added.add(ours_pts[oi])
+        added_merged.append(len(merged_pts))
+        merged_pts.append(ours_pts[oi])
+    for ti in d_theirs.added_vertices:
+        x, y = theirs_pts[ti]
+        same = added.nearest(x, y, tol)
+        if same >= 0:
+            theirs_to_merged[ti] = added_merged[same]
+            continue
+        theirs_to_merged[ti] = len(merged_pts)
+        merged_pts.append((x, y))
+
+    # triangles
+    merged_tris: list[tuple[int, int, int]] = []
+    seen: set[tuple[int, int, int]] = set()
+
+    def emit(tri, index_map, pts, added_side):
+        mapped = [index_map.get(v) for v in tri]
+        if any(v is None for v in mapped):
+            if added_side:
+                x, y = pts[tri[0]]
+                conflicts.append(MergeConflict(layer, "triangle added on a vertex removed by the other side", (x, y)))
+            return
+        key = _tri_key(mapped)
+        if key in seen or len(set(mapped)) != 3:
+            return
+        seen.add(key)
+        merged_tris.append(tuple(mapped))
+
+    removed = set(d_ours.removed_triangles) | set(d_theirs.removed_triangles)
+    for ti, tri in enumerate(base_tris):
+        if ti not in removed:
+            emit(tri, base_to_merged, base_pts, False)
+    for ti in d_ours.added_triangles:
+        emit(ours_tris[ti], ours_to_merged, ours_pts, True)
+    for ti in d_theirs.added_triangles:
+        emit(theirs_tris[ti], theirs_to_merged, theirs_pts, True)
+
+    return (merged_pts, merged_tris), conflicts
+
+
+def merge_tiles(base: list[Layer], ours: list[Layer], theirs: list[Layer], tol: float = DEFAULT_TOLERANCE) -> tuple[list[Layer], list[MergeConflict]]:
+    merged, conflicts = [], []
+    for index, (b, o, t) in enumerate(zip(base, ours, theirs)):
+        layer, layer_conflicts = merge_layer(b, o, t, tol, index)
+        merged.append(layer)
+        conflicts.extend(layer_conflicts)
+    return merged, conflicts
@@ -0,0 +1,73 @@
+from typing import Optional
+
+from ..components.model import MeshModel
+from ..constants import RENDER_ORDER
+
+from PySide6 import QtCore
+
+from sw_ducky import MapGeometry
+
+import numpy as np
+
+def read_tile_layers(file_path: str, cache=None) -> list[tuple[list[tuple[float, float]], list[tuple[int, int, int]]]]:
+    '''
+    Parse a .bin tile, and return (vertices, triangles) for every layer, in RENDER_ORDER.
+
+    cache: optional TileCache, used instead of parsing the file when it has seen the same content before.
+    '''
+
+    if cache is not None:
+        return [
+            (list(map(tuple, verts.tolist())), list(map(tuple, tris.tolist())))
+            for verts, tris in cache.load(file_path)
+        ]
+
+    map_geo = MapGeometry.from_file(file_path)
+
+    layers = []
+    for key in RENDER_ORDER:
+        verts = [(float(x), float(y)) for x, y in map_geo.terrain_vertices[key]]
+        tris = [tuple(int(v) for v in t) for t in map_geo.terrain_tris[key]]
+        layers.append((verts, tris))
+
+    return layers
+
+
+def load_tile_models(file_path: str, models: Optional[list[MeshModel]] = None, cache=None) -> list[MeshModel]:
+    '''
+    Load a .bin tile into MeshModels. Fills the given models if provided, otherwise creates new ones.
+
+    cache: see read_tile_layers.
+    '''
+
+    if models is None:
+        models = [MeshModel() for _ in RENDER_ORDER]
+
+    set_model_layers(models, read_tile_layers(file_path, cache))
+
+    return models
+
+
+def model_layers(models: list[MeshModel]) -> list[tuple[list[tuple[float, float]], list[tuple[int, int, int]]]]:
+    '''
+    Current model geometry as plain (vertices, triangles) lists, same shape as read_tile_layers.
+    '''
+
+    return [([(p.x(), p.y()) for p in m.points()], list(m.triangles())) for m in models]
+
+
+def set_model_layers(models: list[MeshModel], layers):
+    for model, (verts, tris) in zip(models, layers):
+        model.set_geometry((QtCore.QPointF(x, y) for x, y in verts), tris)
+
+
+def layer_arrays(model: MeshModel) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Model geometry as numpy arrays: points (N, 2) float64, triangles (M, 3) int64.
+    '''
+
+    pts = model.points()
+    points = np.fromiter((c for p in pts for c in (p.x(), p.y())), dtype=np.float64, count=2 * len(pts)).reshape(-1, 2)
+    tris = np.asarray(model.triangles(), dtype=np.int64).reshape(-1, 3)
+
+    return points, tris
@@ -1,2 +1,6 @@
 from .darklight_switch import darklight_switch, darklight_from_lightcolor
-from .snap import snap_axis, snap_point
\ No newline at end of file
+from .snap import snap_axis, snap_point, snap_array
+from .paths import cache_dir, data_dir, file_digest
+from .profiler import PROFILER, Profiler, profiled
+from .spatial_hash import SpatialHash
+from .transform import selection_transform, transform_coords
@@ -0,0 +1,44 @@
+import hashlib
+import os
+from PySide6 import QtCore
+
+APP_DIR_NAME = 'sw-tile-editor'
+
+def cache_dir(name: str) -> str:
+    '''
+    Per-user cache directory for the editor (created if missing). I.e: cache_dir('thumbnails') -> ~/.cache/sw-tile-editor/thumbnails on linux.
+    '''
+
+    base = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.GenericCacheLocation)
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+
+    path = os.path.join(base, APP_DIR_NAME, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def data_dir(name: str) -> str:
+    '''
+    Per-user data directory (created if missing), for things which shouldn't be wiped with the cache. I.e: autosave.
+    '''
+
+    base = QtCore.QStandardPaths.writableLocation(QtCore.QStandardPaths.GenericDataLocation)
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.local', 'share')
+
+    path = os.path.join(base, APP_DIR_NAME, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_digest(file_path: str, chunk_size: int = 1 << 20) -> str:
+    '''
+    Content hash of a file (sha1 hex).
+    '''
+
+    h = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
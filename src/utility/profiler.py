@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+
+MAX_EVENTS = 200000 # oldest trace events get dropped past this
+FRAME_WINDOW = 120  # paints kept per counter for the frame stats
+
+class Profiler:
+    """
+    Toggleable instrumentation: counters, timing spans and paint / frame times.
+
+    Everything is a no-op while disabled, so the hooks can stay in hot paths. Export with export_chrome_trace, and open the file in chrome://tracing or ui.perfetto.dev.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.counters: dict[str, int] = defaultdict(int)
+        self._events: deque = deque(maxlen=MAX_EVENTS)
+        self._paints: dict[str, deque] = {}
+        self._last_paint: dict[str, float] = {}
+        self._t0 = time.perf_counter()
+
+    def _ts(self, t: float) -> float:
+        # chrome trace timestamps are in microseconds
+        return (t - self._t0) * 1e6
+
+    def reset(self):
+        self.counters.clear()
+        self._events.clear()
+        self._paints.clear()
+        self._last_paint.clear()
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] += n
+
+    @contextmanager
+    def span(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._events.append({
+                'name': name, 'ph': 'X', 'ts': self._ts(start), 'dur': (end - start) * 1e6,
+                'pid': os.getpid(), 'tid': threading.get_ident(),
+            })
+
+    def paint(self, name: str, start: float, end: float):
+        '''
+        Record one paint from start to end (perf_counter values). Frame time is the gap between paint starts.
+        '''
+
+        if not self.enabled:
+            return
+
+        last = self._last_paint.get(name)
+        self._last_paint[name] = start
+        frame = (start - last) if last is not None else None
+
+        self._paints.setdefault(name, deque(maxlen=FRAME_WINDOW)).append((end - start, frame))
+        self.counters[name] += 1
+        self._events.append({
+            'name': name, 'ph': 'X', 'ts': self._ts(start), 'dur': (end - start) * 1e6,
+            'pid': os.getpid(), 'tid': threading.get_ident(),
+        })
+
+    def paint_stats(self, name: str) -> tuple[float, float]:
+        '''
+        (average paint ms, average frame ms) over the last FRAME_WINDOW paints.
+        '''
+
+        samples = self._paints.get(name)
+        if not samples:
+            return 0.0, 0.0
+
+        paint_ms = 1000 * sum(p for p, _ in samples) / len(samples)
+        frames = [f for _, f in samples if f is not None]
+        frame_ms = 1000 * sum(frames) / len(frames) if frames else 0.0
+        return paint_ms, frame_ms
+
+    def sample(self, name: str, values: dict):
+        '''
+        Record a counter sample (i.e: scene item counts) as a chrome trace counter track.
+        '''
+
+        if self.enabled:
+            self._events.append({'name': name, 'ph': 'C', 'ts': self._ts(time.perf_counter()), 'pid': os.getpid(), 'args': dict(values)})
+
+    def export_chrome_trace(self, file_path: str):
+        events = list(self._events)
+        events.append({'name': 'counters', 'ph': 'C', 'ts': self._ts(time.perf_counter()), 'pid': os.getpid(), 'args': dict(self.counters)})
+
+        with open(file_path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+
+
+# Shared instance used by all the hooks
+PROFILER = Profiler()
+
+
+def profiled(name: str):
+    '''
+    Decorator version of PROFILER.span.
+    '''
+
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return fn(*args, **kwargs)
+            with PROFILER.span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorate
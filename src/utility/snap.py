@@ -1,6 +1,8 @@
 import math
 from PySide6 import QtCore
 
+import numpy as np
+
 def snap_axis(value: float, size: float) -> float:
 
     '''
@@ -25,6 +27,16 @@ def snap_point(point: QtCore.QPointF, size: float) -> QtCore.QPointF:
     return QtCore.QPointF(new_x, new_y)
 
 
+def snap_array(values: np.ndarray, size: float) -> np.ndarray:
+    '''
+    snap_axis, for a whole array at once.
+    '''
+
+    output = size * np.floor((values + (size / 2)) / size)
+
+    return np.clip(output, -500, 500)
+
+
 if __name__ == '__main__':
 
     print(snap_axis(-15.6, 5))
\ No newline at end of file
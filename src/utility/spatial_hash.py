@@ -0,0 +1,51 @@
+import math
+from typing import Iterable, Optional
+
+class SpatialHash:
+    '''
+    Uniform grid over 2D points, for "anything within tol of here" lookups. Use a cell size >= the search radius, then only the 3x3 neighbouring cells need checking.
+    '''
+
+    def __init__(self, cell: float, points: Iterable[tuple[float, float]] = ()):
+        self.cell = max(cell, 1e-9)
+        self.points: list[tuple[float, float]] = []
+        self._buckets: dict[tuple[int, int], list[int]] = {}
+        for p in points:
+            self.add(p)
+
+    def _key(self, x: float, y: float) -> tuple[int, int]:
+        return (math.floor(x / self.cell), math.floor(y / self.cell))
+
+    def add(self, p: tuple[float, float]) -> int:
+        idx = len(self.points)
+        self.points.append((p[0], p[1]))
+        self._buckets.setdefault(self._key(p[0], p[1]), []).append(idx)
+        return idx
+
+    def near(self, x: float, y: float, tol: float):
+        '''
+        Indices of all points within tol of (x, y).
+        '''
+        cx, cy = self._key(x, y)
+        reach = max(1, math.ceil(tol / self.cell))
+        tol2 = tol * tol
+        for gx in range(cx - reach, cx + reach + 1):
+            for gy in range(cy - reach, cy + reach + 1):
+                for idx in self._buckets.get((gx, gy), ()):
+                    px, py = self.points[idx]
+                    if (px - x) ** 2 + (py - y) ** 2 <= tol2:
+                        yield idx
+
+    def nearest(self, x: float, y: float, tol: float, skip: Optional[set[int]] = None) -> int:
+        '''
+        Closest point within tol (ignoring indices in skip), or -1.
+        '''
+        best, best_d = -1, math.inf
+        for idx in self.near(x, y, tol):
+            if skip and idx in skip:
+                continue
+            px, py = self.points[idx]
+            d = (px - x) ** 2 + (py - y) ** 2
+            if d < best_d:
+                best, best_d = idx, d
+        return best
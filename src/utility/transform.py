@@ -0,0 +1,34 @@
+from typing import Optional
+from PySide6 import QtCore, QtGui
+
+import numpy as np
+
+from .snap import snap_array
+
+def selection_transform(pivot: QtCore.QPointF, dx: float = 0, dy: float = 0, angle: float = 0,
+                        sx: float = 1, sy: float = 1, mirror_x: bool = False, mirror_y: bool = False) -> QtGui.QTransform:
+    '''
+    Scale / mirror / rotate around pivot, then move by (dx, dy). mirror_x flips the x axis (mirror along a vertical line through the pivot).
+    '''
+
+    T = QtGui.QTransform()
+    T.translate(pivot.x() + dx, pivot.y() + dy)
+    T.rotate(angle)
+    T.scale(-sx if mirror_x else sx, -sy if mirror_y else sy)
+    T.translate(-pivot.x(), -pivot.y())
+    return T
+
+
+def transform_coords(coords: np.ndarray, T: QtGui.QTransform, snap: Optional[float] = None) -> np.ndarray:
+    '''
+    Apply an (affine) QTransform to an (N, 2) array in one go, then snap and clamp to the tile.
+    '''
+
+    x, y = coords[:, 0], coords[:, 1]
+    out = np.empty_like(coords, dtype=np.float64)
+    out[:, 0] = T.m11() * x + T.m21() * y + T.dx()
+    out[:, 1] = T.m12() * x + T.m22() * y + T.dy()
+
+    if snap is not None:
+        return snap_array(out, snap)
+    return np.clip(out, -500, 500)
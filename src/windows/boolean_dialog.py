@@ -0,0 +1,33 @@
+from PySide6 import QtWidgets
+from src.constants import RENDER_ORDER
+from src.tools import BOOLEAN_OPS
+
+class BooleanDialog(QtWidgets.QDialog):
+    """Pick a boolean operation between two layers, the result replaces the target layer."""
+
+    def __init__(self, target: int = 0, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Layer Boolean")
+
+        self.target = QtWidgets.QComboBox()
+        self.target.addItems(RENDER_ORDER)
+        self.target.setCurrentIndex(target)
+
+        self.op = QtWidgets.QComboBox()
+        self.op.addItems(list(BOOLEAN_OPS))
+
+        self.operand = QtWidgets.QComboBox()
+        self.operand.addItems(RENDER_ORDER)
+
+        form = QtWidgets.QFormLayout(self)
+        form.addRow("Layer", self.target)
+        form.addRow("Operation", self.op)
+        form.addRow("With", self.operand)
+
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        form.addRow(buttons)
+
+    def values(self) -> tuple[str, int, int]:
+        return self.op.currentText(), self.target.currentIndex(), self.operand.currentIndex()
@@ -1,8 +1,13 @@
 from PySide6 import QtWidgets, QtGui, QtCore
 from src import Main
+from src.utility import PROFILER
+from src.tools import read_tile_layers, model_layers, check_tile_seam, SIDES, RASTER_KINDS
+from src.constants import RENDER_ORDER
+from .transform_dialog import TransformDialog
+from .boolean_dialog import BooleanDialog
 
 class MainWindow(QtWidgets.QMainWindow):
-    def __init__(self):
+    def __init__(self, autosave: bool = True):
         super().__init__()
 
         self.setWindowTitle("SW Mesh Editor (WIP)")
@@ -23,21 +28,129 @@ class MainWindow(QtWidgets.QMainWindow):
         file_menu.addSeparator()
         file_menu.addAction(open_action)
         file_menu.addSeparator()
+
+        compare_action = QtGui.QAction("Compare With...", self)
+        compare_action.triggered.connect(self._on_compare_action)
+        clear_compare_action = QtGui.QAction("Clear Comparison", self)
+        clear_compare_action.triggered.connect(self.main_widget.clear_comparison)
+        merge_action = QtGui.QAction("Merge...", self)
+        merge_action.triggered.connect(self._on_merge_action)
+        file_menu.addAction(compare_action)
+        file_menu.addAction(clear_compare_action)
+        file_menu.addAction(merge_action)
+        import_raster_action = QtGui.QAction("Import Raster...", self)
+        import_raster_action.triggered.connect(self._on_import_raster_action)
+        file_menu.addAction(import_raster_action)
+        seams_action = QtGui.QAction("Stitch Seams...", self)
+        seams_action.triggered.connect(self._on_seams_action)
+        file_menu.addAction(seams_action)
+        file_menu.addSeparator()
         file_menu.addAction(exit_action)
 
         new_action.setShortcut("Ctrl+N")
         open_action.setShortcut("Ctrl+O")
         exit_action.setShortcut("Ctrl+Q")
 
+        # Edit menu, selection tools
+        edit_menu = menubar.addMenu("Edit")
+        copy_action = QtGui.QAction("Copy", self)
+        copy_action.setShortcut(QtGui.QKeySequence.Copy)
+        copy_action.triggered.connect(self.main_widget.copy_selection)
+        paste_action = QtGui.QAction("Paste", self)
+        paste_action.setShortcut(QtGui.QKeySequence.Paste)
+        paste_action.triggered.connect(self.main_widget.paste)
+        transform_action = QtGui.QAction("Transform Selection...", self)
+        transform_action.setShortcut("Ctrl+T")
+        transform_action.triggered.connect(self._on_transform_action)
+        edit_menu.addAction(copy_action)
+        edit_menu.addAction(paste_action)
+        edit_menu.addSeparator()
+        edit_menu.addAction(transform_action)
+        edit_menu.addSeparator()
+
+        select_all_action = QtGui.QAction("Select All", self)
+        select_all_action.setShortcut(QtGui.QKeySequence.SelectAll)
+        select_all_action.triggered.connect(self.main_widget.select_all)
+        deselect_action = QtGui.QAction("Deselect", self)
+        deselect_action.setShortcut("Ctrl+Shift+A")
+        deselect_action.triggered.connect(self.main_widget.clear_selection)
+        invert_action = QtGui.QAction("Invert Selection", self)
+        invert_action.setShortcut("Ctrl+I")
+        invert_action.triggered.connect(self.main_widget.invert_selection)
+        connected_action = QtGui.QAction("Select Connected", self)
+        connected_action.setShortcut("Ctrl+L")
+        connected_action.triggered.connect(self.main_widget.select_connected)
+        edit_menu.addAction(select_all_action)
+        edit_menu.addAction(deselect_action)
+        edit_menu.addAction(invert_action)
+        edit_menu.addAction(connected_action)
+
+        # Layers menu, booleans run in the background
+        layers_menu = menubar.addMenu("Layers")
+        boolean_action = QtGui.QAction("Boolean Operation...", self)
+        boolean_action.triggered.connect(self._on_boolean_action)
+        check_containment_action = QtGui.QAction("Check Containment", self)
+        check_containment_action.triggered.connect(lambda: self._start_layer_job(self.main_widget.check_layer_containment))
+        enforce_containment_action = QtGui.QAction("Enforce Containment", self)
+        enforce_containment_action.triggered.connect(lambda: self._start_layer_job(self.main_widget.enforce_layer_containment))
+        layers_menu.addAction(boolean_action)
+        layers_menu.addSeparator()
+        layers_menu.addAction(check_containment_action)
+        layers_menu.addAction(enforce_containment_action)
+        self.main_widget.layerJobFinished.connect(self._on_layer_job_finished)
+
         # Example Options menu
         options_menu = menubar.addMenu("Options")
         pref_action = QtGui.QAction("Preferences", self)
         options_menu.addAction(pref_action)
+        options_menu.addSeparator()
+
+        # Performance instrumentation
+        profiler_action = QtGui.QAction("Show Profiler", self)
+        profiler_action.setCheckable(True)
+        profiler_action.setShortcut("Ctrl+Shift+P")
+        profiler_action.toggled.connect(self._on_profiler_toggled)
+        options_menu.addAction(profiler_action)
+
+        export_trace_action = QtGui.QAction("Export Trace...", self)
+        export_trace_action.triggered.connect(self._on_export_trace)
+        options_menu.addAction(export_trace_action)
+
+        self.profiler_label = QtWidgets.QLabel()
+        self.statusBar().addPermanentWidget(self.profiler_label)
+        self.statusBar().setVisible(False)
+
+        self._profiler_timer = QtCore.QTimer(self)
+        self._profiler_timer.setInterval(500)
+        self._profiler_timer.timeout.connect(self._update_profiler_label)
 
         new_action.triggered.connect(self._on_new_action)
         open_action.triggered.connect(self._on_open_action)
 
         self._last_dir = ""
+
+        # Offer recovery once the window is up, then start journaling
+        if autosave:
+            QtCore.QTimer.singleShot(0, self._start_autosave)
+
+    def _start_autosave(self):
+        journal = self.main_widget.journal
+        if journal.has_recovery():
+            answer = QtWidgets.QMessageBox.question(
+                self,
+                "Recover Session",
+                "The last session left unsaved edits behind. Recover them?",
+                QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
+            )
+            if answer == QtWidgets.QMessageBox.Yes:
+                self.main_widget.recover_session()
+
+        journal.start(self.main_widget.models)
+
+    def closeEvent(self, e: QtGui.QCloseEvent):
+        # keep the journal around, next start offers to recover it
+        self.main_widget.journal.close()
+        super().closeEvent(e)
     
     def _on_new_action(self):
         print("new action")
@@ -55,4 +168,170 @@ class MainWindow(QtWidgets.QMainWindow):
         try:
             self.main_widget.open_bin_file(path)
         except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Open Error", f"Failed to open file:\n{e}")
\ No newline at end of file
+            QtWidgets.QMessageBox.critical(self, "Open Error", f"Failed to open file:\n{e}")
+
+    def _pick_bin_file(self, title: str) -> str:
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self,
+            title,
+            self._last_dir or "",
+            "Binary Files (*.bin);;All Files (*)"
+        )
+        return path
+
+    def _on_compare_action(self):
+        path = self._pick_bin_file("Compare With BIN file")
+        if not path:
+            return
+        try:
+            other = read_tile_layers(path, self.main_widget.tile_cache)
+            diffs = self.main_widget.compare_with(other)
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Compare Error", f"Failed to compare:\n{e}")
+            return
+
+        lines = [f"{name}: {d.summary()}" for name, d in zip(RENDER_ORDER, diffs) if not d.is_empty()]
+        QtWidgets.QMessageBox.information(self, "Compare", "\n".join(lines) or "No differences.")
+
+    def _on_merge_action(self):
+        base_path = self._pick_bin_file("Merge: pick the common BASE version")
+        if not base_path:
+            return
+        their_path = self._pick_bin_file("Merge: pick THEIR version")
+        if not their_path:
+            return
+        try:
+            cache = self.main_widget.tile_cache
+            conflicts = self.main_widget.merge_with(read_tile_layers(base_path, cache), read_tile_layers(their_path, cache))
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Merge Error", f"Failed to merge:\n{e}")
+            return
+
+        if not conflicts:
+            QtWidgets.QMessageBox.information(self, "Merge", "Merged without conflicts.")
+            return
+
+        shown = "\n".join(str(c) for c in conflicts[:20])
+        more = f"\n... and {len(conflicts) - 20} more" if len(conflicts) > 20 else ""
+        QtWidgets.QMessageBox.warning(self, "Merge", f"Merged with {len(conflicts)} conflicts (kept our side):\n{shown}{more}")
+
+    def _on_seams_action(self):
+        side, ok = QtWidgets.QInputDialog.getItem(self, "Stitch Seams", "Neighbour tile on which side?", list(SIDES), 0, False)
+        if not ok:
+            return
+        path = self._pick_bin_file(f"Stitch Seams: pick the {side} neighbour")
+        if not path:
+            return
+        main = self.main_widget
+        try:
+            theirs = read_tile_layers(path, main.tile_cache)
+        except Exception as e:
+            QtWidgets.QMessageBox.critical(self, "Seams Error", f"Failed to read neighbour:\n{e}")
+            return
+
+        mismatches = check_tile_seam(model_layers(main.models), theirs, side)
+        if not mismatches:
+            QtWidgets.QMessageBox.information(self, "Stitch Seams", "Seam already matches.")
+            return
+
+        shown = "\n".join(str(m) for m in mismatches[:20])
+        more = f"\n... and {len(mismatches) - 20} more" if len(mismatches) > 20 else ""
+        answer = QtWidgets.QMessageBox.question(
+            self,
+            "Stitch Seams",
+            f"{len(mismatches)} mismatches:\n{shown}{more}\n\nStitch this tile onto the neighbour?",
+            QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No,
+        )
+        if answer == QtWidgets.QMessageBox.Yes:
+            report = main.stitch_seams({side: theirs})
+            QtWidgets.QMessageBox.information(self, "Stitch Seams", "\n".join(report) or "Nothing changed.")
+
+    def _on_import_raster_action(self):
+        kind, ok = QtWidgets.QInputDialog.getItem(self, "Import Raster", "The file is a", list(RASTER_KINDS), 0, False)
+        if not ok:
+            return
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self,
+            f"Import {kind}",
+            self._last_dir or "",
+            "Rasters (*.png *.jpg *.bmp *.tif *.tiff *.npy);;All Files (*)"
+        )
+        if not path:
+            return
+        self._start_layer_job(lambda: self.main_widget.import_raster_layers(path, kind))
+
+    def _start_layer_job(self, start) -> bool:
+        if not start():
+            QtWidgets.QMessageBox.information(self, "Layers", "Another layer operation is still running.")
+            return False
+        self.statusBar().setVisible(True)
+        self.statusBar().showMessage("Working on layers...")
+        return True
+
+    def _on_boolean_action(self):
+        dialog = BooleanDialog(self.main_widget.active_mesh, self)
+        if dialog.exec() != QtWidgets.QDialog.Accepted:
+            return
+        op, target, operand = dialog.values()
+        if target == operand:
+            return
+        self._start_layer_job(lambda: self.main_widget.boolean_layers(op, target, operand))
+
+    def _on_layer_job_finished(self, report):
+        self.statusBar().clearMessage()
+        self.statusBar().setVisible(PROFILER.enabled)
+        QtWidgets.QMessageBox.information(self, "Layers", "\n".join(report) or "All layers sit inside their parents.")
+
+    def _on_transform_action(self):
+        main = self.main_widget
+        pivot = main.begin_transform()
+        if pivot is None:
+            QtWidgets.QMessageBox.information(self, "Transform", "Select vertices or triangles of the active (unlocked) mesh first.")
+            return
+
+        dialog = TransformDialog(pivot, self)
+        dialog.transformChanged.connect(main.preview_transform)
+        if dialog.exec() == QtWidgets.QDialog.Accepted:
+            main.apply_transform(dialog.transform())
+        else:
+            main.cancel_transform()
+
+    def _on_profiler_toggled(self, checked: bool):
+        PROFILER.enabled = checked
+        self.statusBar().setVisible(checked)
+        if checked:
+            PROFILER.reset()
+            self._profiler_timer.start()
+            self._update_profiler_label()
+        else:
+            self._profiler_timer.stop()
+
+    def _update_profiler_label(self):
+        editor_paint, editor_frame = PROFILER.paint_stats('EditorView.paint')
+        preview_paint, preview_frame = PROFILER.paint_stats('PreviewWidget.paint')
+
+        counts = self.main_widget.scene_item_counts()
+        PROFILER.sample('scene items', counts)
+
+        self.profiler_label.setText(
+            f"Editor {editor_paint:.1f} ms paint / {editor_frame:.1f} ms frame   "
+            f"Preview {preview_paint:.1f} ms paint / {preview_frame:.1f} ms frame   "
+            f"changed: {PROFILER.counters['MeshModel.changed']}   "
+            f"rebuild_path: {PROFILER.counters['TriangleItem.rebuild_path']}   "
+            f"items: {sum(counts.values())}"
+        )
+        self.profiler_label.setToolTip("\n".join(f"{name}: {n}" for name, n in counts.items()))
+
+    def _on_export_trace(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self,
+            "Export Trace",
+            self._last_dir or "trace.json",
+            "Chrome Trace (*.json);;All Files (*)"
+        )
+        if not path:
+            return
+        try:
+            PROFILER.export_chrome_trace(path)
+        except OSError as e:
+            QtWidgets.QMessageBox.critical(self, "Export Error", f"Failed to write trace:\n{e}")
\ No newline at end of file
@@ -0,0 +1,57 @@
+from PySide6 import QtWidgets, QtGui, QtCore
+from src.utility import selection_transform
+
+class TransformDialog(QtWidgets.QDialog):
+    """Move / rotate / scale / mirror the selection, previewed live in the editor."""
+
+    transformChanged = QtCore.Signal(QtGui.QTransform)
+
+    def __init__(self, pivot: QtCore.QPointF, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Transform Selection")
+        self.pivot = QtCore.QPointF(pivot)
+
+        def spin(lo, hi, value, suffix=""):
+            box = QtWidgets.QDoubleSpinBox()
+            box.setRange(lo, hi)
+            box.setDecimals(3)
+            box.setValue(value)
+            box.setSuffix(suffix)
+            box.valueChanged.connect(self._emit_transform)
+            return box
+
+        self.move_x = spin(-1000, 1000, 0)
+        self.move_y = spin(-1000, 1000, 0)
+        self.angle = spin(-360, 360, 0, " deg")
+        self.scale_x = spin(-10000, 10000, 100, " %")
+        self.scale_y = spin(-10000, 10000, 100, " %")
+        self.mirror_x = QtWidgets.QCheckBox("Mirror X")
+        self.mirror_y = QtWidgets.QCheckBox("Mirror Y")
+        self.mirror_x.toggled.connect(self._emit_transform)
+        self.mirror_y.toggled.connect(self._emit_transform)
+
+        form = QtWidgets.QFormLayout(self)
+        form.addRow("Pivot", QtWidgets.QLabel(f"({self.pivot.x():.3f}, {self.pivot.y():.3f})  selection center"))
+        form.addRow("Move X", self.move_x)
+        form.addRow("Move Y", self.move_y)
+        form.addRow("Rotate", self.angle)
+        form.addRow("Scale X", self.scale_x)
+        form.addRow("Scale Y", self.scale_y)
+        form.addRow(self.mirror_x, self.mirror_y)
+
+        buttons = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        form.addRow(buttons)
+
+    def transform(self) -> QtGui.QTransform:
+        return selection_transform(
+            self.pivot,
+            self.move_x.value(), self.move_y.value(),
+            self.angle.value(),
+            self.scale_x.value() / 100, self.scale_y.value() / 100,
+            self.mirror_x.isChecked(), self.mirror_y.isChecked(),
+        )
+
+    def _emit_transform(self, *_):
+        self.transformChanged.emit(self.transform())
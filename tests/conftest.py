@@ -0,0 +1,30 @@
+import os
+import sys
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from PySide6 import QtWidgets
+
+
+@pytest.fixture(scope='session')
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def main(app):
+    # the editor needs sw_ducky for tile io, skip rather than fail where it isn't installed
+    pytest.importorskip('sw_ducky')
+    from src import MainWindow
+
+    window = MainWindow(autosave=False)
+    window.resize(1200, 650)
+    window.show()
+    app.processEvents()
+    window.main_widget.editor.fit_tile()
+    app.processEvents()
+    yield window.main_widget
+    window.close()
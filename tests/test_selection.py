@@ -0,0 +1,69 @@
+import pytest
+
+from PySide6 import QtCore, QtGui, QtWidgets
+from PySide6.QtTest import QTest
+
+P = QtCore.QPointF
+
+
+def _mouse_drag(view: QtWidgets.QGraphicsView, start: QtCore.QPoint, offset: QtCore.QPoint, steps: int = 5):
+    # QTest.mouseMove doesn't carry the held button, so the moves are sent by hand
+    viewport = view.viewport()
+    QTest.mousePress(viewport, QtCore.Qt.LeftButton, QtCore.Qt.NoModifier, start)
+    for k in range(1, steps + 1):
+        pos = QtCore.QPointF(start + offset * (k / steps))
+        move = QtGui.QMouseEvent(QtCore.QEvent.MouseMove, pos, viewport.mapToGlobal(pos), QtCore.Qt.NoButton, QtCore.Qt.LeftButton, QtCore.Qt.NoModifier)
+        QtWidgets.QApplication.sendEvent(viewport, move)
+    QTest.mouseRelease(viewport, QtCore.Qt.LeftButton, QtCore.Qt.NoModifier, start + offset)
+    QtWidgets.QApplication.processEvents()
+
+
+def _set_layer(main, mi: int, pts):
+    main.models[mi].set_geometry([P(x, y) for x, y in pts], [])
+    main._rebuild_scene_all()
+
+
+@pytest.mark.parametrize('tool', ['rect', 'lasso'])
+def test_dragging_handle_moves_it_without_selecting(main, tool):
+    _set_layer(main, main.active_mesh, [(0, 0), (100, 0), (0, 100)])
+    gestures = []
+    main.editor.rectSelected.connect(lambda *_: gestures.append('rect'))
+    main.editor.lassoSelected.connect(lambda *_: gestures.append('lasso'))
+    main.editor.selection_tool = tool
+
+    # the full tile overlays sit on top of the handle, the drag has to reach it anyway
+    item = main.mesh_vertex_items[main.active_mesh][1]
+    _mouse_drag(main.editor, main.editor.mapFromScene(item.scenePos()), QtCore.QPoint(40, 25))
+
+    assert gestures == []
+    assert main.models[main.active_mesh].points()[1] != P(100, 0)
+
+
+@pytest.mark.parametrize('tool', ['rect', 'lasso'])
+def test_dragging_empty_space_selects(main, tool):
+    gestures = []
+    main.editor.rectSelected.connect(lambda *_: gestures.append('rect'))
+    main.editor.lassoSelected.connect(lambda *_: gestures.append('lasso'))
+    main.editor.selection_tool = tool
+
+    _mouse_drag(main.editor, main.editor.mapFromScene(P(300, 300)), QtCore.QPoint(30, 30))
+
+    assert gestures == [tool]
+
+
+def test_delete_only_touches_active_layer(main):
+    sea, land = 0, 4
+    for mi in (sea, land):
+        _set_layer(main, mi, [(0, 0), (100, 0), (0, 100)])
+
+    main.mesh_combo.setCurrentIndex(sea)
+    main.selection.select_vertices(sea, [0])
+    main.mesh_combo.setCurrentIndex(land)
+    main.selection.select_vertices(land, [0])
+
+    assert not main.selection.has_selection(sea)
+
+    main.delete_selected()
+
+    assert len(main.models[sea].points()) == 3
+    assert len(main.models[land].points()) == 2